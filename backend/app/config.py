@@ -21,6 +21,21 @@ class Settings(BaseSettings):
     # Telegram
     telegram_bot_token: str = ""
     telegram_enabled: bool = False
+    # Public base URL of the API. When set, Telegram delivers updates to
+    # /api/telegram/webhook (carrying the secret below) instead of the bot polling.
+    telegram_webhook_url: str = ""
+    telegram_webhook_secret: str = ""
+
+    # Scheduler job leases: redis://… shared across containers, or
+    # sqlite:///path on a single host; required outside development when the
+    # scheduler runs (empty in development means a temp file)
+    scheduler_lock_url: str = ""
+
+    # Run the Telegram bot and scheduler in run_worker.py rather than the API
+    # process; the API reaches it through the task queue (sqlite:///path, or
+    # empty for a temp file, on one host; redis://… across hosts)
+    worker_enabled: bool = False
+    worker_queue_url: str = ""
 
     # API key (service-to-service auth)
     voss_api_key: str = ""
@@ -45,7 +60,8 @@ class Settings(BaseSettings):
             return None
 
     def validate_production(self):
-        """Refuse to start in production with placeholder secrets."""
+        """Refuse to start in production with placeholder secrets, or with the
+        scheduler enabled but no shared lock store."""
         errors = []
         if self.jwt_secret_key == "change-me-to-a-random-secret":
             errors.append("JWT_SECRET_KEY is still the default placeholder")
@@ -53,9 +69,14 @@ class Settings(BaseSettings):
             errors.append("INVITE_CODE is still the default placeholder")
         if not self.voss_api_key:
             errors.append("VOSS_API_KEY is not set")
+        if self.telegram_webhook_url and not self.telegram_webhook_secret:
+            errors.append("TELEGRAM_WEBHOOK_SECRET is not set for webhook mode")
+        if self.telegram_enabled and not self.scheduler_lock_url:
+            # Only a process with Telegram enabled starts the scheduler.
+            errors.append("SCHEDULER_LOCK_URL is not set — scheduler leases need a shared store")
         if errors:
             raise RuntimeError(
-                "Production startup blocked — fix these secrets:\n  - "
+                "Production startup blocked — fix these settings:\n  - "
                 + "\n  - ".join(errors)
             )
 
@@ -28,15 +28,20 @@ def parse_platform_handles(raw: str) -> dict:
         return {}
 
 
+def normalise_handle(handle) -> str:
+    """Canonical form for comparing platform handles: case- and trailing-slash-
+    insensitive, so '@Sarah' matches '@sarah' and profile URLs match with or
+    without the final '/'."""
+    return str(handle or "").strip().lower().rstrip("/")
+
+
 def find_contact_by_handle(contacts_sheet, platform: str, handle: str) -> dict | None:
-    """Search all contacts for a matching platform handle."""
-    handle_lower = handle.lower().rstrip("/")
-    for contact in contacts_sheet.get_all():
-        handles = parse_platform_handles(contact.get("platform_handles", ""))
-        stored = handles.get(platform, "").lower().rstrip("/")
-        if stored and stored == handle_lower:
-            return contact
-    return None
+    """Find the contact holding `handle` on `platform`. Answered from the contacts
+    handle index, so the cost doesn't grow with the size of the book."""
+    from app.services.indexes import HandleIndex
+
+    contact_id = contacts_sheet.view(HandleIndex).lookup(platform, handle)
+    return contacts_sheet.get_by_id(contact_id) if contact_id else None
 
 
 # Engagement stages ordered weakest → strongest, so a re-add can only advance
@@ -54,34 +59,73 @@ def _last_name_root(last_name: str) -> str:
     return re.split(r"[ ,(|]", (last_name or "").strip().lower())[0]
 
 
+def name_key(first_name: str, last_name: str) -> tuple[str, str]:
+    """Matching key for a person's name: (lowercased first name, last-name root)."""
+    return (first_name or "").strip().lower(), _last_name_root(last_name)
+
+
+def normalise_linkedin_url(url: str) -> str:
+    """Canonical LinkedIn profile URL for matching: scheme, 'www.', query string
+    and trailing slash dropped, lowercased. 'https://www.LinkedIn.com/in/ann/?x=1'
+    -> 'linkedin.com/in/ann'."""
+    import re
+
+    url = (url or "").strip().lower().split("?")[0].split("#")[0].rstrip("/")
+    return re.sub(r"^(https?://)?(www\.)?", "", url)
+
+
+# Trailing words folded away when comparing company names, so "Acme Ltd",
+# "ACME Limited" and "acme" are the same company.
+_LEGAL_SUFFIXES = {
+    "ltd", "limited", "plc", "llp", "llc", "lp", "inc", "incorporated",
+    "corp", "corporation", "co", "company", "gmbh", "ag", "sa", "bv", "pty",
+}
+_CONNECTORS = {"&", "and"}
+
+
+def normalise_company_name(name: str) -> str:
+    """Canonical company name for matching: lowercased, punctuation and extra
+    whitespace collapsed, trailing legal suffixes dropped along with any
+    connector they leave dangling. 'ACME Limited.' and 'Acme & Co' -> 'acme'."""
+    import re
+
+    words = re.sub(r"[^\w&]+", " ", (name or "").lower()).split()
+    while len(words) > 1 and (words[-1] in _LEGAL_SUFFIXES or words[-1] in _CONNECTORS):
+        words.pop()
+    return " ".join(words)
+
+
+def website_domain(url: str) -> str:
+    """Bare host of a website or email-style address: 'https://www.acme.example/about'
+    and 'bob@acme.example' -> 'acme.example'. Empty when there is nothing host-like."""
+    import re
+
+    host = re.sub(r"^([a-z][a-z0-9+.-]*://|mailto:)", "", (url or "").strip().lower())
+    host = re.split(r"[/?#]", host)[0].rpartition("@")[2].split(":")[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+def email_domain(email: str) -> str:
+    """Domain part of an email address, lowercased; empty if malformed."""
+    _, at, domain = (email or "").strip().lower().rpartition("@")
+    return domain if at else ""
+
+
 def find_duplicate_contact(
     contacts_sheet, *, linkedin_url="", email="", first_name="", last_name=""
 ) -> dict | None:
     """Find an existing active contact that is the same person as the one being
     created. Matches in priority order: linkedin_url, then email, then
     normalised first+last name. Archived rows are ignored. Returns None when no
-    match — i.e. a genuinely new contact."""
-    def _active(rec):
-        return rec if rec and rec.get("status") != "archived" else None
-
-    if linkedin_url:
-        m = _active(contacts_sheet.find_by_field("linkedin_url", linkedin_url))
-        if m:
-            return m
-    if email:
-        m = _active(contacts_sheet.find_by_field("email", email))
-        if m:
-            return m
-    if first_name and last_name:
-        fn = first_name.strip().lower()
-        ln = _last_name_root(last_name)
-        for c in contacts_sheet.get_all():
-            if c.get("status") == "archived":
-                continue
-            if c.get("first_name", "").strip().lower() == fn and \
-                    _last_name_root(c.get("last_name", "")) == ln:
-                return c
-    return None
+    match — i.e. a genuinely new contact. Each step is a lookup in the contacts
+    dedup index, not a scan."""
+    from app.services.indexes import DedupIndex
+
+    contact_id = contacts_sheet.view(DedupIndex).match(
+        linkedin_url=linkedin_url, email=email,
+        first_name=first_name, last_name=last_name,
+    )
+    return contacts_sheet.get_by_id(contact_id) if contact_id else None
 
 
 def build_contact_enrichment(existing: dict, incoming: dict) -> dict:
@@ -102,16 +146,62 @@ def build_contact_enrichment(existing: dict, incoming: dict) -> dict:
     return updates
 
 
-def resolve_or_create_company(companies_sheet, name: str) -> str:
+def resolve_or_create_company(companies_sheet, name: str, website: str = "") -> str:
     """Resolve a company name to an existing company id, or create a new
     company row with that name and return its id. Empty/whitespace-only
-    names return ""; callers treat that as 'no resolution requested'."""
+    names return ""; callers treat that as 'no resolution requested'.
+    Matching goes through the company index, so 'ACME Limited' resolves to
+    an existing 'Acme'."""
     if not name or not name.strip():
         return ""
-    existing = companies_sheet.find_by_field("name", name)
+    from app.services.indexes import CompanyIndex
+
+    existing = companies_sheet.view(CompanyIndex).match(name=name, website=website)
     if existing:
-        return existing["id"]
-    return companies_sheet.create({"name": name})["id"]
+        return existing
+    data = {"name": name.strip()}
+    if website:
+        data["website"] = website
+    return companies_sheet.create(data)["id"]
+
+
+def resolve_or_create_companies(companies_sheet, companies: list[dict]) -> tuple[list[str], list[dict]]:
+    """Batch form of resolve_or_create_company for imports. Each dict carries a
+    name plus any other company fields. Misses are created with one
+    bulk_create, and rows naming the same new company share one record.
+    Returns the company id per input ("" for blank names) and the created
+    records."""
+    from app.services.indexes import CompanyIndex
+
+    index = companies_sheet.view(CompanyIndex)
+    ids = [""] * len(companies)
+    to_create: list[dict] = []
+    positions: list[list[int]] = []
+    pending: dict[tuple[str, str], int] = {}
+    for pos, data in enumerate(companies):
+        name = (data.get("name") or "").strip()
+        if not name:
+            continue
+        existing = index.match(name=name, website=data.get("website", ""))
+        if existing:
+            ids[pos] = existing
+            continue
+        keys = [k for k in (("domain", website_domain(data.get("website", ""))),
+                            ("name", normalise_company_name(name))) if k[1]]
+        slot = next((pending[k] for k in keys if k in pending), None)
+        if slot is None:
+            slot = len(to_create)
+            to_create.append({**data, "name": name})
+            positions.append([])
+        for k in keys:
+            pending.setdefault(k, slot)
+        positions[slot].append(pos)
+
+    created = companies_sheet.bulk_create(to_create)
+    for record, slots in zip(created, positions):
+        for pos in slots:
+            ids[pos] = record["id"]
+    return ids, created
 
 
 def today_str() -> str:
@@ -119,6 +209,20 @@ def today_str() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%d")
 
 
+def days_ago_label(ts: float | None, now: float) -> str:
+    """Return a human-readable '2d ago' / 'today' label for an epoch timestamp,
+    counting UTC calendar days (not 24h periods) so yesterday's events never
+    read as 'today'."""
+    if ts is None:
+        return ""
+    delta = int(now // 86400 - ts // 86400)
+    if delta <= 0:
+        return "today"
+    if delta == 1:
+        return "yesterday"
+    return f"{delta}d ago"
+
+
 def group_follow_ups(
     follow_ups: list[dict], today: str | None = None
 ) -> dict[str, list[dict]]:
@@ -0,0 +1,19 @@
+import logging
+
+from app.config import settings
+
+
+def configure_logging() -> None:
+    """Structured JSON logging in production, standard logging in development.
+    Shared by the API (app.main) and the worker (app.worker)."""
+    if settings.app_env == "production":
+        from pythonjsonlogger import json as json_log
+
+        handler = logging.StreamHandler()
+        handler.setFormatter(
+            json_log.JsonFormatter("%(asctime)s %(name)s %(levelname)s %(message)s")
+        )
+        logging.root.handlers = [handler]
+        logging.root.setLevel(logging.INFO)
+    else:
+        logging.basicConfig(level=logging.INFO)
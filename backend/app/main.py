@@ -11,21 +11,11 @@ from slowapi.errors import RateLimitExceeded
 
 from app.config import settings
 from app.limiter import limiter
+from app.logging_setup import configure_logging
 from app.routers import auth, companies, contacts, deals, email_draft, follow_ups, interactions, notifications, search, social
-from app.routers import dashboard
+from app.routers import analytics, dashboard, dedup, telegram
 
-# Structured JSON logging in production, standard logging in development
-if settings.app_env == "production":
-    from pythonjsonlogger import json as json_log
-
-    handler = logging.StreamHandler()
-    handler.setFormatter(
-        json_log.JsonFormatter("%(asctime)s %(name)s %(levelname)s %(message)s")
-    )
-    logging.root.handlers = [handler]
-    logging.root.setLevel(logging.INFO)
-else:
-    logging.basicConfig(level=logging.INFO)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -38,35 +28,17 @@ async def lifespan(app: FastAPI):
     if settings.app_env == "production":
         settings.validate_production()
 
-    if settings.telegram_enabled:
-        try:
-            from app.services.telegram_service import get_telegram_app
-            await get_telegram_app()
-            logger.info("Telegram bot started")
-        except Exception as e:
-            logger.error(f"Failed to start Telegram bot: {e}")
-
-        try:
-            from app.scheduler import start_scheduler
-            start_scheduler()
-            logger.info("Scheduler started")
-        except Exception as e:
-            logger.error(f"Failed to start scheduler: {e}")
+    # The bot and scheduler run here unless a separate worker process
+    # (run_worker.py) hosts them.
+    if not settings.worker_enabled:
+        from app import worker
+        await worker.start()
 
     yield
 
     # Shutdown
-    if settings.telegram_enabled:
-        try:
-            from app.services.telegram_service import stop_telegram_app
-            await stop_telegram_app()
-        except Exception as e:
-            logger.error(f"Error stopping Telegram bot: {e}")
-        try:
-            from app.scheduler import stop_scheduler
-            stop_scheduler()
-        except Exception as e:
-            logger.error(f"Error stopping scheduler: {e}")
+    if not settings.worker_enabled:
+        await worker.stop()
 
 
 app = FastAPI(title="Voss CRM", version="1.0.0", lifespan=lifespan)
@@ -137,6 +109,9 @@ app.include_router(notifications.router)
 app.include_router(email_draft.router)
 app.include_router(social.router)
 app.include_router(search.router)
+app.include_router(dedup.router)
+app.include_router(analytics.router)
+app.include_router(telegram.router)
 
 
 @app.get("/api/health")
@@ -81,3 +81,4 @@ class Contact(BaseModel):
     campaign_id: str = ""
     created_at: str = ""
     updated_at: str = ""
+    engagement_score: float | None = None
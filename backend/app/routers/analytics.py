@@ -0,0 +1,45 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+
+from app.dependencies import get_current_user
+from app.services.analytics_service import AnalyticsError, run_query
+
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+
+class AnalyticsFilter(BaseModel):
+    field: str = Field(..., min_length=1)
+    op: Literal["eq", "ne", "in", "not_in", "gt", "gte", "lt", "lte"] = "eq"
+    # int before float so a JSON 5000 stays 5000; numbers match numerically.
+    value: str | int | float | list[str | int | float] = ""
+
+
+class AnalyticsMetric(BaseModel):
+    op: Literal["count", "sum", "avg", "min", "max"] = "count"
+    field: str = ""
+
+
+class AnalyticsQuery(BaseModel):
+    tab: Literal["contacts", "companies", "deals", "interactions", "follow_ups"]
+    group_by: list[str] = Field(default_factory=list, max_length=4)
+    metrics: list[AnalyticsMetric] = Field(default_factory=lambda: [AnalyticsMetric()], min_length=1)
+    filters: list[AnalyticsFilter] = []
+
+
+@router.post("")
+async def analytics_query(body: AnalyticsQuery, _user: dict = Depends(get_current_user)):
+    """Group-by / filter / aggregate over one tab. group_by entries are a column,
+    a date column with a bucket ("created_at:month", "occurred_at:week") or a
+    contact attribute ("contact.segment"). Answered from NumPy column arrays and
+    cached until one of the tabs read is written."""
+    try:
+        return run_query(
+            body.tab,
+            group_by=body.group_by,
+            metrics=[(m.op, m.field) for m in body.metrics],
+            filters=[(f.field, f.op, f.value) for f in body.filters],
+        )
+    except AnalyticsError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
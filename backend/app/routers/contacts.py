@@ -1,3 +1,5 @@
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
 import json
@@ -10,7 +12,9 @@ from app.helpers import (
     resolve_or_create_company,
 )
 from app.models import Contact, ContactCreate, ContactFromLinkedIn, ContactUpdate
-from app.services.sheet_service import companies_sheet, contacts_sheet
+from app.services.contact_view_service import SECTIONS, contact_360, parse_fields
+from app.services.indexes import ActivityIndex, EngagementIndex, interaction_time
+from app.services.sheet_service import companies_sheet, contacts_sheet, interactions_sheet
 
 router = APIRouter(prefix="/api/contacts", tags=["contacts"])
 
@@ -22,6 +26,7 @@ async def list_contacts(
     company_id: str | None = Query(None),
     segment: str | None = Query(None),
     engagement_stage: str | None = Query(None),
+    sort: Literal["engagement"] | None = Query(None, description="engagement: highest engagement score first"),
     limit: int | None = Query(None, ge=1, le=500),
     offset: int | None = Query(None, ge=0),
     _user: dict = Depends(get_current_user),
@@ -35,7 +40,11 @@ async def list_contacts(
         filters["segment"] = segment
     if engagement_stage:
         filters["engagement_stage"] = engagement_stage
-    records = contacts_sheet.get_all(filters or None, limit=limit, offset=offset)
+    if sort:
+        # Ranking has to see every match before the page is cut.
+        records = contacts_sheet.get_all(filters or None)
+    else:
+        records = contacts_sheet.get_all(filters or None, limit=limit, offset=offset)
 
     if tag:
         records = [r for r in records if tag.lower() in r.get("tags", "").lower()]
@@ -43,7 +52,16 @@ async def list_contacts(
     if not status_filter:
         records = [r for r in records if r.get("status") != "archived"]
 
-    return records
+    engagement = interactions_sheet.view(EngagementIndex)
+    scores = [engagement.score(r.get("id", "")) for r in records]
+    if sort == "engagement":
+        ranked = sorted(zip(scores, records), key=lambda pair: pair[0], reverse=True)
+        ranked = ranked[offset or 0:]
+        scores, records = [s for s, _ in ranked], [r for _, r in ranked]
+        if limit:
+            scores, records = scores[:limit], records[:limit]
+
+    return [{**r, "engagement_score": round(s, 1)} for s, r in zip(scores, records)]
 
 
 @router.post("", status_code=status.HTTP_201_CREATED)
@@ -91,6 +109,60 @@ async def get_contact(
     return record
 
 
+@router.get("/{contact_id}/activity")
+async def get_contact_activity(
+    contact_id: str,
+    limit: int = Query(10, ge=0, le=500),
+    _user: dict = Depends(get_current_user),
+):
+    """Recency summary and the latest interactions (newest first) for a contact."""
+    if not contacts_sheet.get_by_id(contact_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
+    activity = interactions_sheet.view(ActivityIndex)
+    last, inbound, outbound = (activity.last(contact_id, d) for d in ("", "inbound", "outbound"))
+    return {
+        "contact_id": contact_id,
+        "interaction_count": activity.count(contact_id),
+        "last_interaction_at": interaction_time(last) if last else "",
+        "last_inbound_at": interaction_time(inbound) if inbound else "",
+        "last_outbound_at": interaction_time(outbound) if outbound else "",
+        "recent": activity.recent(contact_id, limit),
+    }
+
+
+@router.get("/{contact_id}/full")
+async def get_contact_full(
+    contact_id: str,
+    include: str = Query("", description="Comma-separated sections: company, deals, interactions, follow_ups (default all)"),
+    fields: str = Query("", description="Projection, e.g. first_name,email,deals.title,deals.stage"),
+    deals_limit: int | None = Query(None, ge=0, le=500),
+    interactions_limit: int | None = Query(None, ge=0, le=500),
+    follow_ups_limit: int | None = Query(None, ge=0, le=500),
+    follow_up_status: str = Query(""),
+    _user: dict = Depends(get_current_user),
+):
+    """The contact with its company, deals, interactions (newest first) and
+    follow-ups in one response, plus the full size of each list."""
+    sections = tuple(s.strip() for s in include.split(",") if s.strip()) or SECTIONS
+    unknown = [s for s in sections if s not in SECTIONS]
+    if unknown:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown sections: {', '.join(unknown)}")
+    view = contact_360(
+        contact_id,
+        sections=sections,
+        limits={
+            "deals": deals_limit,
+            "interactions": interactions_limit,
+            "follow_ups": follow_ups_limit,
+        },
+        fields=parse_fields(fields),
+        follow_up_status=follow_up_status,
+    )
+    if view is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found")
+    return view
+
+
 @router.put("/{contact_id}", response_model=Contact)
 async def update_contact(
     contact_id: str,
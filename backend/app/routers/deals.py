@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from app.dependencies import get_current_user
 from app.models import Deal, DealCreate, DealStageUpdate, DealUpdate
+from app.services.indexes import PipelineView
+from app.services.pipeline_history_service import default_window, pipeline_history, stage_flow
 from app.services.sheet_service import deals_sheet
 
 router = APIRouter(prefix="/api/deals", tags=["deals"])
@@ -34,6 +36,50 @@ async def create_deal(
     return deals_sheet.create(body.model_dump())
 
 
+@router.get("/pipeline")
+async def get_pipeline(_user: dict = Depends(get_current_user)):
+    """Per-stage count, value and value by currency, plus open-pipeline totals."""
+    pipeline = deals_sheet.view(PipelineView)
+    return {
+        "stages": pipeline.stages(),
+        "open_count": pipeline.open_count(),
+        "open_value": pipeline.open_value(),
+        "total_count": pipeline.total_count(),
+    }
+
+
+_DAY_PATTERN = r"^\d{4}-\d{2}-\d{2}$"
+
+
+@router.get("/pipeline/history")
+async def get_pipeline_history(
+    start: str | None = Query(None, pattern=_DAY_PATTERN),
+    end: str | None = Query(None, pattern=_DAY_PATTERN),
+    _user: dict = Depends(get_current_user),
+):
+    """Daily per-stage snapshots between start and end (inclusive). Defaults to
+    the last 30 days."""
+    try:
+        start, end = default_window(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid date: {e}")
+    return {"start": start, "end": end, "history": pipeline_history(start, end)}
+
+
+@router.get("/pipeline/flow")
+async def get_pipeline_flow(
+    start: str | None = Query(None, pattern=_DAY_PATTERN),
+    end: str | None = Query(None, pattern=_DAY_PATTERN),
+    _user: dict = Depends(get_current_user),
+):
+    """Stage transitions and per-stage velocity from the daily snapshots."""
+    try:
+        start, end = default_window(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid date: {e}")
+    return stage_flow(start, end)
+
+
 @router.get("/{deal_id}", response_model=Deal)
 async def get_deal(
     deal_id: str,
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
+
+from app.dependencies import get_current_user
+from app.services.dedup_service import (
+    find_company_duplicates,
+    find_contact_duplicates,
+    merge_companies,
+    merge_contacts,
+)
+
+router = APIRouter(prefix="/api/dedup", tags=["dedup"])
+
+
+class MergeGroup(BaseModel):
+    keep: str = Field(..., min_length=1)
+    merge: list[str] = Field(..., min_length=1)
+
+
+class MergeRequest(BaseModel):
+    contacts: list[MergeGroup] = []
+    companies: list[MergeGroup] = []
+
+
+@router.get("/proposals")
+async def dedup_proposals(_user: dict = Depends(get_current_user)):
+    """Whole-book duplicate scan. Nothing is changed until groups are POSTed to /merge."""
+    return {
+        "contacts": find_contact_duplicates(),
+        "companies": find_company_duplicates(),
+    }
+
+
+@router.post("/merge")
+async def dedup_merge(body: MergeRequest, _user: dict = Depends(get_current_user)):
+    """Apply reviewed merge groups. Companies go first so contacts re-pointed
+    from a merged company already carry the survivor's id."""
+    companies = merge_companies([g.model_dump() for g in body.companies])
+    contacts = merge_contacts([g.model_dump() for g in body.contacts])
+    return {"contacts": contacts, "companies": companies}
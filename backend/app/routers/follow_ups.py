@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from app.dependencies import get_current_user
 from app.models import FollowUp, FollowUpCreate, FollowUpUpdate, FollowUpSnooze
 from app.services.sheet_service import follow_ups_sheet
+from app.services.task_queue import submit
 
 router = APIRouter(prefix="/api/follow-ups", tags=["follow-ups"])
 
@@ -18,21 +19,24 @@ async def list_follow_ups(
     offset: int | None = Query(None, ge=0),
     _user: dict = Depends(get_current_user),
 ):
+    if overdue:
+        # Pending rows due before today, oldest first, straight from the due_date index
+        if status_filter and status_filter != "pending":
+            return []
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        records = follow_ups_sheet.range_query("due_date", hi=today, where={"status": "pending"})
+        if contact_id:
+            records = [r for r in records if r.get("contact_id") == contact_id]
+        if offset:
+            records = records[offset:]
+        return records[:limit] if limit else records
+
     filters = {}
     if status_filter:
         filters["status"] = status_filter
     if contact_id:
         filters["contact_id"] = contact_id
-    records = follow_ups_sheet.get_all(filters or None, limit=limit, offset=offset)
-
-    if overdue:
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        records = [
-            r for r in records
-            if r.get("status") == "pending" and r.get("due_date", "") < today
-        ]
-
-    return records
+    return follow_ups_sheet.get_all(filters or None, limit=limit, offset=offset)
 
 
 @router.post("", response_model=FollowUp, status_code=status.HTTP_201_CREATED)
@@ -40,7 +44,9 @@ async def create_follow_up(
     body: FollowUpCreate,
     _user: dict = Depends(get_current_user),
 ):
-    return follow_ups_sheet.create(body.model_dump())
+    record = follow_ups_sheet.create(body.model_dump())
+    await submit("follow_ups_changed")
+    return record
 
 
 @router.put("/{follow_up_id}", response_model=FollowUp)
@@ -54,9 +60,12 @@ async def update_follow_up(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No fields to update")
     if updates.get("status") == "completed" and not updates.get("completed_at"):
         updates["completed_at"] = datetime.now(timezone.utc).isoformat()
+    if "due_date" in updates or "due_time" in updates:
+        updates["reminder_sent"] = "FALSE"  # re-timed: remind again at the new time
     record = follow_ups_sheet.update(follow_up_id, updates)
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Follow-up not found")
+    await submit("follow_ups_changed")
     return record
 
 
@@ -71,6 +80,7 @@ async def complete_follow_up(
     })
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Follow-up not found")
+    await submit("follow_ups_changed")
     return record
 
 
@@ -88,4 +98,5 @@ async def snooze_follow_up(
     })
     if not record:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Follow-up not found")
+    await submit("follow_ups_changed")
     return record
@@ -9,6 +9,7 @@ from pydantic import BaseModel
 from app.dependencies import get_current_user
 from app.models import Interaction, InteractionCreate, InteractionUpdate
 from app.services.sheet_service import contacts_sheet, interactions_sheet, notifications_sheet
+from app.services.task_queue import submit
 
 logger = logging.getLogger(__name__)
 
@@ -116,8 +117,10 @@ async def _notify_deal_suggestion(contact_id: str, title: str, notes: str):
             "payload": json.dumps({"notes": notes}),
         })
 
-        from app.services.telegram_service import notify_deal_suggestion
-        await notify_deal_suggestion(contact_id, title, notes, notification_id=notification["id"])
+        await submit(
+            "deal_suggestion",
+            contact_id=contact_id, title=title, notes=notes, notification_id=notification["id"],
+        )
     except Exception as e:
         logger.error(f"Failed to send deal suggestion notification: {e}")
 
@@ -6,19 +6,28 @@ social interactions against VOSS contacts.
 
 import json
 import logging
+from collections import OrderedDict
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
 from app.dependencies import get_current_user
-from app.helpers import contact_display_name, find_contact_by_handle, parse_platform_handles
+from app.helpers import contact_display_name, find_contact_by_handle
+from app.services.indexes import HandleIndex, LookupDigest, NameIndex
 from app.services.sheet_service import contacts_sheet, interactions_sheet
+from app.services.task_queue import submit
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/social", tags=["social"])
 
+# Recent digest versions (version → entry set) so clients holding one of them
+# can refresh with a delta instead of the full list.
+_DIGEST_HISTORY_SIZE = 8
+_digest_history: "OrderedDict[str, frozenset[str]]" = OrderedDict()
+
 
 # --- Request/Response models ---
 
@@ -49,8 +58,13 @@ class CaptureResponse(BaseModel):
     pending_link: bool = False
 
 
+# Whole notification queues come through here; the lookups are index hits, so the
+# ceiling only guards request size.
+BATCH_LOOKUP_MAX_ITEMS = 10_000
+
+
 class BatchLookupRequest(BaseModel):
-    items: list[PersonInfo]
+    items: list[PersonInfo] = Field(..., max_length=BATCH_LOOKUP_MAX_ITEMS)
 
 
 class BatchLookupResult(BaseModel):
@@ -95,20 +109,44 @@ def _build_interaction_body(event: EngagementEvent) -> str:
     return f"[{platform}] {body}"
 
 
-def _search_contact_by_name(name: str) -> dict | None:
-    """Search contacts by display name, return best match or None."""
-    if not name:
-        return None
-    parts = name.split()
+def _match_name(names: NameIndex, display_name: str) -> str | None:
+    """Resolve a display name to a contact id through the name index. The last name
+    is tried whole ('Smith, CFA' → 'smith') and as its final word ('A. Smith').
+
+    Matching is exact on helpers.name_key — case-insensitive, credentials and
+    bracketed suffixes dropped — where it used to be a substring test, so
+    'Jo Smith' no longer resolves to John Smith, nor 'Smith' to Smithson."""
+    parts = (display_name or "").split()
     if not parts:
         return None
-    results = contacts_sheet.search(parts[0], ["first_name", "last_name"])
-    if len(parts) > 1:
-        results = [
-            c for c in results
-            if parts[-1].lower() in c.get("last_name", "").lower()
-        ]
-    return results[0] if results else None
+    if len(parts) == 1:
+        ids = names.lookup(parts[0])
+    else:
+        ids = names.lookup(parts[0], " ".join(parts[1:])) or names.lookup(parts[0], parts[-1])
+    return ids[0] if ids else None
+
+
+def _search_contact_by_name(name: str) -> dict | None:
+    """Search contacts by display name, return best match or None."""
+    contact_id = _match_name(contacts_sheet.view(NameIndex), name)
+    return contacts_sheet.get_by_id(contact_id) if contact_id else None
+
+
+def _lookup_person(person: PersonInfo, handles: HandleIndex, names: NameIndex) -> BatchLookupResult:
+    """Resolve one batch item: handle on any platform first, then display name."""
+    contact_id = None
+    if person.handle:
+        contact_id = handles.lookup_any(person.handle)
+    if not contact_id and person.display_name:
+        contact_id = _match_name(names, person.display_name)
+    contact = contacts_sheet.get_by_id(contact_id) if contact_id else None
+    return BatchLookupResult(
+        handle=person.handle,
+        display_name=person.display_name,
+        found=contact is not None,
+        contact_id=contact["id"] if contact else "",
+        contact_name=contact_display_name(contact) if contact else "",
+    )
 
 
 # --- Endpoints ---
@@ -174,8 +212,7 @@ async def capture_engagement(
     # 5. Send Telegram notification for pending links
     if pending_link:
         try:
-            from app.services.telegram_service import notify_pending_link
-            await notify_pending_link(event, contact)
+            await submit("pending_link", event=event.model_dump(mode="json"), contact=contact)
         except Exception as e:
             logger.warning(f"Failed to send pending_link notification: {e}")
 
@@ -203,49 +240,72 @@ async def search_handles(
 @router.post("/batch-lookup", response_model=list[BatchLookupResult])
 async def batch_lookup(
     body: BatchLookupRequest,
+    request: Request,
     _user: dict = Depends(get_current_user),
 ):
-    """Check which persons are already in VOSS. Used by Chrome extension to pre-annotate the queue."""
-    all_contacts = contacts_sheet.get_all()
-    results = []
-
-    for person in body.items:
-        found = False
-        contact_id = ""
-        contact_name = ""
-
-        # Check by handle
-        if person.handle:
-            handle_lower = person.handle.lower().rstrip("/")
-            for c in all_contacts:
-                handles = parse_platform_handles(c.get("platform_handles", ""))
-                for _platform, stored in handles.items():
-                    if stored.lower().rstrip("/") == handle_lower:
-                        found = True
-                        contact_id = c["id"]
-                        contact_name = contact_display_name(c)
-                        break
-                if found:
-                    break
-
-        # Fall back to name search
-        if not found and person.display_name:
-            parts = person.display_name.split()
-            if parts:
-                for c in all_contacts:
-                    if (parts[0].lower() in c.get("first_name", "").lower()
-                            and (len(parts) < 2 or parts[-1].lower() in c.get("last_name", "").lower())):
-                        found = True
-                        contact_id = c["id"]
-                        contact_name = contact_display_name(c)
-                        break
-
-        results.append(BatchLookupResult(
-            handle=person.handle,
-            display_name=person.display_name,
-            found=found,
-            contact_id=contact_id,
-            contact_name=contact_name,
-        ))
-
-    return results
+    """Check which persons are already in VOSS. Used by Chrome extension to pre-annotate the queue.
+
+    Resolves the whole batch in one pass over the handle and name indexes. Send
+    `Accept: application/x-ndjson` to stream one result per line as it resolves,
+    rather than waiting for the full list.
+    """
+    handles = contacts_sheet.view(HandleIndex)
+    names = contacts_sheet.view(NameIndex)
+    results = (_lookup_person(person, handles, names) for person in body.items)
+
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        return StreamingResponse(
+            (r.model_dump_json() + "\n" for r in results),
+            media_type="application/x-ndjson",
+        )
+    return list(results)
+
+
+@router.get("/digest")
+async def lookup_digest(
+    request: Request,
+    since: str = Query("", description="Digest version the client already holds"),
+    _user: dict = Depends(get_current_user),
+):
+    """Compact digest of everyone batch-lookup would find, for local pre-checks.
+
+    `entries` is the sorted list of 8-hex-char SHA-256 prefixes of
+    `h:<handle>` (lowercased, trimmed, no trailing '/') and `n:<first> <last>`
+    (lowercased first name; last name cut at the first space, comma, '(' or '|').
+    A miss means "not in VOSS"; a hit is probable and should be confirmed with
+    /batch-lookup. The version doubles as the ETag: If-None-Match gets a 304,
+    and `since=<older version>` returns only the added/removed hashes.
+
+    Only the last few versions this process has served can be diffed against,
+    and none survive a restart. Every body says which kind it is: `full: true`
+    with `entries` means replace the local copy — including when `since` was
+    given but is no longer known — and `full: false` carries the delta.
+    """
+    digest = contacts_sheet.view(LookupDigest)
+    version = digest.version()
+    etag = f'"{version}"'
+    if version not in _digest_history:
+        _digest_history[version] = frozenset(digest.entries())
+        while len(_digest_history) > _DIGEST_HISTORY_SIZE:
+            _digest_history.popitem(last=False)
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    base = _digest_history.get(since) if since else None
+    if base is not None:
+        current = _digest_history[version]
+        body = {
+            "version": version,
+            "full": False,
+            "base": since,
+            "added": sorted(current - base),
+            "removed": sorted(base - current),
+        }
+    else:
+        body = {"version": version, "full": True, "entries": digest.entries()}
+    return Response(
+        content=json.dumps(body),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"},
+    )
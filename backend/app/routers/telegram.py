@@ -0,0 +1,34 @@
+import hmac
+import json
+import logging
+
+from fastapi import APIRouter, Header, HTTPException, Request, status
+
+from app.config import settings
+from app.services.task_queue import submit
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/telegram", tags=["telegram"])
+
+
+@router.post("/webhook")
+async def telegram_webhook(
+    request: Request,
+    secret_token: str = Header("", alias="X-Telegram-Bot-Api-Secret-Token"),
+):
+    """Telegram update delivery (webhook mode). Authenticated by the secret
+    token registered with setWebhook, not by a user; the update is handed to
+    the bot's update queue and handled after this returns."""
+    expected = settings.telegram_webhook_secret
+    # Compared as bytes: compare_digest rejects non-ASCII str with a TypeError.
+    if not expected or not hmac.compare_digest(secret_token.encode(), expected.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid webhook secret")
+    try:
+        update = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed JSON body")
+    if not isinstance(update, dict) or "update_id" not in update:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Not a Telegram update")
+    await submit("telegram_update", update=update)
+    return {"ok": True}
@@ -1,94 +1,68 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import datetime, timezone
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from app.helpers import contact_display_name, group_follow_ups, today_str
-from app.services.sheet_service import (
-    contacts_sheet,
-    deals_sheet,
-    follow_ups_sheet,
-    scheduler_log_sheet,
-    users_sheet,
-)
+from app.helpers import contact_display_name, today_str
+from app.services.digest_service import STALE_DEAL_DAYS, build_digest
+from app.services.dispatch_service import dispatcher
+from app.services.indexes import ReminderQueue
+from app.services.lease_service import LEASE_TTL_SECONDS, Lease, get_leases
+from app.services.pipeline_history_service import snapshot_pipeline
+from app.services.sheet_service import contacts_sheet, follow_ups_sheet
 
 logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
 
 
-def _already_ran_today(job_name: str) -> bool:
-    """Check SchedulerLog sheet — return True if job already ran today."""
-    today = today_str()
-    row = scheduler_log_sheet.find_by_field("job_name", job_name)
-    return row is not None and row.get("last_run_date") == today
-
-
-def _mark_ran(job_name: str) -> None:
-    """Upsert the SchedulerLog row for this job with today's date."""
-    today = today_str()
-    row = scheduler_log_sheet.find_by_field("job_name", job_name)
-    if row:
-        scheduler_log_sheet.update(row["id"], {"last_run_date": today})
-    else:
-        scheduler_log_sheet.create({"job_name": job_name, "last_run_date": today})
-
-
-def _get_chat_ids() -> list[str]:
-    users = users_sheet.get_all()
-    return [u["telegram_chat_id"] for u in users if u.get("telegram_chat_id")]
+async def _run_once(job_name: str, job, period: str | None = None) -> bool:
+    """Run `job` unless it already ran for `period` (default today) or another
+    container holds its lease. Returns whether it ran here."""
+    leases = get_leases()
+    lease = await asyncio.to_thread(leases.claim, job_name, period or today_str(), LEASE_TTL_SECONDS)
+    if lease is None:
+        logger.info("%s already ran for %s or is running elsewhere, skipping", job_name, period or "today")
+        return False
+    try:
+        await job()
+    except BaseException:
+        await asyncio.to_thread(leases.release, lease)
+        raise
+    if not await asyncio.to_thread(leases.finish, lease):
+        logger.warning("%s lease (token %d) was taken over before the run finished", job_name, lease.token)
+    return True
 
 
 async def _send_to_all(text: str):
-    from app.services.telegram_service import send_message
-    for chat_id in _get_chat_ids():
-        try:
-            await send_message(chat_id, text)
-        except Exception as e:
-            logger.error(f"Failed to send Telegram message to {chat_id}: {e}")
+    await dispatcher.broadcast(text)
 
 
 async def morning_digest():
     """09:30 — overdue follow-ups, today's follow-ups, stale deals."""
-    if _already_ran_today("morning_digest"):
-        logger.info("Morning digest already sent today, skipping")
-        return
-    _mark_ran("morning_digest")
-
-    today = today_str()
-    follow_ups = follow_ups_sheet.get_all({"status": "pending"})
-    groups = group_follow_ups(follow_ups, today)
-    overdue = groups["overdue"]
-    todays = groups["today"]
-
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=14)).isoformat()
-    deals = deals_sheet.get_all()
-    stale = [
-        d for d in deals
-        if d.get("stage") not in ("won", "lost")
-        and d.get("updated_at", "") < cutoff
-        and d.get("updated_at", "") != ""
-    ]
+    await _run_once("morning_digest", _send_morning_digest)
+
+
+async def _send_morning_digest():
+    digest = build_digest()
+    overdue, todays, stale = digest["overdue"], digest["due_today"], digest["stale_deals"]
 
     lines = ["☀️ *Morning Digest*\n"]
 
     if overdue:
         lines.append(f"❗ *{len(overdue)} overdue follow-ups*")
         for f in overdue[:5]:
-            contact = contacts_sheet.get_by_id(f.get("contact_id", ""))
-            name = contact_display_name(contact, fallback="?")
-            lines.append(f"  • {f.get('title', '')} — {name}")
+            lines.append(f"  • {f.get('title', '')} — {f['contact_name'] or '?'}")
 
     if todays:
         lines.append(f"\n📅 *{len(todays)} follow-ups due today*")
         for f in todays[:5]:
-            contact = contacts_sheet.get_by_id(f.get("contact_id", ""))
-            name = contact_display_name(contact, fallback="?")
-            lines.append(f"  • {f.get('title', '')} — {name}")
+            lines.append(f"  • {f.get('title', '')} — {f['contact_name'] or '?'}")
 
     if stale:
-        lines.append(f"\n⚠️ *{len(stale)} stale deals* (no update in 14+ days)")
+        lines.append(f"\n⚠️ *{len(stale)} stale deals* (no update in {STALE_DEAL_DAYS}+ days)")
         for d in stale[:5]:
             lines.append(f"  • {d.get('title', '')} ({d.get('stage', '')})")
 
@@ -98,43 +72,166 @@ async def morning_digest():
     await _send_to_all("\n".join(lines))
 
 
+# Reminders fire from an in-process timer over the ReminderQueue heap, at the
+# exact due time. The interval job below is only a reconciliation pass that
+# re-reads the tab so edits made directly in the sheet get scheduled too.
+# Reminders found more than REMINDER_GRACE_SECONDS late (e.g. after downtime)
+# go out together as one "missed reminders" digest instead of as "due now".
+RECONCILE_MINUTES = 60
+REMINDER_GRACE_SECONDS = 6 * 3600
+REMINDER_RETRY_SECONDS = 60
+
+
+async def send_follow_up_reminders(due: list[dict], late: list[dict] = ()) -> set[str]:
+    """Claim the batch, then send it — one reminder per on-time follow-up, plus
+    one "missed reminders" digest for those past the grace window — coalesced
+    into one message per chat. Returns the ids claimed here.
+
+    Each follow-up is claimed twice: a lease on it for its due time, so of the
+    containers whose timers fire at once only one sends it, then a single
+    write marking the batch reminder_sent, which rows that no longer exist
+    drop out of. Marking before the send means it can't repeat because the
+    write after it failed. Follow-ups whose text no chat received are
+    unmarked and their leases released, and ReminderSendError is raised so
+    the timer retries them once it has backed off."""
+    batch = [*due, *late]
+    held = await asyncio.to_thread(_claim_reminders, batch)
+    try:
+        marked = await asyncio.to_thread(
+            follow_ups_sheet.bulk_update, {rid: {"reminder_sent": "TRUE"} for rid in held}
+        ) if held else []
+    except Exception:
+        await asyncio.to_thread(_settle_reminders, held.values(), False)
+        raise
+    claimed = {r["id"] for r in marked}
+    texts, owners = [], []
+    for f in due:
+        if f["id"] in claimed:
+            texts.append(f"⏰ *Reminder*: {f.get('title', '')} — {_contact_name(f)}\nDue now!")
+            owners.append([f["id"]])
+    missed = [f for f in late if f["id"] in claimed]
+    if missed:
+        lines = [f"🕓 *{len(missed)} missed reminders*"]
+        for f in missed:
+            when = f"{f.get('due_date', '')} {f.get('due_time', '')}".strip()
+            lines.append(f"  • {f.get('title', '')} — {_contact_name(f)} (due {when})")
+        texts.append("\n".join(lines))
+        owners.append([f["id"] for f in missed])
+    try:
+        undelivered = await dispatcher.broadcast_many(texts)
+    except Exception:
+        undelivered = range(len(texts))
+    failed = {rid for i in undelivered for rid in owners[i]}
+    if failed:
+        await asyncio.to_thread(follow_ups_sheet.bulk_update, {rid: {"reminder_sent": "FALSE"} for rid in failed})
+    await asyncio.to_thread(_settle_reminders, [held[rid] for rid in held if rid not in failed], True)
+    await asyncio.to_thread(_settle_reminders, [held[rid] for rid in failed], False)
+    if failed:
+        raise ReminderSendError(f"{len(failed)} reminders were not delivered")
+    return claimed
+
+
+class ReminderSendError(RuntimeError):
+    """Some reminders reached no chat; they were unmarked to be retried."""
+
+
+def _claim_reminders(batch: list[dict]) -> dict[str, Lease]:
+    """Leases on each follow-up's reminder for its due time, by id, for those
+    no other container holds or has already sent. A re-timed follow-up has a
+    new due time, so its reminder can be claimed again."""
+    leases, held = get_leases(), {}
+    for f in batch:
+        period = f"{f.get('due_date', '')} {f.get('due_time', '')}".strip()
+        lease = leases.claim(f"reminder:{f['id']}", period, LEASE_TTL_SECONDS)
+        if lease is not None:
+            held[f["id"]] = lease
+    return held
+
+
+def _settle_reminders(held, sent: bool) -> None:
+    leases = get_leases()
+    for lease in held:
+        if sent:
+            leases.finish(lease)
+        else:
+            leases.release(lease)
+
+
+def _contact_name(follow_up: dict) -> str:
+    contact = contacts_sheet.get_by_id(follow_up.get("contact_id", ""))
+    return contact_display_name(contact, fallback="?")
+
+
+class ReminderTimer:
+    """Sleeps until the earliest reminder in the ReminderQueue is due, sends
+    everything due, then re-arms. Any change to the queue (a follow-up created,
+    re-timed, snoozed or completed, from any thread) wakes it to re-arm early."""
+
+    def __init__(self):
+        self._wake: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+
+    def _on_change(self) -> None:
+        if self._wake is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def wake(self) -> None:
+        self._on_change()
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self.run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run(self):
+        while True:
+            self._wake.clear()
+            delay = RECONCILE_MINUTES * 60
+            try:
+                queue = await asyncio.to_thread(follow_ups_sheet.view, ReminderQueue)
+                queue.on_change = self._on_change
+                due, late = queue.due(time.time(), REMINDER_GRACE_SECONDS)
+                if due or late:
+                    claimed = await send_follow_up_reminders(due, late)
+                    for f in due + late:
+                        if f["id"] not in claimed:
+                            queue.discard(f["id"])
+                    continue  # re-check: sends can take a while
+                next_due = queue.next_due()
+                if next_due is not None:
+                    delay = min(delay, max(next_due - time.time(), 0))
+            except Exception:
+                logger.exception("Reminder timer failed, retrying in %ds", REMINDER_RETRY_SECONDS)
+                delay = REMINDER_RETRY_SECONDS
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+reminder_timer = ReminderTimer()
+
+
 async def check_follow_up_reminders():
-    """Every 30 min — send reminder for follow-ups with matching due_time."""
-    now = datetime.now(timezone.utc)
-    current_time = now.strftime("%H:%M")
-    today = today_str()
-
-    follow_ups = follow_ups_sheet.get_all({"status": "pending"})
-    due_now = [
-        f for f in follow_ups
-        if f.get("due_date", "") == today
-        and f.get("due_time", "") == current_time
-        and f.get("reminder_sent", "") != "TRUE"
-    ]
-
-    for f in due_now:
-        contact = contacts_sheet.get_by_id(f.get("contact_id", ""))
-        name = contact_display_name(contact, fallback="?")
-        text = f"⏰ *Reminder*: {f.get('title', '')} — {name}\nDue now!"
-        await _send_to_all(text)
-        follow_ups_sheet.update(f["id"], {"reminder_sent": "TRUE"})
+    """Hourly reconciliation — reload the reminder queue from the sheet (picking
+    up edits made outside the app) and re-arm the timer."""
+    await asyncio.to_thread(follow_ups_sheet.view, ReminderQueue)
+    reminder_timer.wake()
 
 
 async def stale_deal_alerts():
     """18:00 — deals with no activity in 14+ days."""
-    if _already_ran_today("stale_deal_alerts"):
-        logger.info("Stale deal alerts already sent today, skipping")
-        return
-    _mark_ran("stale_deal_alerts")
-
-    cutoff = (datetime.now(timezone.utc) - timedelta(days=14)).isoformat()
-    deals = deals_sheet.get_all()
-    stale = [
-        d for d in deals
-        if d.get("stage") not in ("won", "lost")
-        and d.get("updated_at", "") < cutoff
-        and d.get("updated_at", "") != ""
-    ]
+    await _run_once("stale_deal_alerts", _send_stale_deal_alerts)
+
+
+async def _send_stale_deal_alerts():
+    stale = build_digest()["stale_deals"]
 
     if stale:
         lines = [f"⚠️ *{len(stale)} stale deals* need attention:\n"]
@@ -143,26 +240,58 @@ async def stale_deal_alerts():
         await _send_to_all("\n".join(lines))
 
 
+async def pipeline_snapshot():
+    """23:55 — record the day's pipeline in PipelineHistory (replaces any earlier
+    snapshot taken today)."""
+    await _run_once("pipeline_snapshot", _take_pipeline_snapshot)
+
+
+# Period the startup snapshot is recorded under. "2024-03-01:startup" sorts
+# after "2024-03-01", so a later catch-up sees the day as covered, but it is
+# not the day itself, so the 23:55 run can still claim the day and overwrite
+# the snapshot.
+STARTUP_SNAPSHOT_SUFFIX = ":startup"
+
+
+async def _take_pipeline_snapshot():
+    rows = await asyncio.to_thread(snapshot_pipeline)
+    logger.info("Pipeline snapshot recorded for %s (%d rows)", rows[0].get("snapshot_date", ""), len(rows))
+
+
+# Daily jobs, by lease name: (hour, minute, job). The startup catch-up runs any
+# whose time has passed today without a finished run on record.
+DAILY_JOBS = {
+    "morning_digest": (9, 30, morning_digest),
+    "stale_deal_alerts": (18, 0, stale_deal_alerts),
+}
+
+
 async def _catch_up_missed_jobs():
     """On startup, send any scheduled alerts that were missed today.
 
-    Retries up to 3 times with exponential back-off to handle transient
-    Google Sheets API errors (e.g. 503 Service Unavailable).
+    Whether a job was missed comes from its last-run record in the lease
+    store, which every container shares and which outlives restarts — not
+    from the clock alone. Retries up to 3 times with exponential back-off to
+    handle transient Google Sheets API errors (e.g. 503 Service Unavailable).
     """
     for attempt in range(1, 4):
         try:
             now = datetime.now(timezone.utc)
-            hour_min = now.hour * 60 + now.minute
-
-            # Morning digest at 09:30 — if it's past that, send now
-            if hour_min >= 9 * 60 + 30:
-                logger.info("Catching up missed morning digest")
-                await morning_digest()
-
-            # Stale deal alerts at 18:00 — if it's past that, send now
-            if hour_min >= 18 * 60:
-                logger.info("Catching up missed stale deal alerts")
-                await stale_deal_alerts()
+            today = today_str()
+            for name, (hour, minute, job) in DAILY_JOBS.items():
+                if (now.hour, now.minute) < (hour, minute):
+                    continue
+                last_run = await asyncio.to_thread(get_leases().last_run, name)
+                if last_run < today:
+                    logger.info("Catching up missed %s (last ran: %s)", name, last_run or "never")
+                    await job()
+
+            # A day the server was up always gets a pipeline snapshot, even if the
+            # 23:55 run will be missed; that run overwrites it when it fires.
+            if await asyncio.to_thread(get_leases().last_run, "pipeline_snapshot") < today:
+                logger.info("Taking today's pipeline snapshot")
+                await _run_once("pipeline_snapshot", _take_pipeline_snapshot,
+                                period=today + STARTUP_SNAPSHOT_SUFFIX)
 
             return  # success
         except Exception:
@@ -180,16 +309,22 @@ async def _catch_up_missed_jobs():
 
 
 def start_scheduler():
-    scheduler.add_job(morning_digest, "cron", hour=9, minute=30, misfire_grace_time=3600)
-    scheduler.add_job(check_follow_up_reminders, "interval", minutes=30, misfire_grace_time=600)
-    scheduler.add_job(stale_deal_alerts, "cron", hour=18, minute=0, misfire_grace_time=3600)
+    for hour, minute, job in DAILY_JOBS.values():
+        scheduler.add_job(job, "cron", hour=hour, minute=minute, misfire_grace_time=3600)
+    scheduler.add_job(check_follow_up_reminders, "interval", minutes=RECONCILE_MINUTES, misfire_grace_time=600)
+    scheduler.add_job(pipeline_snapshot, "cron", hour=23, minute=55, misfire_grace_time=300)
     scheduler.start()
-    logger.info("Scheduler started: morning digest (09:30), reminders (every 30m), stale alerts (18:00)")
+    logger.info(
+        "Scheduler started: morning digest (09:30), reminder timer (reconciled hourly), "
+        "stale alerts (18:00), pipeline snapshot (23:55)"
+    )
+    reminder_timer.start()
 
     # Catch up any missed jobs from today
     asyncio.ensure_future(_catch_up_missed_jobs())
 
 
 def stop_scheduler():
+    reminder_timer.stop()
     if scheduler.running:
         scheduler.shutdown()
@@ -0,0 +1,309 @@
+"""Precomputed action feed for /api/dashboard/action-feed.
+
+The feed joins Contacts, Companies, Deals, FollowUps, Interactions and
+Notifications. Rather than redo that join on every dashboard load,
+`action_feed_snapshot` keeps the last result keyed on each tab's
+SheetService.generation (plus today's date, since the queues are
+date-relative). A request is always answered from the latest snapshot; when
+that key has moved it also starts one rebuild in a worker thread, which the
+next request sees. Only the very first request, and callers that pass
+`wait`, wait for a build. Nothing runs between requests, so an idle instance
+makes no Sheets reads.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from app.helpers import contact_display_name, days_ago_label, today_str
+from app.services.indexes import CLOSED_STAGES, ActivityIndex, EngagementIndex, PipelineView, interaction_time
+from app.services.sheet_service import (
+    companies_sheet,
+    contacts_sheet,
+    deals_sheet,
+    follow_ups_sheet,
+    interactions_sheet,
+    notifications_sheet,
+    read_lock,
+)
+
+logger = logging.getLogger(__name__)
+
+SOURCES = (
+    contacts_sheet,
+    companies_sheet,
+    deals_sheet,
+    follow_ups_sheet,
+    interactions_sheet,
+    notifications_sheet,
+)
+
+
+def build_action_feed(now: datetime | None = None) -> dict:
+    """Smart queues: surfaces who needs attention right now and why. A full
+    join over six tabs — serve it through action_feed_snapshot, not per request.
+    Callers on a worker thread hold read_lock(*SOURCES) so writes can't patch
+    the views mid-build."""
+    now = now or datetime.now(timezone.utc)
+    today = today_str()
+    now_ts = now.timestamp()
+    week_ago = now_ts - 7 * 86400
+    two_weeks_ago = now_ts - 14 * 86400
+    end_of_week = (now + timedelta(days=(6 - now.weekday()))).strftime("%Y-%m-%d")
+
+    contacts = contacts_sheet.get_all()
+    pending = {"status": "pending"}
+    pending_follow_ups = follow_ups_sheet.get_all(pending)
+
+    def contact_for(contact_id: str) -> dict | None:
+        return contacts_sheet.get_by_id(contact_id) if contact_id else None
+
+    def company_name_for(contact: dict) -> str:
+        cid = contact.get("company_id", "")
+        return ((companies_sheet.get_by_id(cid) if cid else None) or {}).get("name", "")
+
+    # --- Stats ---
+    active_contacts = [c for c in contacts if c.get("status", "") != "archived"]
+    in_conversation = [c for c in contacts if c.get("engagement_stage") in ("active", "engaged")]
+    follow_ups_this_week = follow_ups_sheet.range_query("due_date", hi=end_of_week, include_hi=True, where=pending)
+    pipeline = deals_sheet.view(PipelineView)
+
+    stats = {
+        "total_active_contacts": len(active_contacts),
+        "in_conversation": len(in_conversation),
+        "follow_ups_this_week": len(follow_ups_this_week),
+        "deals_in_pipeline": pipeline.open_count(),
+        "pipeline_value": pipeline.open_value(),
+    }
+
+    # --- Action Required: overdue + due today ---
+    def follow_up_item(f: dict) -> dict:
+        c = contact_for(f.get("contact_id", "")) or {}
+        return {
+            "id": f.get("id", ""),
+            "contact_id": f.get("contact_id", ""),
+            "contact_name": contact_display_name(c),
+            "company_name": company_name_for(c),
+            "title": f.get("title", ""),
+            "due_date": f.get("due_date", ""),
+            "due_time": f.get("due_time", ""),
+        }
+
+    overdue = follow_ups_sheet.range_query("due_date", hi=today, where=pending)
+    due_today = follow_ups_sheet.range_query("due_date", today, today, include_hi=True, where=pending)
+    due_today.sort(key=lambda f: f.get("due_time", "") or "99:99")
+
+    action_required = {
+        "overdue_follow_ups": [follow_up_item(f) for f in overdue[:15]],
+        "due_today": [follow_up_item(f) for f in due_today[:15]],
+        "overdue_total": len(overdue),
+        "due_today_total": len(due_today),
+    }
+
+    # --- Momentum: inbound recent + engaged-no-follow-up ---
+    activity = interactions_sheet.view(ActivityIndex)
+    engagement = interactions_sheet.view(EngagementIndex)
+
+    # Most recent inbound per contact, if within the last 7 days, newest first
+    inbound_unique: list[dict] = []
+    for cid in activity.contact_ids():
+        at = activity.last_at(cid, "inbound")
+        if at is not None and at >= week_ago:
+            inbound_unique.append((at, activity.last(cid, "inbound")))
+    inbound_unique.sort(key=lambda pair: pair[0], reverse=True)
+
+    def contact_item(c: dict, reason: str) -> dict:
+        last_ix = activity.last(c.get("id", ""))
+        last_date = interaction_time(last_ix)[:10] if last_ix else ""
+        return {
+            "id": c.get("id", ""),
+            "name": contact_display_name(c),
+            "company_name": company_name_for(c),
+            "role": c.get("role", ""),
+            "engagement_stage": c.get("engagement_stage", ""),
+            "last_interaction_date": last_date,
+            "engagement_score": round(engagement.score(c.get("id", ""), now_ts), 1),
+            "reason": reason,
+        }
+
+    # Inbound recent contacts
+    inbound_contacts: list[dict] = []
+    for at, ix in inbound_unique[:10]:
+        c = contact_for(ix.get("contact_id", ""))
+        if c:
+            label = days_ago_label(at, now_ts)
+            ix_type = ix.get("type", "message")
+            reason = f"Replied via {ix_type} {label}".strip()
+            inbound_contacts.append(contact_item(c, reason))
+
+    # Engaged in last 7d but no pending follow-up
+    contacts_with_pending_fu = {f.get("contact_id") for f in pending_follow_ups}
+    engaged_no_fu: list[dict] = []
+    for cid in activity.contact_ids():
+        occurred = activity.last_at(cid)
+        if occurred >= week_ago and cid not in contacts_with_pending_fu:
+            c = contact_for(cid)
+            if c and c.get("engagement_stage") not in ("new", ""):
+                label = days_ago_label(occurred, now_ts)
+                engaged_no_fu.append(contact_item(c, f"Active {label}, no follow-up scheduled"))
+
+    # Most engaged first: they are the likeliest to respond to a follow-up.
+    engaged_no_fu.sort(key=lambda x: x["engagement_score"], reverse=True)
+
+    momentum = {
+        "inbound_recent": inbound_contacts[:10],
+        "no_follow_up_scheduled": engaged_no_fu[:10],
+        "inbound_recent_total": len(inbound_unique),
+        "no_follow_up_scheduled_total": len(engaged_no_fu),
+    }
+
+    # --- At Risk: going cold + stale deals ---
+    going_cold: list[dict] = []
+    for c in contacts:
+        if c.get("engagement_stage") not in ("active", "engaged", "nurturing"):
+            continue
+        cid = c.get("id", "")
+        occurred = activity.last_at(cid)
+        if occurred is not None:
+            if occurred < two_weeks_ago:
+                label = days_ago_label(occurred, now_ts)
+                going_cold.append(contact_item(c, f"No interaction for {label}"))
+        else:
+            # Has engagement stage but zero interactions — also at risk
+            created = contacts_sheet.epoch(c, "created_at")
+            if created is not None and created < two_weeks_ago:
+                going_cold.append(contact_item(c, "No interactions recorded"))
+
+    # Of the cold relationships, the ones with the most engagement left are
+    # worth saving first.
+    going_cold.sort(key=lambda x: x["engagement_score"], reverse=True)
+
+    stale_deals_list: list[dict] = []
+    for d in deals_sheet.range_query("updated_at", hi=two_weeks_ago):
+        if d.get("stage") not in CLOSED_STAGES:
+            c = contact_for(d.get("contact_id", "")) or {}
+            days_stale = int((now_ts - deals_sheet.epoch(d, "updated_at")) // 86400)
+            stale_deals_list.append({
+                "id": d.get("id", ""),
+                "title": d.get("title", ""),
+                "contact_name": contact_display_name(c),
+                "company_name": company_name_for(c),
+                "stage": d.get("stage", ""),
+                "value": float(d.get("value") or 0),
+                "days_stale": days_stale,
+            })
+
+    stale_deals_list.sort(key=lambda x: x.get("days_stale", 0), reverse=True)
+
+    at_risk = {
+        "going_cold": going_cold[:10],
+        "stale_deals": stale_deals_list[:10],
+        "going_cold_total": len(going_cold),
+        "stale_deals_total": len(stale_deals_list),
+    }
+
+    # --- Ready to Reach Out: new contacts with no interactions ---
+    new_contacts: list[dict] = []
+    for c in contacts:
+        if c.get("engagement_stage", "new") == "new" and not activity.count(c.get("id", "")):
+            if c.get("status", "") != "archived":
+                new_contacts.append(contact_item(c, "No outreach yet"))
+
+    new_contacts.sort(key=lambda x: x.get("name", ""))
+
+    ready_to_reach_out = {
+        "new_contacts": new_contacts[:20],
+        "new_contacts_total": len(new_contacts),
+    }
+
+    # --- Notifications: pending deal suggestions, etc. ---
+    pending_notifications = notifications_sheet.get_all({"status": "pending"})
+    notification_items = []
+    for n in pending_notifications:
+        c = contact_for(n.get("contact_id", "")) or {}
+        notification_items.append({
+            **n,
+            "contact_name": contact_display_name(c),
+            "company_name": company_name_for(c),
+        })
+
+    notifications = {
+        "items": notification_items[:15],
+        "total": len(pending_notifications),
+    }
+
+    return {
+        "stats": stats,
+        "action_required": action_required,
+        "notifications": notifications,
+        "momentum": momentum,
+        "at_risk": at_risk,
+        "ready_to_reach_out": ready_to_reach_out,
+    }
+
+
+def _source_key() -> tuple:
+    return (today_str(), *(sheet.generation for sheet in SOURCES))
+
+
+class ActionFeedSnapshot:
+    """Latest build_action_feed() result and the source key it was built from."""
+
+    def __init__(self) -> None:
+        self._feed: dict | None = None
+        self._key: tuple | None = None
+        self._computed_at = ""
+        self._task: asyncio.Future | None = None
+
+    def _compute(self) -> None:
+        # Reading each tab refills any expired cache, so generations reflect
+        # writes made by other processes too. The refill happens before the
+        # locks are taken; the build itself only touches cached data.
+        for sheet in SOURCES:
+            sheet.get_all()
+        with read_lock(*SOURCES):
+            key = _source_key()
+            if key == self._key:
+                return
+            feed = build_action_feed()
+        self._feed, self._key = feed, key
+        self._computed_at = datetime.now(timezone.utc).isoformat()
+
+    def is_current(self) -> bool:
+        """True when no source tab has changed (as far as this process knows)
+        since the snapshot was built."""
+        return self._feed is not None and self._key == _source_key()
+
+    def refresh(self) -> asyncio.Future:
+        """Recompute in a worker thread; concurrent callers share one run."""
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = asyncio.ensure_future(asyncio.to_thread(self._compute))
+            self._task.add_done_callback(_log_failure)
+        return self._task
+
+    async def get(self, wait: bool = False) -> dict:
+        """The latest snapshot, served as is while a single rebuild runs behind
+        the response if a source tab has changed — so a write never makes a
+        dashboard load wait for the join. The refresh also re-checks the tab
+        caches, so other processes' writes show on a later call. Only a cold
+        start waits for the first build. `wait` (used right after a mutation)
+        blocks until the snapshot reflects the caller's writes, including
+        over a rebuild already in flight from before them."""
+        if self._feed is None:
+            await self.refresh()
+        elif wait and not self.is_current():
+            await self.refresh()
+            if not self.is_current():
+                await self.refresh()
+        else:
+            self.refresh()
+        return {**self._feed, "computed_at": self._computed_at}
+
+
+def _log_failure(task: asyncio.Future) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Action feed refresh failed", exc_info=task.exception())
+
+
+action_feed_snapshot = ActionFeedSnapshot()
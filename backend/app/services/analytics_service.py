@@ -0,0 +1,301 @@
+"""Ad-hoc group-by / filter / aggregate queries over CRM tabs (/api/analytics).
+
+Each tab is turned into a ColumnFrame — one NumPy array per column — the first
+time it is queried after its snapshot changes, and every query runs as array
+operations over those columns rather than a Python loop over dicts:
+
+    run_query("deals", group_by=["stage", "created_at:month"],
+              metrics=[("sum", "value"), ("count", "")])
+
+Dimensions are a column name, a date column bucketed by day/week/month/year
+("occurred_at:week"), or a contact attribute on tabs carrying contact_id
+("contact.segment"). Results are cached keyed on the query and the generation
+of every tab it read, so a repeated dashboard question is a dict lookup until
+one of those tabs is written.
+"""
+
+import json
+import threading
+
+import numpy as np
+from cachetools import LRUCache
+
+from app.services.sheet_service import (
+    SheetService,
+    companies_sheet,
+    contacts_sheet,
+    deals_sheet,
+    follow_ups_sheet,
+    interactions_sheet,
+    parse_epoch,
+)
+
+TABS: dict[str, SheetService] = {
+    "contacts": contacts_sheet,
+    "companies": companies_sheet,
+    "deals": deals_sheet,
+    "interactions": interactions_sheet,
+    "follow_ups": follow_ups_sheet,
+}
+
+BUCKETS = ("day", "week", "month", "year")
+METRICS = ("count", "sum", "avg", "min", "max")
+
+_DAY = 86400
+
+
+class AnalyticsError(ValueError):
+    """A query naming an unknown tab, column, bucket or operator."""
+
+
+class ColumnFrame:
+    """Column arrays for one tab snapshot: every column as an array of strings,
+    with float views (numbers, epoch seconds for date columns) built lazily."""
+
+    def __init__(self, sheet: SheetService, records: list[dict]):
+        self.sheet = sheet
+        self.size = len(records)
+        self._records = records
+        self._text: dict[str, np.ndarray] = {}
+        self._numbers: dict[str, np.ndarray] = {}
+
+    def has(self, column: str) -> bool:
+        return column in self.sheet.columns
+
+    def text(self, column: str) -> np.ndarray:
+        arr = self._text.get(column)
+        if arr is None:
+            arr = np.array([r.get(column, "") for r in self._records], dtype=object)
+            self._text[column] = arr
+        return arr
+
+    def numbers(self, column: str) -> np.ndarray:
+        """Floats for `column`; NaN where blank or unparseable. Date columns come
+        from the sheet's epoch shadow columns, so they are never re-parsed here."""
+        arr = self._numbers.get(column)
+        if arr is None:
+            if column in self.sheet.date_fields:
+                values = [self.sheet.epoch(r, column) for r in self._records]
+            else:
+                values = [_to_float(r.get(column, "")) for r in self._records]
+            arr = np.array([np.nan if v is None else v for v in values], dtype=float)
+            self._numbers[column] = arr
+        return arr
+
+
+def _to_float(value: str) -> float | None:
+    try:
+        return float(str(value).replace(",", ""))
+    except ValueError:
+        return None
+
+
+_frames: dict[str, tuple[int, ColumnFrame]] = {}
+_results: LRUCache = LRUCache(maxsize=256)
+_lock = threading.Lock()
+
+
+def column_frame(tab: str) -> ColumnFrame:
+    """The tab's ColumnFrame, rebuilt only when the sheet's generation moves."""
+    sheet = TABS[tab]
+    sheet.get_all()  # refill an expired cache first so the generation is current
+    generation = sheet.generation
+    cached = _frames.get(tab)
+    if cached and cached[0] == generation:
+        return cached[1]
+    # Re-read after taking the generation: the records are at least that new, so a
+    # write racing the build can only force an extra rebuild, never a stale frame.
+    frame = ColumnFrame(sheet, sheet.get_all())
+    with _lock:
+        _frames[tab] = (generation, frame)
+    return frame
+
+
+def bucket_labels(epochs: np.ndarray, unit: str) -> np.ndarray:
+    """Label each epoch with its UTC day/week/month/year ('' where NaN). Weeks
+    start on Monday and are labelled by that Monday's date."""
+    valid = ~np.isnan(epochs)
+    days = np.zeros(len(epochs), dtype="int64")
+    days[valid] = np.floor(epochs[valid] / _DAY).astype("int64")
+    if unit == "week":
+        days -= (days + 3) % 7  # 1970-01-01 was a Thursday
+    stamps = days.astype("datetime64[D]")
+    if unit == "month":
+        stamps = stamps.astype("datetime64[M]")
+    elif unit == "year":
+        stamps = stamps.astype("datetime64[Y]")
+    labels = stamps.astype(str).astype(object)
+    labels[~valid] = ""
+    return labels
+
+
+def _dimension(tab: str, frame: ColumnFrame, spec: str, frames: dict[str, ColumnFrame]) -> np.ndarray:
+    """Per-row labels for one group_by entry."""
+    column, _, unit = spec.partition(":")
+    if column.startswith("contact."):
+        attr = column.removeprefix("contact.")
+        if tab == "contacts" or not frame.has("contact_id"):
+            raise AnalyticsError(f"{tab} rows have no contact to take '{attr}' from")
+        contacts = frames["contacts"]
+        if not contacts.has(attr):
+            raise AnalyticsError(f"Unknown contacts column '{attr}'")
+        lookup = dict(zip(contacts.text("id"), contacts.text(attr)))
+        return np.array([lookup.get(cid, "") for cid in frame.text("contact_id")], dtype=object)
+    if not frame.has(column):
+        raise AnalyticsError(f"Unknown {tab} column '{column}'")
+    if not unit:
+        return frame.text(column)
+    if unit not in BUCKETS:
+        raise AnalyticsError(f"Unknown bucket '{unit}' (use one of {', '.join(BUCKETS)})")
+    if column not in frame.sheet.date_fields:
+        raise AnalyticsError(f"'{column}' is not a date column")
+    return bucket_labels(frame.numbers(column), unit)
+
+
+def _is_number(value: object) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _equals(frame: ColumnFrame, column: str, values: list) -> np.ndarray:
+    """Rows whose cell equals any of `values`. Numeric values compare as
+    numbers, so 5000 matches the cells '5000', '5,000' and '5000.0'; strings
+    compare as the cell text."""
+    texts = [str(v) for v in values if not _is_number(v)]
+    numbers = [float(v) for v in values if _is_number(v)]
+    hit = np.isin(frame.text(column), texts) if texts else np.zeros(frame.size, dtype=bool)
+    if numbers:
+        hit |= np.isin(frame.numbers(column), numbers)
+    return hit
+
+
+def _mask(tab: str, frame: ColumnFrame, filters: list[tuple[str, str, object]]) -> np.ndarray:
+    """Boolean row mask for the AND of every (column, op, value) filter. Ordering
+    ops compare dates as instants and other columns as numbers; equality ops
+    do the same for numeric values and compare text otherwise."""
+    mask = np.ones(frame.size, dtype=bool)
+    for column, op, value in filters:
+        if not frame.has(column):
+            raise AnalyticsError(f"Unknown {tab} column '{column}'")
+        if op in ("eq", "ne"):
+            hit = _equals(frame, column, [value])
+        elif op in ("in", "not_in"):
+            hit = _equals(frame, column, value if isinstance(value, list) else [value])
+        elif op in ("gt", "gte", "lt", "lte"):
+            if column in frame.sheet.date_fields:
+                bound = value if isinstance(value, (int, float)) else parse_epoch(str(value))
+            else:
+                bound = _to_float(value)
+            if bound is None:
+                raise AnalyticsError(f"Cannot compare '{column}' with {value!r}")
+            numbers = frame.numbers(column)
+            with np.errstate(invalid="ignore"):
+                hit = {"gt": numbers > bound, "gte": numbers >= bound,
+                       "lt": numbers < bound, "lte": numbers <= bound}[op]
+        else:
+            raise AnalyticsError(f"Unknown filter op '{op}'")
+        mask &= ~hit if op in ("ne", "not_in") else hit
+    return mask
+
+
+def _aggregate(codes: np.ndarray, groups: int, op: str, values: np.ndarray | None) -> np.ndarray:
+    """One metric per group from the row → group `codes`. NaN values are skipped;
+    a group with nothing to aggregate yields NaN (None in the result)."""
+    if op == "count":
+        return np.bincount(codes, minlength=groups).astype(float)
+    present = ~np.isnan(values)
+    counts = np.bincount(codes[present], minlength=groups)
+    if op in ("sum", "avg"):
+        sums = np.bincount(codes[present], weights=values[present], minlength=groups)
+        if op == "sum":
+            return sums
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts
+    fill, reducer = (np.inf, np.minimum) if op == "min" else (-np.inf, np.maximum)
+    out = np.full(groups, fill)
+    reducer.at(out, codes[present], values[present])
+    out[counts == 0] = np.nan
+    return out
+
+
+def _metric_name(op: str, field: str) -> str:
+    return op if op == "count" else f"{op}_{field}"
+
+
+def run_query(
+    tab: str,
+    group_by: list[str] | None = None,
+    metrics: list[tuple[str, str]] | None = None,
+    filters: list[tuple[str, str, object]] | None = None,
+) -> dict:
+    """Filter `tab`, group it by each `group_by` dimension and compute each
+    (op, field) metric per group. With no group_by the whole (filtered) tab is
+    one group; with no metrics it is just a count. Rows come back ordered by
+    their group labels. Raises AnalyticsError on an invalid query."""
+    if tab not in TABS:
+        raise AnalyticsError(f"Unknown tab '{tab}' (use one of {', '.join(TABS)})")
+    group_by = list(group_by or [])
+    metrics = [tuple(m) for m in (metrics or [("count", "")])]
+    filters = [tuple(f) for f in (filters or [])]
+
+    frames = {tab: column_frame(tab)}
+    if any(spec.startswith("contact.") for spec in group_by):
+        frames["contacts"] = column_frame("contacts")
+    key = (
+        json.dumps([tab, group_by, metrics, filters], default=str),
+        tuple((name, f.sheet.generation) for name, f in sorted(frames.items())),
+    )
+    with _lock:
+        cached = _results.get(key)
+    if cached is not None:
+        return cached
+
+    frame = frames[tab]
+    for op, field in metrics:
+        if op not in METRICS:
+            raise AnalyticsError(f"Unknown metric '{op}' (use one of {', '.join(METRICS)})")
+        if op != "count" and not frame.has(field):
+            raise AnalyticsError(f"Unknown {tab} column '{field}'")
+
+    mask = _mask(tab, frame, filters)
+    labels = [_dimension(tab, frame, spec, frames)[mask] for spec in group_by]
+    rows_in = int(mask.sum())
+
+    # Factorise each dimension, then fold the per-dimension codes into one group
+    # code per row so every metric is a single bincount/ufunc pass.
+    uniques, codes = [], np.zeros(rows_in, dtype="int64")
+    for values in labels:
+        levels, inverse = np.unique(values.astype(str), return_inverse=True)
+        uniques.append(levels)
+        codes = codes * len(levels) + inverse
+    groups, codes = np.unique(codes, return_inverse=True)
+    codes = codes.reshape(-1)
+    if not group_by and rows_in == 0:
+        groups = np.zeros(1, dtype="int64")  # still one (empty) overall row
+
+    columns = {}
+    for op, field in metrics:
+        values = None if op == "count" else frame.numbers(field)[mask]
+        columns[_metric_name(op, field)] = _aggregate(codes, len(groups), op, values)
+
+    rows = []
+    for g, group_code in enumerate(groups):
+        row = {}
+        for spec, levels in zip(reversed(group_by), reversed(uniques)):
+            group_code, level = divmod(int(group_code), len(levels))
+            row[spec] = str(levels[level])
+        row = {spec: row[spec] for spec in group_by}
+        for name, agg in columns.items():
+            value = float(agg[g])
+            row[name] = None if np.isnan(value) else (int(value) if name == "count" else round(value, 2))
+        rows.append(row)
+
+    result = {
+        "tab": tab,
+        "group_by": group_by,
+        "metrics": [_metric_name(op, field) for op, field in metrics],
+        "matched": rows_in,
+        "rows": rows,
+    }
+    with _lock:
+        _results[key] = result
+    return result
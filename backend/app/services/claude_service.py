@@ -1,7 +1,8 @@
 import anthropic
 
 from app.config import settings
-from app.services.sheet_service import contacts_sheet, deals_sheet, interactions_sheet
+from app.services.contact_view_service import contact_360
+from app.services.sheet_service import deals_sheet
 
 
 def draft_email(
@@ -10,14 +11,11 @@ def draft_email(
     intent: str = "",
     tone: str = "professional",
 ) -> dict:
-    contact = contacts_sheet.get_by_id(contact_id)
-    if not contact:
-        raise ValueError("Contact not found")
-
     # Gather context
-    recent_interactions = interactions_sheet.get_all({"contact_id": contact_id})
-    recent_interactions.sort(key=lambda x: x.get("occurred_at", ""), reverse=True)
-    recent_interactions = recent_interactions[:5]
+    view = contact_360(contact_id, sections=("interactions",), limits={"interactions": 5})
+    if not view:
+        raise ValueError("Contact not found")
+    contact, recent_interactions = view["contact"], view["interactions"]
 
     deal = None
     if deal_id:
@@ -29,6 +27,8 @@ def draft_email(
         f"Role: {contact.get('role', '')}",
         f"Email: {contact.get('email', '')}",
     ]
+    if contact.get("company_name"):
+        context_parts.append(f"Company: {contact['company_name']}")
 
     if contact.get("notes"):
         context_parts.append(f"Notes: {contact['notes']}")
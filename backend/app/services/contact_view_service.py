@@ -0,0 +1,94 @@
+"""Contact 360: a contact with its company, deals, interactions and follow-ups.
+
+The contact page, the MCP get_contact_details tool and the email drafter all
+need the same joined view. `contact_360` assembles it in one call from the
+id and foreign-key indexes — company by id, deals and follow-ups by
+contact_id, interactions from the ActivityIndex timeline — so a caller makes
+one request instead of four or five, and no section scans its tab.
+"""
+
+from app.helpers import contact_display_name
+from app.services.indexes import ActivityIndex
+from app.services.sheet_service import (
+    companies_sheet,
+    contacts_sheet,
+    deals_sheet,
+    follow_ups_sheet,
+    interactions_sheet,
+)
+
+SECTIONS = ("company", "deals", "interactions", "follow_ups")
+LIST_SECTIONS = ("deals", "interactions", "follow_ups")
+
+
+def parse_fields(spec: str) -> dict[str, set[str]]:
+    """'first_name,deals.title,deals.stage' → {'contact': {...}, 'deals': {...}}.
+    Bare names project the contact; 'section.field' projects that section."""
+    fields: dict[str, set[str]] = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        section, _, name = item.rpartition(".")
+        fields.setdefault(section or "contact", set()).add(name)
+    return fields
+
+
+def _project(record: dict, keep: set[str] | None) -> dict:
+    if not keep:
+        return record
+    return {k: v for k, v in record.items() if k in keep or k == "id"}
+
+
+def contact_360(
+    contact_id: str,
+    sections: tuple[str, ...] = SECTIONS,
+    limits: dict[str, int | None] | None = None,
+    fields: dict[str, set[str]] | None = None,
+    follow_up_status: str = "",
+) -> dict | None:
+    """The joined view for one contact, or None if there is no such contact.
+
+    Deals come most recently updated first, interactions newest first and
+    follow-ups by due date and time; `limits` caps any of those lists while
+    `counts` still reports their full sizes. `fields` (see parse_fields)
+    keeps only the named fields, plus id, of the contact or a section."""
+    contact = contacts_sheet.get_by_id(contact_id)
+    if not contact:
+        return None
+    limits, fields = limits or {}, fields or {}
+
+    company = companies_sheet.get_by_id(contact["company_id"]) if contact.get("company_id") else None
+    joined = {
+        **contact,
+        "name": contact_display_name(contact, fallback=""),
+        "company_name": (company or {}).get("name", ""),
+    }
+    view = {"contact": _project(joined, fields.get("contact")), "counts": {}}
+    if "company" in sections:
+        view["company"] = _project(company, fields.get("company")) if company else None
+
+    if "deals" in sections:
+        deals = deals_sheet.get_related("contact_id", contact_id)
+        deals.sort(key=lambda d: d.get("updated_at", ""), reverse=True)
+        view["deals"], view["counts"]["deals"] = deals, len(deals)
+
+    if "interactions" in sections:
+        activity = interactions_sheet.view(ActivityIndex)
+        view["interactions"] = activity.recent(contact_id, limits.get("interactions"))
+        view["counts"]["interactions"] = activity.count(contact_id)
+
+    if "follow_ups" in sections:
+        follow_ups = follow_ups_sheet.get_related("contact_id", contact_id)
+        if follow_up_status:
+            follow_ups = [f for f in follow_ups if f.get("status") == follow_up_status]
+        follow_ups.sort(key=lambda f: (f.get("due_date", ""), f.get("due_time", "") or "99:99"))
+        view["follow_ups"], view["counts"]["follow_ups"] = follow_ups, len(follow_ups)
+
+    for section in LIST_SECTIONS:
+        if section not in view:
+            continue
+        limit = limits.get(section)
+        rows = view[section] if limit is None else view[section][:limit]
+        view[section] = [_project(r, fields.get(section)) for r in rows]
+    return view
@@ -0,0 +1,365 @@
+"""Whole-book duplicate detection and merge for Contacts and Companies.
+
+Create-time dedup (helpers.find_duplicate_contact) only guards new rows.
+Duplicates that predate it — or that social capture minted as
+`{platform}_organic` contacts before anyone linked the handle — are found here
+with sorted-neighbourhood blocking: every record emits a few blocking keys
+(name root, email, handle / LinkedIn URL; for companies normalised name and
+website domain), the keys are sorted once, and a record is only compared with
+the few records sorted next to it. That is O(n log n), not all-pairs.
+
+Merging keeps one survivor per group, backfills it from the others, re-points
+Interactions, Deals, FollowUps and Notifications with one batched write per
+tab, then archives (contacts) or removes (companies) the duplicates.
+"""
+
+import json
+from difflib import SequenceMatcher
+from typing import Callable, NamedTuple
+
+from app.helpers import (
+    build_contact_enrichment,
+    contact_display_name,
+    email_domain,
+    name_key,
+    normalise_company_name,
+    normalise_handle,
+    normalise_linkedin_url,
+    parse_platform_handles,
+    website_domain,
+)
+from app.services.sheet_service import (
+    companies_sheet,
+    contacts_sheet,
+    deals_sheet,
+    follow_ups_sheet,
+    interactions_sheet,
+    notifications_sheet,
+)
+
+# How many sorted neighbours each record is compared with, per blocking key.
+WINDOW = 5
+
+# Near-identical names only count when both contacts share an email domain.
+SIMILAR_NAME_RATIO = 0.9
+
+_REASON_STRENGTH = {
+    reason: i for i, reason in
+    enumerate(["linkedin_url", "email", "handle", "website", "name", "similar_name"])
+}
+
+
+class _ContactIdentity(NamedTuple):
+    linkedin: str
+    email: str
+    domain: str
+    handles: frozenset
+    name: tuple[str, str]
+
+
+def _handle_key(handle: str) -> str:
+    """LinkedIn handles are stored as profile URLs; fold them like linkedin_url."""
+    if "linkedin.com" in str(handle).lower():
+        return normalise_linkedin_url(str(handle))
+    return normalise_handle(handle)
+
+
+def _contact_identity(c: dict) -> _ContactIdentity:
+    email = (c.get("email", "") or "").strip().lower()
+    linkedin = normalise_linkedin_url(c.get("linkedin_url", ""))
+    handles = {_handle_key(h) for h in parse_platform_handles(c.get("platform_handles", "")).values()}
+    if linkedin:
+        handles.add(linkedin)
+    handles.discard("")
+    return _ContactIdentity(
+        linkedin=linkedin,
+        email=email,
+        domain=email_domain(email),
+        handles=frozenset(handles),
+        name=name_key(c.get("first_name", ""), c.get("last_name", "")),
+    )
+
+
+def _contact_blocking_keys(ident: _ContactIdentity) -> list[str]:
+    first, last = ident.name
+    keys = []
+    if first and last:
+        keys.append(f"name:{last} {first}")
+    if ident.email:
+        keys.append(f"email:{ident.domain} {ident.email}")
+    keys.extend(f"handle:{h}" for h in ident.handles)
+    return keys
+
+
+def _contact_match(a: _ContactIdentity, b: _ContactIdentity) -> str | None:
+    """Why two contacts are the same person, or None. Hard identifiers decide
+    outright; names only count when no hard identifier contradicts them."""
+    if a.linkedin and a.linkedin == b.linkedin:
+        return "linkedin_url"
+    if a.email and a.email == b.email:
+        return "email"
+    if a.handles & b.handles:
+        return "handle"
+    if (a.email and b.email) or (a.linkedin and b.linkedin):
+        return None
+    if a.name[0] and a.name[1] and a.name == b.name:
+        return "name"
+    if (a.domain and a.domain == b.domain and a.name[0] and b.name[0]
+            and SequenceMatcher(None, " ".join(a.name), " ".join(b.name)).ratio() >= SIMILAR_NAME_RATIO):
+        return "similar_name"
+    return None
+
+
+def _sorted_neighbourhood(
+    keyed: list[tuple[str, str]],
+    compare: Callable[[str, str], str | None],
+    window: int = WINDOW,
+) -> list[tuple[str, str, str]]:
+    """Sort (blocking key, id) pairs and compare each id with the next window-1
+    ids. Returns (id_a, id_b, reason) for every matching pair."""
+    keyed.sort()
+    seen: set[tuple[str, str]] = set()
+    matches = []
+    for i, (_, a) in enumerate(keyed):
+        for _, b in keyed[i + 1:i + window]:
+            if a == b:
+                continue
+            pair = (a, b) if a < b else (b, a)
+            if pair in seen:
+                continue
+            seen.add(pair)
+            reason = compare(a, b)
+            if reason:
+                matches.append((pair[0], pair[1], reason))
+    return matches
+
+
+def _group(
+    matches: list[tuple[str, str, str]],
+    signature: Callable[[str], frozenset],
+) -> list[tuple[list[str], set[str]]]:
+    """Union matched pairs into groups: [(ids, reasons)].
+
+    Each record has a signature of hard identifiers (emails, domains). Two
+    groups are only joined when their signatures overlap or one is empty, so a
+    weak link — a bare name — can't chain two different people together.
+    Stronger reasons are unioned first so they claim the group before names do."""
+    parent: dict[str, str] = {}
+    sigs: dict[str, frozenset] = {}
+
+    def find(x: str) -> str:
+        if x not in parent:
+            parent[x] = x
+            sigs[x] = signature(x)
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    groups: dict[str, tuple[list[str], set[str]]] = {}
+    joined = []
+    for a, b, reason in sorted(matches, key=lambda m: _REASON_STRENGTH.get(m[2], len(_REASON_STRENGTH))):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            if sigs[ra] and sigs[rb] and not sigs[ra] & sigs[rb]:
+                continue
+            parent[ra] = rb
+            sigs[rb] = sigs[ra] | sigs[rb]
+        joined.append((a, b, reason))
+
+    for a, b, reason in joined:
+        ids, reasons = groups.setdefault(find(a), ([], set()))
+        for x in (a, b):
+            if x not in ids:
+                ids.append(x)
+        reasons.add(reason)
+    return list(groups.values())
+
+
+def find_contact_duplicates() -> list[dict]:
+    """Propose merge groups over active contacts. The survivor is the oldest
+    contact, preferring one not auto-created by social capture."""
+    contacts = [c for c in contacts_sheet.get_all() if c.get("status") != "archived"]
+    position = {c["id"]: i for i, c in enumerate(contacts)}
+    by_id = {c["id"]: c for c in contacts}
+    idents = {c["id"]: _contact_identity(c) for c in contacts}
+
+    keyed = [(key, cid) for cid, ident in idents.items() for key in _contact_blocking_keys(ident)]
+    matches = _sorted_neighbourhood(keyed, lambda a, b: _contact_match(idents[a], idents[b]))
+
+    def survivor_rank(cid: str):
+        c = by_id[cid]
+        return (c.get("source", "").endswith("_organic"), c.get("created_at", "") or "~", position[cid])
+
+    def signature(cid: str) -> frozenset:
+        ident = idents[cid]
+        return frozenset(x for x in (ident.email, ident.linkedin) if x)
+
+    proposals = []
+    for ids, reasons in _group(matches, signature):
+        ids.sort(key=survivor_rank)
+        proposals.append({
+            "keep": ids[0],
+            "merge": ids[1:],
+            "reasons": sorted(reasons),
+            "records": [{
+                "id": cid,
+                "name": contact_display_name(by_id[cid]),
+                "email": by_id[cid].get("email", ""),
+                "company_id": by_id[cid].get("company_id", ""),
+                "source": by_id[cid].get("source", ""),
+                "created_at": by_id[cid].get("created_at", ""),
+            } for cid in ids],
+        })
+    return proposals
+
+
+def find_company_duplicates() -> list[dict]:
+    """Propose merge groups over companies: same normalised name (unless their
+    websites disagree) or same website domain. The oldest company survives."""
+    companies = companies_sheet.get_all()
+    position = {c["id"]: i for i, c in enumerate(companies)}
+    by_id = {c["id"]: c for c in companies}
+    names = {c["id"]: normalise_company_name(c.get("name", "")) for c in companies}
+    domains = {c["id"]: website_domain(c.get("website", "")) for c in companies}
+
+    def compare(a: str, b: str) -> str | None:
+        if domains[a] and domains[a] == domains[b]:
+            return "website"
+        if domains[a] and domains[b]:
+            return None
+        if names[a] and names[a] == names[b]:
+            return "name"
+        return None
+
+    keyed = [(f"name:{names[cid]}", cid) for cid in by_id if names[cid]]
+    keyed += [(f"domain:{domains[cid]}", cid) for cid in by_id if domains[cid]]
+    matches = _sorted_neighbourhood(keyed, compare)
+
+    proposals = []
+    for ids, reasons in _group(matches, lambda cid: frozenset(filter(None, [domains[cid]]))):
+        ids.sort(key=lambda cid: (by_id[cid].get("created_at", "") or "~", position[cid]))
+        proposals.append({
+            "keep": ids[0],
+            "merge": ids[1:],
+            "reasons": sorted(reasons),
+            "records": [{
+                "id": cid,
+                "name": by_id[cid].get("name", ""),
+                "website": by_id[cid].get("website", ""),
+                "created_at": by_id[cid].get("created_at", ""),
+            } for cid in ids],
+        })
+    return proposals
+
+
+def _resolve_remap(groups: list[dict], known: set[str]) -> dict[str, str]:
+    """duplicate id → survivor id, following chains (a→b, b→c gives a→c)."""
+    remap: dict[str, str] = {}
+    for g in groups:
+        keep = g.get("keep", "")
+        if keep not in known:
+            continue
+        for dup in g.get("merge", []):
+            if dup != keep and dup in known and dup not in remap:
+                remap[dup] = keep
+    for dup in list(remap):
+        target = remap[dup]
+        hops = 0
+        while target in remap and hops < len(remap):
+            target = remap[target]
+            hops += 1
+        remap[dup] = target
+    return {dup: keep for dup, keep in remap.items() if dup != keep}
+
+
+def _repoint(sheet, field: str, remap: dict[str, str]) -> int:
+    """Rewrite `field` on every row that references a merged id, in one batch."""
+    updates = {
+        r["id"]: {field: remap[r[field]]}
+        for r in sheet.get_all()
+        if r.get(field) in remap
+    }
+    return len(sheet.bulk_update(updates))
+
+
+def merge_contacts(groups: list[dict]) -> dict:
+    """Merge each {"keep": id, "merge": [ids]} group: backfill the survivor's blank
+    fields, union handles and tags, re-point every child row, archive the rest."""
+    contacts = {c["id"]: c for c in contacts_sheet.get_all()}
+    remap = _resolve_remap(groups, set(contacts))
+    if not remap:
+        return {"merged": 0, "interactions": 0, "deals": 0, "follow_ups": 0, "notifications": 0}
+
+    result = {
+        "merged": len(remap),
+        "interactions": _repoint(interactions_sheet, "contact_id", remap),
+        "deals": _repoint(deals_sheet, "contact_id", remap),
+        "follow_ups": _repoint(follow_ups_sheet, "contact_id", remap),
+        "notifications": _repoint(notifications_sheet, "contact_id", remap),
+    }
+
+    updates: dict[str, dict] = {}
+    for dup_id, keep_id in remap.items():
+        keep = {**contacts[keep_id], **updates.get(keep_id, {})}
+        dup = contacts[dup_id]
+        incoming = {k: v for k, v in dup.items()
+                    if k not in ("platform_handles", "tags", "notes", "status", "updated_at")}
+        survivor = updates.setdefault(keep_id, {})
+        survivor.update(build_contact_enrichment(keep, incoming))
+
+        handles = parse_platform_handles(keep.get("platform_handles", ""))
+        for platform, handle in parse_platform_handles(dup.get("platform_handles", "")).items():
+            handles.setdefault(platform, handle)
+        if handles:
+            survivor["platform_handles"] = json.dumps(handles)
+
+        tags = [t.strip() for t in keep.get("tags", "").split(",") if t.strip()]
+        for tag in (t.strip() for t in dup.get("tags", "").split(",")):
+            if tag and tag not in tags:
+                tags.append(tag)
+        if tags:
+            survivor["tags"] = ",".join(tags)
+
+        note = f"Merged into {keep_id}"
+        updates[dup_id] = {
+            "status": "archived",
+            "notes": f"{dup.get('notes', '')}\n{note}".strip(),
+        }
+
+    for c in contacts.values():
+        ref = c.get("referral_contact_id", "")
+        if ref in remap and c["id"] not in remap:
+            updates.setdefault(c["id"], {})["referral_contact_id"] = remap[ref]
+
+    contacts_sheet.bulk_update({cid: data for cid, data in updates.items() if data})
+    return result
+
+
+def merge_companies(groups: list[dict]) -> dict:
+    """Merge each {"keep": id, "merge": [ids]} company group: backfill the
+    survivor's blank fields, re-point contacts, deals and notifications, then
+    remove the duplicate rows."""
+    companies = {c["id"]: c for c in companies_sheet.get_all()}
+    remap = _resolve_remap(groups, set(companies))
+    if not remap:
+        return {"merged": 0, "contacts": 0, "deals": 0, "notifications": 0}
+
+    result = {
+        "merged": len(remap),
+        "contacts": _repoint(contacts_sheet, "company_id", remap),
+        "deals": _repoint(deals_sheet, "company_id", remap),
+        "notifications": _repoint(notifications_sheet, "company_id", remap),
+    }
+
+    updates: dict[str, dict] = {}
+    for dup_id, keep_id in remap.items():
+        keep = {**companies[keep_id], **updates.get(keep_id, {})}
+        for field in ("industry", "website", "size", "notes"):
+            value = companies[dup_id].get(field, "")
+            if value and not (keep.get(field) or "").strip():
+                updates.setdefault(keep_id, {})[field] = value
+
+    companies_sheet.bulk_update(updates)
+    companies_sheet.bulk_delete(list(remap))
+    return result
@@ -0,0 +1,74 @@
+"""Today's digest: overdue and due-today follow-ups plus stale deals.
+
+The morning digest, Telegram /today, the dashboard summary and the MCP
+get_follow_ups tool all show the same few lists. `build_digest` reads
+follow-ups and deals from their date indexes and joins contact and company
+names onto every row through the sheets' id indexes, in one pass, instead of
+each caller looking contacts up one follow-up at a time.
+The follow-up lists are cached on the tabs' generations and today's date, so
+the callers share one build until something changes. Stale deals are picked
+on every call, against a cutoff taken then — one bisect of the updated_at
+index — so a long-running process never judges staleness by an old clock.
+"""
+
+import threading
+import time
+
+from app.helpers import contact_display_name, today_str
+from app.services.indexes import CLOSED_STAGES
+from app.services.sheet_service import companies_sheet, contacts_sheet, deals_sheet, follow_ups_sheet
+
+SOURCES = (follow_ups_sheet, deals_sheet, contacts_sheet, companies_sheet)
+
+STALE_DEAL_DAYS = 14
+
+
+def _joined(record: dict) -> dict:
+    contact = contacts_sheet.get_by_id(record.get("contact_id", ""))
+    company_id = record.get("company_id") or (contact or {}).get("company_id", "")
+    company = companies_sheet.get_by_id(company_id) if company_id else None
+    return {
+        **record,
+        "contact_name": contact_display_name(contact, fallback=""),
+        "company_name": (company or {}).get("name", ""),
+    }
+
+
+def _follow_ups() -> dict:
+    today = today_str()
+    # One index scan for everything due up to and including today
+    due = follow_ups_sheet.range_query("due_date", hi=today, include_hi=True, where={"status": "pending"})
+    overdue, due_today = [], []
+    for f in due:
+        (due_today if f.get("due_date", "")[:10] == today else overdue).append(_joined(f))
+    due_today.sort(key=lambda f: f.get("due_time", "") or "99:99")
+    return {"date": today, "overdue": overdue, "due_today": due_today}
+
+
+def _stale_deals(stale_days: int) -> list[dict]:
+    cutoff = time.time() - stale_days * 86400
+    return [_joined(d) for d in deals_sheet.range_query("updated_at", hi=cutoff)
+            if d.get("stage") not in CLOSED_STAGES]
+
+
+_cached: tuple[tuple, dict] | None = None
+_lock = threading.Lock()
+
+
+def build_digest(stale_days: int = STALE_DEAL_DAYS) -> dict:
+    """Overdue follow-ups (oldest first), today's follow-ups (by due time) and
+    open deals untouched for `stale_days` days as of now (oldest first), each
+    row carrying contact_name and company_name. The follow-up lists are shared
+    by every caller until one of the source tabs changes or the date rolls
+    over."""
+    global _cached
+    for sheet in SOURCES:
+        sheet.get_all()  # refill expired caches so the generations are current
+    key = (today_str(), *(sheet.generation for sheet in SOURCES))
+    if _cached and _cached[0] == key:
+        follow_ups = _cached[1]
+    else:
+        follow_ups = _follow_ups()
+        with _lock:
+            _cached = (key, follow_ups)
+    return {**follow_ups, "stale_deals": _stale_deals(stale_days), "stale_days": stale_days}
@@ -0,0 +1,111 @@
+"""Telegram fan-out for scheduler notifications.
+
+Every linked chat gets the same message, so a broadcast goes to all chats
+concurrently while staying inside Telegram's limits: at most GLOBAL_RATE
+messages a second across the bot and one message every PER_CHAT_INTERVAL
+seconds per chat. Several notifications raised together (e.g. reminders due
+in the same minute) are coalesced into as few messages per chat as fit
+Telegram's length cap. The recipient list is cached on the Users tab's
+generation instead of being re-read for every message.
+"""
+
+import asyncio
+import logging
+import time
+
+from app.services.sheet_service import users_sheet
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_RATE = 25  # messages/second; Telegram allows ~30 for a bot
+PER_CHAT_INTERVAL = 1.0  # seconds between messages to one chat
+MAX_MESSAGE_LENGTH = 4096
+
+
+class _Pacer:
+    """Hands out send slots at least `interval` seconds apart. Slots are claimed
+    without awaiting, so concurrent callers queue in call order."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def coalesce(texts: list[str], limit: int = MAX_MESSAGE_LENGTH) -> list[str]:
+    """Join texts, blank-line separated, into as few messages as fit `limit`.
+    A single text longer than the limit is sent on its own."""
+    return [message for message, _ in _pack(texts, limit)]
+
+
+def _pack(texts: list[str], limit: int = MAX_MESSAGE_LENGTH) -> list[tuple[str, list[int]]]:
+    """coalesce(), with the indexes of the texts each message carries."""
+    packed: list[tuple[str, list[int]]] = []
+    for i, text in enumerate(texts):
+        if packed and len(packed[-1][0]) + 2 + len(text) <= limit:
+            message, indexes = packed[-1]
+            packed[-1] = (message + "\n\n" + text, indexes + [i])
+        else:
+            packed.append((text, [i]))
+    return packed
+
+
+async def _telegram_send(chat_id: str, text: str) -> None:
+    from app.services.telegram_service import send_message
+    await send_message(chat_id, text)
+
+
+class TelegramDispatcher:
+    def __init__(self, send=None):
+        self._send = send or _telegram_send
+        self._global = _Pacer(1 / GLOBAL_RATE)
+        self._chats: dict[str, _Pacer] = {}
+        self._recipients: tuple[int, list[str]] | None = None
+
+    def recipients(self) -> list[str]:
+        """Telegram chat ids of every linked user, re-read only when Users changes."""
+        users = users_sheet.get_all()
+        generation = users_sheet.generation
+        if self._recipients is None or self._recipients[0] != generation:
+            chat_ids = [u["telegram_chat_id"] for u in users if u.get("telegram_chat_id")]
+            self._recipients = (generation, chat_ids)
+        return self._recipients[1]
+
+    async def _deliver(self, chat_id: str, packed: list[tuple[str, list[int]]]) -> set[int]:
+        """Send messages to one chat in order; returns the indexes of the
+        texts that went out."""
+        pacer = self._chats.setdefault(chat_id, _Pacer(PER_CHAT_INTERVAL))
+        delivered: set[int] = set()
+        for text, indexes in packed:
+            await pacer.wait()
+            await self._global.wait()
+            try:
+                await self._send(chat_id, text)
+                delivered.update(indexes)
+            except Exception as e:
+                logger.error(f"Failed to send Telegram message to {chat_id}: {e}")
+        return delivered
+
+    async def broadcast_many(self, texts: list[str]) -> set[int]:
+        """Send every text to every recipient, coalesced per chat. Returns the
+        indexes of the texts no recipient received — empty when everything
+        reached at least one chat, or when there is no one to send to."""
+        recipients = self.recipients()
+        if not texts or not recipients:
+            return set()
+        packed = _pack(texts, MAX_MESSAGE_LENGTH)
+        results = await asyncio.gather(*(self._deliver(c, packed) for c in recipients))
+        return set(range(len(texts))).difference(*results)
+
+    async def broadcast(self, text: str) -> bool:
+        """Send one text to every recipient; False if none received it."""
+        return not await self.broadcast_many([text])
+
+
+dispatcher = TelegramDispatcher()
@@ -0,0 +1,137 @@
+"""Weighted pipeline and expected revenue by month (/api/dashboard/forecast).
+
+Win probabilities come from a stage conversion matrix: over closed deals,
+M[s, t] is the share of deals that were seen in stage s and also reached stage
+t, so M[s, "won"] is the historical win rate from s. Stages a deal passed
+through come from the daily PipelineHistory snapshots plus its current stage.
+Rates are smoothed toward DEFAULT_WIN_RATES so a thin history doesn't swing the
+forecast. The matrix is cached on the Deals and PipelineHistory generations
+and rebuilt only when either tab changes.
+
+The forecast itself runs over the Deals column frame from analytics_service:
+value × win rate per open deal, summed per (currency, expected_close month) in
+one NumPy grouping pass. Deals whose expected_close has passed are rolled into
+the current month; deals without one land under "unscheduled".
+"""
+
+import threading
+
+import numpy as np
+
+from app.helpers import today_str
+from app.services.analytics_service import bucket_labels, column_frame
+from app.services.indexes import CLOSED_STAGES, DEAL_STAGES, PipelineHistoryView
+from app.services.sheet_service import deals_sheet, pipeline_history_sheet
+
+# Prior win probability per stage, used as-is with no history and blended with
+# observed rates as closed deals accumulate.
+DEFAULT_WIN_RATES = {
+    "lead": 0.1, "prospect": 0.2, "qualified": 0.3, "proposal": 0.5,
+    "negotiation": 0.7, "won": 1.0, "lost": 0.0,
+}
+# Weight of the prior, in closed deals: a stage needs about this many closed
+# deals through it before its observed rate counts for half.
+PRIOR_WEIGHT = 5
+
+_STAGE_INDEX = {stage: i for i, stage in enumerate(DEAL_STAGES)}
+_WON = _STAGE_INDEX["won"]
+
+
+class ConversionMatrix:
+    """Stage × stage reach matrix over closed deals and the smoothed win rate
+    for each stage."""
+
+    def __init__(self, visited: np.ndarray):
+        # visited: closed deals × stages, True where the deal was seen in the stage
+        self.closed = len(visited)
+        counts = visited.T.astype(float) @ visited.astype(float)  # both s and t
+        through = np.diag(counts)  # deals seen in s
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.matrix = np.where(through[:, None] > 0, counts / through[:, None], 0.0)
+        prior = np.array([DEFAULT_WIN_RATES[s] for s in DEAL_STAGES])
+        wins = counts[:, _WON]
+        self.win_rates = (wins + PRIOR_WEIGHT * prior) / (through + PRIOR_WEIGHT)
+        self.win_rates[_WON], self.win_rates[_STAGE_INDEX["lost"]] = 1.0, 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "stages": DEAL_STAGES,
+            "matrix": [[round(float(v), 3) for v in row] for row in self.matrix],
+            "closed_deals": self.closed,
+        }
+
+
+_cached: tuple[tuple[int, int], ConversionMatrix] | None = None
+_lock = threading.Lock()
+
+
+def conversion_matrix() -> ConversionMatrix:
+    """The current ConversionMatrix, rebuilt only when Deals or PipelineHistory
+    has changed since the last build."""
+    global _cached
+    history = pipeline_history_sheet.view(PipelineHistoryView)
+    deals = deals_sheet.get_all()
+    key = (deals_sheet.generation, pipeline_history_sheet.generation)
+    if _cached and _cached[0] == key:
+        return _cached[1]
+
+    seen = history.deal_stages()
+    closed = [d for d in deals if d.get("stage") in CLOSED_STAGES]
+    visited = np.zeros((len(closed), len(DEAL_STAGES)), dtype=bool)
+    for row, deal in enumerate(closed):
+        for stage in seen.get(deal.get("id", ""), set()) | {deal["stage"]}:
+            if stage in _STAGE_INDEX:
+                visited[row, _STAGE_INDEX[stage]] = True
+    matrix = ConversionMatrix(visited)
+    with _lock:
+        _cached = (key, matrix)
+    return matrix
+
+
+def forecast() -> dict:
+    """Open pipeline and its win-rate-weighted value per currency and month."""
+    matrix = conversion_matrix()
+    frame = column_frame("deals")
+
+    stages = frame.text("stage")
+    stage_codes = np.array([_STAGE_INDEX.get(s, -1) for s in stages], dtype="int64")
+    open_mask = (stage_codes >= 0) & ~np.isin(stages, list(CLOSED_STAGES))
+    values = np.nan_to_num(frame.numbers("value")[open_mask])
+    probability = matrix.win_rates[stage_codes[open_mask]]
+    weighted = values * probability
+    currencies = frame.text("currency")[open_mask]
+    currencies = np.where(currencies == "", "USD", currencies).astype(str)
+
+    months = bucket_labels(frame.numbers("expected_close")[open_mask], "month").astype(str)
+    this_month = today_str()[:7]
+    months = np.where(months == "", "unscheduled", np.where(months < this_month, this_month, months))
+
+    keys = np.char.add(np.char.add(currencies, "|"), months)
+    groups, codes = np.unique(keys, return_inverse=True)
+    codes = codes.reshape(-1)
+    count = np.bincount(codes, minlength=len(groups))
+    pipeline_sum = np.bincount(codes, weights=values, minlength=len(groups))
+    weighted_sum = np.bincount(codes, weights=weighted, minlength=len(groups))
+
+    by_month, totals = [], {}
+    for g, key in enumerate(groups):
+        currency, month = str(key).split("|", 1)
+        by_month.append({
+            "month": month,
+            "currency": currency,
+            "deals": int(count[g]),
+            "pipeline_value": round(float(pipeline_sum[g]), 2),
+            "weighted_value": round(float(weighted_sum[g]), 2),
+        })
+        total = totals.setdefault(currency, {"pipeline_value": 0.0, "weighted_value": 0.0})
+        total["pipeline_value"] = round(total["pipeline_value"] + float(pipeline_sum[g]), 2)
+        total["weighted_value"] = round(total["weighted_value"] + float(weighted_sum[g]), 2)
+    # "unscheduled" sorts after every YYYY-MM label
+    by_month.sort(key=lambda r: (r["month"], r["currency"]))
+
+    return {
+        "win_rates": {s: round(float(p), 3) for s, p in zip(DEAL_STAGES, matrix.win_rates)},
+        "conversion": matrix.as_dict(),
+        "by_month": by_month,
+        "totals": totals,
+    }
@@ -0,0 +1,719 @@
+"""Domain indexes over SheetService snapshots.
+
+Each index is a SheetView: built once from a tab's cached records and then
+patched by that tab's own writes, so hot lookups (social capture, dedup,
+entity resolution) stay O(1) however large the book grows. Fetch one with
+`<sheet>.view(IndexClass)`.
+"""
+
+import hashlib
+import heapq
+import json
+import re
+import time
+from bisect import bisect_left, bisect_right, insort
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+
+from app.helpers import (
+    name_key,
+    normalise_company_name,
+    normalise_handle,
+    normalise_linkedin_url,
+    parse_platform_handles,
+    website_domain,
+)
+from app.services.sheet_service import SheetView, parse_epoch
+
+
+class HandleIndex(SheetView):
+    """(platform, normalised handle) → contact ids, in sheet order, built from
+    each contact's platform_handles JSON."""
+
+    def reset(self) -> None:
+        self._ids: dict[tuple[str, str], list[str]] = {}
+        self._any: dict[str, list[str]] = {}
+
+    @staticmethod
+    def _keys(record: dict) -> list[tuple[str, str]]:
+        handles = parse_platform_handles(record.get("platform_handles", ""))
+        keys = []
+        for platform, handle in handles.items():
+            normalised = normalise_handle(handle)
+            if normalised:
+                keys.append((platform, normalised))
+        return keys
+
+    def add(self, record: dict) -> None:
+        for key in self._keys(record):
+            _push(self._ids, key, record.get("id", ""))
+            _push(self._any, key[1], record.get("id", ""))
+
+    def remove(self, record: dict) -> None:
+        for key in self._keys(record):
+            _drop(self._ids, key, record.get("id", ""))
+            _drop(self._any, key[1], record.get("id", ""))
+
+    def lookup(self, platform: str, handle: str) -> str | None:
+        """Contact id holding `handle` on `platform`, or None."""
+        ids = self._ids.get((platform, normalise_handle(handle)))
+        return ids[0] if ids else None
+
+    def lookup_any(self, handle: str) -> str | None:
+        """Contact id holding `handle` on any platform, or None."""
+        ids = self._any.get(normalise_handle(handle))
+        return ids[0] if ids else None
+
+
+class NameIndex(SheetView):
+    """Contact ids, in sheet order, by (first name, last-name root) and by first
+    name alone. Keys come from helpers.name_key, so 'Mulroy, CFA' files under
+    'mulroy'."""
+
+    def reset(self) -> None:
+        self._full: dict[tuple[str, str], list[str]] = {}
+        self._first: dict[str, list[str]] = {}
+
+    def add(self, record: dict) -> None:
+        key = name_key(record.get("first_name", ""), record.get("last_name", ""))
+        if key[0]:
+            _push(self._full, key, record.get("id", ""))
+            _push(self._first, key[0], record.get("id", ""))
+
+    def remove(self, record: dict) -> None:
+        key = name_key(record.get("first_name", ""), record.get("last_name", ""))
+        if key[0]:
+            _drop(self._full, key, record.get("id", ""))
+            _drop(self._first, key[0], record.get("id", ""))
+
+    def lookup(self, first_name: str, last_name: str = "") -> list[str]:
+        """Ids matching first + last name, or first name alone when no last name
+        is given. Returns a copy; empty when nothing matches."""
+        if last_name:
+            return list(self._full.get(name_key(first_name, last_name), ()))
+        return list(self._first.get(name_key(first_name, "")[0], ()))
+
+
+class DedupIndex(SheetView):
+    """Blocking keys for create-time dedup over active (non-archived) contacts:
+    normalised LinkedIn URL, lowercased email, and (first name, last-name root).
+    Ids are kept in sheet order so the first match wins, as a scan would."""
+
+    def reset(self) -> None:
+        self._linkedin: dict[str, list[str]] = {}
+        self._email: dict[str, list[str]] = {}
+        self._name: dict[tuple[str, str], list[str]] = {}
+
+    @staticmethod
+    def _keys(record: dict):
+        return (
+            normalise_linkedin_url(record.get("linkedin_url", "")),
+            (record.get("email", "") or "").strip().lower(),
+            name_key(record.get("first_name", ""), record.get("last_name", "")),
+        )
+
+    def add(self, record: dict) -> None:
+        if record.get("status") == "archived":
+            return
+        linkedin, email, name = self._keys(record)
+        if linkedin:
+            _push(self._linkedin, linkedin, record.get("id", ""))
+        if email:
+            _push(self._email, email, record.get("id", ""))
+        if name[0]:
+            _push(self._name, name, record.get("id", ""))
+
+    def remove(self, record: dict) -> None:
+        if record.get("status") == "archived":
+            return
+        linkedin, email, name = self._keys(record)
+        _drop(self._linkedin, linkedin, record.get("id", ""))
+        _drop(self._email, email, record.get("id", ""))
+        _drop(self._name, name, record.get("id", ""))
+
+    def match(self, *, linkedin_url="", email="", first_name="", last_name="") -> str | None:
+        """Id of the first active contact matching linkedin_url, then email, then
+        first + last name (both required); None when nothing matches."""
+        if linkedin_url:
+            ids = self._linkedin.get(normalise_linkedin_url(linkedin_url))
+            if ids:
+                return ids[0]
+        if email:
+            ids = self._email.get(email.strip().lower())
+            if ids:
+                return ids[0]
+        if first_name and last_name:
+            ids = self._name.get(name_key(first_name, last_name))
+            if ids:
+                return ids[0]
+        return None
+
+
+class CompanyIndex(SheetView):
+    """Company resolution keys: normalised name (case, punctuation and legal
+    suffixes folded, see normalise_company_name) and website domain. Ids are
+    kept in sheet order so the oldest company wins."""
+
+    def reset(self) -> None:
+        self._name: dict[str, list[str]] = {}
+        self._domain: dict[str, list[str]] = {}
+        self._domain_of: dict[str, str] = {}
+
+    def add(self, record: dict) -> None:
+        cid = record.get("id", "")
+        name = normalise_company_name(record.get("name", ""))
+        domain = website_domain(record.get("website", ""))
+        if name:
+            _push(self._name, name, cid)
+        if domain:
+            _push(self._domain, domain, cid)
+            self._domain_of[cid] = domain
+
+    def remove(self, record: dict) -> None:
+        cid = record.get("id", "")
+        _drop(self._name, normalise_company_name(record.get("name", "")), cid)
+        domain = website_domain(record.get("website", ""))
+        _drop(self._domain, domain, cid)
+        if self._domain_of.get(cid) == domain:
+            del self._domain_of[cid]
+
+    def match(self, name: str = "", website: str = "") -> str | None:
+        """Id of the company with this website domain, else the first with this
+        normalised name whose website doesn't contradict the given one."""
+        domain = website_domain(website)
+        if domain and domain in self._domain:
+            return self._domain[domain][0]
+        for cid in self._name.get(normalise_company_name(name), ()):
+            if not domain or self._domain_of.get(cid, domain) == domain:
+                return cid
+        return None
+
+
+def prefix_words(text: str) -> list[str]:
+    """Case-folded words of `text`, as PrefixIndex files and queries them."""
+    return re.findall(r"\w+", text.lower())
+
+
+class PrefixIndex(SheetView):
+    """Words of the given fields → record ids, for as-you-type lookup. Every
+    (word, id) pair lives in one sorted list, so all ids with a word starting
+    with a prefix are a bisect and a contiguous slice. With `group_by`, ids are
+    also filed under that field's value (e.g. contacts by company_id)."""
+
+    def __init__(self, fields: tuple[str, ...], group_by: str = ""):
+        self.fields = fields
+        self.group_by = group_by
+
+    def reset(self) -> None:
+        self._words: list[tuple[str, str]] = []
+        self._groups: dict[str, list[str]] = {}
+
+    def _keys(self, record: dict) -> set[str]:
+        return {w for f in self.fields for w in prefix_words(record.get(f, ""))}
+
+    def add(self, record: dict) -> None:
+        rid = record.get("id", "")
+        if not rid:
+            return
+        for word in self._keys(record):
+            insort(self._words, (word, rid))
+        if self.group_by and record.get(self.group_by):
+            _push(self._groups, record[self.group_by], rid)
+
+    def remove(self, record: dict) -> None:
+        rid = record.get("id", "")
+        for word in self._keys(record):
+            pos = bisect_left(self._words, (word, rid))
+            if pos < len(self._words) and self._words[pos] == (word, rid):
+                del self._words[pos]
+        if self.group_by:
+            _drop(self._groups, record.get(self.group_by, ""), rid)
+
+    def prefixed(self, prefix: str) -> list[str]:
+        """Ids with a word starting with `prefix` (already case-folded),
+        ordered by that word, each id once."""
+        ids: dict[str, None] = {}
+        for word, rid in self._words[bisect_left(self._words, (prefix, "")):]:
+            if not word.startswith(prefix):
+                break
+            ids.setdefault(rid)
+        return list(ids)
+
+    def group(self, key: str) -> list[str]:
+        return list(self._groups.get(key, ()))
+
+
+def interaction_time(record: dict) -> str:
+    """When an interaction happened: occurred_at, else when it was logged."""
+    return record.get("occurred_at", "") or record.get("created_at", "")
+
+
+class ActivityIndex(SheetView):
+    """Per-contact interaction timelines over the Interactions tab. Each contact
+    has (epoch seconds, id) lists kept sorted by interaction_time() — one for
+    all interactions and one per direction — so the latest interaction, latest
+    inbound/outbound, count and ordered timeline are all lookups. Times are
+    parsed once when a row is indexed; rows without a parseable time are left
+    out."""
+
+    def reset(self) -> None:
+        self._records: dict[str, tuple[dict, float]] = {}
+        self._timelines: dict[tuple[str, str], list[tuple[float, str]]] = {}
+
+    @staticmethod
+    def _lists(record: dict) -> list[tuple[str, str]]:
+        cid = record.get("contact_id", "")
+        keys = [(cid, "")]
+        if record.get("direction") in ("inbound", "outbound"):
+            keys.append((cid, record["direction"]))
+        return keys
+
+    def add(self, record: dict) -> None:
+        rid, when = record.get("id", ""), parse_epoch(interaction_time(record))
+        if not record.get("contact_id") or when is None or rid in self._records:
+            return
+        self._records[rid] = (record, when)
+        for key in self._lists(record):
+            insort(self._timelines.setdefault(key, []), (when, rid))
+
+    def remove(self, record: dict) -> None:
+        rid = record.get("id", "")
+        indexed = self._records.get(rid)
+        if indexed is None or indexed[0] is not record:
+            return
+        del self._records[rid]
+        entry = (indexed[1], rid)
+        for key in self._lists(record):
+            timeline = self._timelines.get(key, [])
+            i = bisect_left(timeline, entry)
+            if i < len(timeline) and timeline[i] == entry:
+                timeline.pop(i)
+                if not timeline:
+                    del self._timelines[key]
+
+    def contact_ids(self) -> list[str]:
+        """Contacts with at least one interaction."""
+        return [cid for cid, direction in self._timelines if not direction]
+
+    def count(self, contact_id: str) -> int:
+        return len(self._timelines.get((contact_id, ""), ()))
+
+    def timeline(self, contact_id: str) -> list[str]:
+        """Interaction ids for the contact, oldest first."""
+        return [rid for _, rid in self._timelines.get((contact_id, ""), ())]
+
+    def recent(self, contact_id: str, limit: int | None = None, direction: str = "") -> list[dict]:
+        """The contact's interactions, newest first (optionally one direction)."""
+        timeline = self._timelines.get((contact_id, direction), [])
+        picked = timeline[::-1] if limit is None else timeline[:-limit - 1:-1]
+        return [self._records[rid][0] for _, rid in picked]
+
+    def last(self, contact_id: str, direction: str = "") -> dict | None:
+        """Most recent interaction for the contact; direction 'inbound'/'outbound'
+        narrows it. None when there is none."""
+        timeline = self._timelines.get((contact_id, direction))
+        return self._records[timeline[-1][1]][0] if timeline else None
+
+    def last_at(self, contact_id: str, direction: str = "") -> float | None:
+        """Epoch seconds of last(contact_id, direction), or None."""
+        timeline = self._timelines.get((contact_id, direction))
+        return timeline[-1][0] if timeline else None
+
+
+# Engagement score: 0-100 from recency (halved RECENCY_DAYS after the last
+# interaction, then falling off hyperbolically so long-dormant contacts still
+# order by how long), frequency (interactions decayed over FREQUENCY_DAYS,
+# saturating around FREQUENCY_SCALE) and the share that were inbound.
+RECENCY_DAYS = 14
+FREQUENCY_DAYS = 30
+FREQUENCY_SCALE = 3.0
+ENGAGEMENT_WEIGHTS = (0.5, 0.3, 0.2)
+
+
+class EngagementIndex(SheetView):
+    """Per-contact engagement over the Interactions tab, as NumPy arrays with one
+    slot per contact: interaction count, inbound count, last interaction time
+    and a time-decayed interaction sum (kept relative to a fixed reference so an
+    add or remove is one exact += / -=). The initial build is a single
+    vectorised pass; scores for every contact are then one array expression,
+    cached for the hour and dropped on any change."""
+
+    def reset(self) -> None:
+        self._t0 = time.time()
+        self._slot: dict[str, int] = {}
+        self._entries: dict[str, tuple[dict, int, float, bool]] = {}
+        self._times: list[list[float]] = []
+        self._count = np.zeros(0)
+        self._inbound = np.zeros(0)
+        self._decayed = np.zeros(0)
+        self._last = np.zeros(0)
+        self._scores: tuple[int, np.ndarray] | None = None
+
+    def _weight(self, when):
+        """Decay weight of an interaction at `when`, relative to the build time;
+        the exponent is clipped so far-future typos can't overflow."""
+        return np.exp(np.clip((when - self._t0) / (FREQUENCY_DAYS * 86400), -700, 50))
+
+    @staticmethod
+    def _parse(record: dict) -> tuple[str, str, float | None]:
+        return record.get("id", ""), record.get("contact_id", ""), parse_epoch(interaction_time(record))
+
+    def build(self, records: list[dict]) -> None:
+        self.reset()
+        slots, epochs, inbound = [], [], []
+        for record in records:
+            rid, cid, when = self._parse(record)
+            if not cid or when is None or rid in self._entries:
+                continue
+            slot = self._slot.setdefault(cid, len(self._slot))
+            is_inbound = record.get("direction") == "inbound"
+            self._entries[rid] = (record, slot, when, is_inbound)
+            slots.append(slot)
+            epochs.append(when)
+            inbound.append(is_inbound)
+        n = len(self._slot)
+        slots_arr, epochs_arr = np.array(slots, dtype="int64"), np.array(epochs, dtype=float)
+        self._count = np.bincount(slots_arr, minlength=n).astype(float)
+        self._inbound = np.bincount(slots_arr, weights=np.array(inbound, dtype=float), minlength=n)
+        self._decayed = np.bincount(slots_arr, weights=self._weight(epochs_arr), minlength=n)
+        order = np.lexsort((epochs_arr, slots_arr))
+        bounds = np.cumsum(self._count.astype("int64"))[:-1]
+        self._times = [list(t) for t in np.split(epochs_arr[order], bounds)] if n else []
+        self._last = np.array([t[-1] for t in self._times], dtype=float)
+
+    def add(self, record: dict) -> None:
+        rid, cid, when = self._parse(record)
+        if not cid or when is None or rid in self._entries:
+            return
+        slot = self._slot.get(cid)
+        if slot is None:
+            slot = self._slot[cid] = len(self._slot)
+            self._times.append([])
+            self._count, self._inbound, self._decayed, self._last = (
+                np.append(a, fill) for a, fill in
+                ((self._count, 0), (self._inbound, 0), (self._decayed, 0), (self._last, np.nan))
+            )
+        is_inbound = record.get("direction") == "inbound"
+        self._entries[rid] = (record, slot, when, is_inbound)
+        insort(self._times[slot], when)
+        self._count[slot] += 1
+        self._inbound[slot] += is_inbound
+        self._decayed[slot] += self._weight(when)
+        self._last[slot] = self._times[slot][-1]
+        self._scores = None
+
+    def remove(self, record: dict) -> None:
+        entry = self._entries.get(record.get("id", ""))
+        if entry is None or entry[0] is not record:
+            return
+        del self._entries[record["id"]]
+        _, slot, when, is_inbound = entry
+        times = self._times[slot]
+        del times[bisect_left(times, when)]
+        self._count[slot] -= 1
+        self._inbound[slot] -= is_inbound
+        self._decayed[slot] = max(self._decayed[slot] - self._weight(when), 0.0) if times else 0.0
+        self._last[slot] = times[-1] if times else np.nan
+        self._scores = None
+
+    def _all_scores(self, now: float | None = None) -> np.ndarray:
+        now = time.time() if now is None else now
+        hour = int(now // 3600)
+        if self._scores is not None and self._scores[0] == hour:
+            return self._scores[1]
+        has = self._count > 0
+        with np.errstate(invalid="ignore"):
+            age_days = np.maximum(now - self._last, 0) / 86400
+            recency = np.where(has, 1 / (1 + age_days / RECENCY_DAYS), 0.0)
+        frequency = 1 - np.exp(-(self._decayed / self._weight(now)) / FREQUENCY_SCALE)
+        inbound_ratio = np.where(has, self._inbound / np.maximum(self._count, 1), 0.0)
+        w_recency, w_frequency, w_inbound = ENGAGEMENT_WEIGHTS
+        scores = 100 * (w_recency * recency + w_frequency * frequency + w_inbound * inbound_ratio)
+        self._scores = (hour, scores)
+        return scores
+
+    def score(self, contact_id: str, now: float | None = None) -> float:
+        """0-100 engagement for the contact; 0 with no interactions. Unrounded,
+        so it can break ties between long-dormant contacts."""
+        slot = self._slot.get(contact_id)
+        return 0.0 if slot is None else float(self._all_scores(now)[slot])
+
+    def ranking(self, now: float | None = None) -> list[tuple[str, float]]:
+        """(contact id, score) for every contact with interactions, best first."""
+        scores = self._all_scores(now)
+        ids = list(self._slot)
+        return [(ids[i], float(scores[i])) for i in np.argsort(-scores, kind="stable")]
+
+
+REMINDABLE_STATUSES = ("pending", "snoozed")
+
+
+def reminder_due_at(record: dict) -> float | None:
+    """Epoch seconds a follow-up's reminder is due: due_date + due_time (HH:MM,
+    UTC). None when it has no time of day, is already reminded or is no longer
+    open."""
+    if record.get("status") not in REMINDABLE_STATUSES or record.get("reminder_sent") == "TRUE":
+        return None
+    day, at = record.get("due_date", "")[:10], record.get("due_time", "").strip()
+    if not day or not at:
+        return None
+    return parse_epoch(f"{day}T{at}")
+
+
+class ReminderQueue(SheetView):
+    """Timer heap of follow-up reminders still to send, keyed by reminder_due_at().
+    Edits re-push (date, time or status changed; a snooze resets reminder_sent)
+    and stale heap entries are dropped lazily when they reach the top. Setting
+    `on_change` gets a call whenever the queue changes, so a sleeping timer can
+    re-arm for a new earliest reminder."""
+
+    on_change = None
+
+    def reset(self) -> None:
+        self._heap: list[tuple[float, str]] = []
+        self._due: dict[str, tuple[dict, float]] = {}
+
+    def add(self, record: dict) -> None:
+        rid, due = record.get("id", ""), reminder_due_at(record)
+        if due is None or not rid or rid in self._due:
+            return
+        self._due[rid] = (record, due)
+        heapq.heappush(self._heap, (due, rid))
+        self._notify()
+
+    def remove(self, record: dict) -> None:
+        entry = self._due.get(record.get("id", ""))
+        if entry is not None and entry[0] is record:
+            del self._due[record["id"]]
+            self._notify()
+
+    def _notify(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
+
+    def _prune(self) -> None:
+        """Drop heap entries whose follow-up was removed or re-timed."""
+        while self._heap:
+            due, rid = self._heap[0]
+            entry = self._due.get(rid)
+            if entry is not None and entry[1] == due:
+                return
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> float | None:
+        """When the earliest pending reminder is due, or None."""
+        self._prune()
+        return self._heap[0][0] if self._heap else None
+
+    def due(self, now: float, grace: float) -> tuple[list[dict], list[dict]]:
+        """(on time, late): follow-ups due at or before `now`, earliest first,
+        split by whether they are more than `grace` seconds overdue — late ones
+        are for a catch-up summary rather than a "due now" reminder. Both stay
+        queued until the caller marks them sent or discards them."""
+        on_time, late = [], []
+        self._prune()
+        seen = set()
+        while self._heap and self._heap[0][0] <= now:
+            due, rid = heapq.heappop(self._heap)
+            entry = self._due.get(rid)
+            # An edit that keeps the due time (a notes change) re-pushes an
+            # identical entry; one reminder per follow-up all the same.
+            if entry is None or entry[1] != due or rid in seen:
+                continue
+            seen.add(rid)
+            (late if due < now - grace else on_time).append(entry[0])
+        for record in on_time + late:
+            heapq.heappush(self._heap, (self._due[record["id"]][1], record["id"]))
+        return on_time, late
+
+    def discard(self, record_id: str) -> None:
+        """Stop tracking a reminder that can't be marked (its row is gone)."""
+        self._due.pop(record_id, None)
+
+
+DEAL_STAGES = ["lead", "prospect", "qualified", "proposal", "negotiation", "won", "lost"]
+CLOSED_STAGES = ("won", "lost")
+
+
+def _deal_value(record: dict) -> Decimal:
+    try:
+        return Decimal(str(record.get("value") or 0).strip() or 0)
+    except InvalidOperation:
+        return Decimal(0)
+
+
+class PipelineView(SheetView):
+    """Per-stage deal aggregates — count, value sum and value by currency —
+    plus open-pipeline totals (every stage except won/lost). Sums are kept as
+    Decimal so removing a deal's value restores the previous total exactly."""
+
+    def reset(self) -> None:
+        self._count: dict[str, int] = {}
+        self._value: dict[str, Decimal] = {}
+        self._by_currency: dict[str, dict[str, Decimal]] = {}
+
+    def _apply(self, record: dict, sign: int) -> None:
+        stage = record.get("stage", "")
+        value = _deal_value(record) * sign
+        currency = record.get("currency", "") or "USD"
+        self._count[stage] = self._count.get(stage, 0) + sign
+        self._value[stage] = self._value.get(stage, Decimal(0)) + value
+        by_currency = self._by_currency.setdefault(stage, {})
+        by_currency[currency] = by_currency.get(currency, Decimal(0)) + value
+        if not self._count[stage]:
+            del self._count[stage], self._value[stage], self._by_currency[stage]
+        elif not by_currency[currency]:
+            del by_currency[currency]
+
+    def add(self, record: dict) -> None:
+        self._apply(record, 1)
+
+    def remove(self, record: dict) -> None:
+        self._apply(record, -1)
+
+    def stage(self, stage: str) -> dict:
+        """{"count", "value", "by_currency"} for one stage (zeros when empty)."""
+        return {
+            "count": self._count.get(stage, 0),
+            "value": float(self._value.get(stage, 0)),
+            "by_currency": {c: float(v) for c, v in self._by_currency.get(stage, {}).items()},
+        }
+
+    def stages(self) -> dict[str, dict]:
+        """Every pipeline stage in DEAL_STAGES order."""
+        return {stage: self.stage(stage) for stage in DEAL_STAGES}
+
+    def total_count(self) -> int:
+        return sum(self._count.values())
+
+    def open_count(self) -> int:
+        return sum(n for stage, n in self._count.items() if stage not in CLOSED_STAGES)
+
+    def open_value(self) -> float:
+        return float(sum((v for stage, v in self._value.items() if stage not in CLOSED_STAGES), Decimal(0)))
+
+
+class PipelineHistoryView(SheetView):
+    """PipelineHistory snapshots by day, JSON decoded once per row: each day's
+    per-stage [count, value] pairs and the deal id → stage map, merged across
+    the rows a large day is split over. Days are kept sorted so a date window
+    is a bisect slice, not a scan of the whole history."""
+
+    def reset(self) -> None:
+        self._days: list[str] = []
+        self._parts: dict[str, list[tuple[dict, dict, dict]]] = {}
+        self._rows: dict[str, tuple[dict, dict]] = {}
+
+    def _merge(self, day: str) -> None:
+        parts = self._parts[day]
+        deals: dict[str, str] = {}
+        for _record, _stages, part in parts:
+            deals.update(part)
+        self._rows[day] = (parts[0][1], deals)
+
+    def add(self, record: dict) -> None:
+        day = record.get("snapshot_date", "")[:10]
+        if not day:
+            return
+        try:
+            stages = json.loads(record.get("stages") or "{}")
+            by_stage = json.loads(record.get("deals") or "{}")
+        except json.JSONDecodeError:
+            return
+        deals = {deal_id: stage for stage, ids in by_stage.items() for deal_id in ids}
+        if day not in self._parts:
+            self._parts[day] = []
+            insort(self._days, day)
+        self._parts[day].append((record, stages, deals))
+        self._merge(day)
+
+    def remove(self, record: dict) -> None:
+        day = record.get("snapshot_date", "")[:10]
+        parts = self._parts.get(day, [])
+        kept = [part for part in parts if part[0] is not record]
+        if len(kept) == len(parts):
+            return
+        if kept:
+            self._parts[day] = kept
+            self._merge(day)
+        else:
+            del self._parts[day], self._rows[day]
+            del self._days[bisect_left(self._days, day)]
+
+    def window(self, start: str, end: str) -> list[tuple[str, dict, dict]]:
+        """(day, stages, deals) for each snapshot with start <= day <= end."""
+        lo, hi = bisect_left(self._days, start), bisect_right(self._days, end)
+        return [(day, *self._rows[day]) for day in self._days[lo:hi]]
+
+    def deal_stages(self) -> dict[str, set[str]]:
+        """Every stage each deal has been seen in across all snapshots."""
+        seen: dict[str, set[str]] = {}
+        for day in self._days:
+            for deal_id, stage in self._rows[day][1].items():
+                seen.setdefault(deal_id, set()).add(stage)
+        return seen
+
+
+def digest_hash(key: str) -> str:
+    """Short hash published in the lookup digest: first 8 hex chars of SHA-256.
+    Clients hash their own keys the same way (SubtleCrypto in the extension)."""
+    return hashlib.sha256(key.encode()).hexdigest()[:8]
+
+
+class LookupDigest(SheetView):
+    """Multiset of hashed lookup keys — one per handle (`h:<normalised handle>`)
+    and one per full name (`n:<first> <last-name root>`) — mirroring what
+    HandleIndex and NameIndex would match. Counts let removals stay exact when
+    two contacts share a key."""
+
+    def reset(self) -> None:
+        self._counts: dict[str, int] = {}
+        self._sorted: list[str] | None = None
+        self._version: str | None = None
+
+    @staticmethod
+    def _hashes(record: dict) -> list[str]:
+        keys = [f"h:{handle}" for _platform, handle in HandleIndex._keys(record)]
+        first, last = name_key(record.get("first_name", ""), record.get("last_name", ""))
+        if first and last:
+            keys.append(f"n:{first} {last}")
+        return [digest_hash(k) for k in keys]
+
+    def add(self, record: dict) -> None:
+        for h in self._hashes(record):
+            self._counts[h] = self._counts.get(h, 0) + 1
+        self._sorted = self._version = None
+
+    def remove(self, record: dict) -> None:
+        for h in self._hashes(record):
+            if self._counts.get(h, 0) > 1:
+                self._counts[h] -= 1
+            else:
+                self._counts.pop(h, None)
+        self._sorted = self._version = None
+
+    def entries(self) -> list[str]:
+        """Sorted distinct hashes; re-sorted only after a change."""
+        if self._sorted is None:
+            self._sorted = sorted(self._counts)
+        return self._sorted
+
+    def version(self) -> str:
+        """Content hash of the digest — stable across processes and restarts.
+        Computed once per change, like the sorted entries."""
+        if self._version is None:
+            self._version = hashlib.sha256("".join(self.entries()).encode()).hexdigest()[:16]
+        return self._version
+
+
+def _push(index: dict, key, record_id: str) -> None:
+    index.setdefault(key, []).append(record_id)
+
+
+def _drop(index: dict, key, record_id: str) -> None:
+    ids = index.get(key)
+    if ids and record_id in ids:
+        ids.remove(record_id)
+        if not ids:
+            del index[key]
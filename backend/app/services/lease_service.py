@@ -0,0 +1,211 @@
+"""Leases for scheduled jobs that must run once a day across containers.
+
+Several containers can start at once on Modal, and each one's scheduler and
+startup catch-up would otherwise send the same digest. Before a daily job runs
+it claims a lease on its name for today's date: the claim succeeds only if no
+other holder has a live lease and the job hasn't finished for that date. A
+claim carries a fencing token that grows on every claim, and finishing (or
+releasing) is accepted only with the current token — so a holder whose lease
+expired mid-run and was taken over can't mark the day done over its
+successor. A lease that is never finished or released frees itself after its
+TTL. The last period each job finished for stays in the store
+(`last_run`), which is what the startup catch-up reads.
+
+The store is chosen by `settings.scheduler_lock_url`: `redis://…` for a store
+shared by every container, `sqlite:///path` for a single host. It must be set
+outside development wherever the scheduler runs; only in development does an
+empty URL fall back to a file in the temp dir. The store is built on first
+use (`get_leases`). Either way the per-job check is one local or in-memory round-trip,
+not a Sheets read and write.
+"""
+
+import os
+import socket
+import sqlite3
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+from app.config import settings
+
+LEASE_TTL_SECONDS = 600
+
+
+class Lease(NamedTuple):
+    name: str
+    period: str
+    token: int
+    expires_at: float
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseStore(ABC):
+    """Claim / finish / release for named, per-period job leases."""
+
+    def __init__(self, owner: str | None = None):
+        self.owner = owner or default_owner()
+
+    @abstractmethod
+    def claim(self, name: str, period: str, ttl: float = LEASE_TTL_SECONDS) -> Lease | None:
+        """Take the lease on `name` for `period`, or None if another holder has a
+        live lease or the job already finished for that period."""
+
+    @abstractmethod
+    def finish(self, lease: Lease) -> bool:
+        """Record the period as done and drop the lease. False if the lease was
+        taken over since (its token is stale) — nothing is written then."""
+
+    @abstractmethod
+    def release(self, lease: Lease) -> None:
+        """Drop the lease without marking the period done, so it can be retried."""
+
+    @abstractmethod
+    def last_run(self, name: str) -> str:
+        """The last period `name` finished for, or "" if it never has."""
+
+
+class SQLiteLeaseStore(LeaseStore):
+    """Leases in a SQLite file. Claims run in an IMMEDIATE transaction, so they
+    are atomic across every process on the host sharing the file."""
+
+    def __init__(self, path: str, owner: str | None = None):
+        super().__init__(owner)
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " name TEXT PRIMARY KEY, token INTEGER NOT NULL DEFAULT 0,"
+                " owner TEXT NOT NULL DEFAULT '', expires_at REAL NOT NULL DEFAULT 0,"
+                " done_period TEXT NOT NULL DEFAULT '')"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def claim(self, name: str, period: str, ttl: float = LEASE_TTL_SECONDS) -> Lease | None:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT token, owner, expires_at, done_period FROM leases WHERE name = ?", (name,)
+            ).fetchone()
+            token, owner, expires_at, done_period = row or (0, "", 0.0, "")
+            if done_period == period or (owner and expires_at > now):
+                conn.execute("ROLLBACK")
+                return None
+            lease = Lease(name, period, token + 1, now + ttl)
+            conn.execute(
+                "INSERT INTO leases (name, token, owner, expires_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(name) DO UPDATE SET token = excluded.token,"
+                " owner = excluded.owner, expires_at = excluded.expires_at",
+                (name, lease.token, self.owner, lease.expires_at),
+            )
+            conn.execute("COMMIT")
+            return lease
+        finally:
+            conn.close()
+
+    def _settle(self, lease: Lease, done_period: str | None) -> bool:
+        conn = self._connect()
+        try:
+            cur = conn.execute(
+                "UPDATE leases SET owner = '', expires_at = 0, done_period = COALESCE(?, done_period)"
+                " WHERE name = ? AND token = ?",
+                (done_period, lease.name, lease.token),
+            )
+            return cur.rowcount == 1
+        finally:
+            conn.close()
+
+    def finish(self, lease: Lease) -> bool:
+        return self._settle(lease, lease.period)
+
+    def release(self, lease: Lease) -> None:
+        self._settle(lease, None)
+
+    def last_run(self, name: str) -> str:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT done_period FROM leases WHERE name = ?", (name,)).fetchone()
+            return row[0] if row else ""
+        finally:
+            conn.close()
+
+
+# Each script runs atomically on the Redis server. KEYS[1] is the lease hash.
+_CLAIM = """
+if redis.call('HGET', KEYS[1], 'done') == ARGV[1] then return 0 end
+local owner = redis.call('HGET', KEYS[1], 'owner')
+local expires_at = tonumber(redis.call('HGET', KEYS[1], 'expires_at') or '0')
+if owner and owner ~= '' and expires_at > tonumber(ARGV[3]) then return 0 end
+local token = redis.call('HINCRBY', KEYS[1], 'token', 1)
+redis.call('HSET', KEYS[1], 'owner', ARGV[2], 'expires_at', ARGV[4])
+return token
+"""
+
+_SETTLE = """
+if tonumber(redis.call('HGET', KEYS[1], 'token') or '0') ~= tonumber(ARGV[1]) then return 0 end
+redis.call('HSET', KEYS[1], 'owner', '', 'expires_at', '0')
+if ARGV[2] ~= '' then redis.call('HSET', KEYS[1], 'done', ARGV[2]) end
+return 1
+"""
+
+
+class RedisLeaseStore(LeaseStore):
+    """Leases in Redis, shared by every container. Needs the `redis` package."""
+
+    def __init__(self, url: str, owner: str | None = None, prefix: str = "voss:lease:"):
+        super().__init__(owner)
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._claim = self._client.register_script(_CLAIM)
+        self._settle = self._client.register_script(_SETTLE)
+
+    def claim(self, name: str, period: str, ttl: float = LEASE_TTL_SECONDS) -> Lease | None:
+        now = time.time()
+        token = int(self._claim(keys=[self._prefix + name], args=[period, self.owner, now, now + ttl]))
+        return Lease(name, period, token, now + ttl) if token else None
+
+    def finish(self, lease: Lease) -> bool:
+        return bool(self._settle(keys=[self._prefix + lease.name], args=[lease.token, lease.period]))
+
+    def release(self, lease: Lease) -> None:
+        self._settle(keys=[self._prefix + lease.name], args=[lease.token, ""])
+
+    def last_run(self, name: str) -> str:
+        done = self._client.hget(self._prefix + name, "done")
+        return done.decode() if done else ""
+
+
+def lease_store(url: str = "") -> LeaseStore:
+    """The LeaseStore for a `scheduler_lock_url`-style URL. An empty URL is
+    only accepted in development: a temp-dir file coordinates nothing across
+    containers and loses the last-run record on redeploy."""
+    if url.startswith(("redis://", "rediss://")):
+        return RedisLeaseStore(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteLeaseStore(url.removeprefix("sqlite:///"))
+    if url:
+        raise ValueError(f"Unsupported scheduler lock URL: {url}")
+    if settings.app_env != "development":
+        raise RuntimeError("SCHEDULER_LOCK_URL must be set outside development")
+    return SQLiteLeaseStore(os.path.join(tempfile.gettempdir(), "voss-scheduler-leases.db"))
+
+
+_leases: LeaseStore | None = None
+
+
+def get_leases() -> LeaseStore:
+    """The store for `settings.scheduler_lock_url`, created on first use — so
+    a process that never runs the scheduler never needs one."""
+    global _leases
+    if _leases is None:
+        _leases = lease_store(settings.scheduler_lock_url)
+    return _leases
@@ -0,0 +1,140 @@
+"""Daily pipeline history: PipelineHistory rows per day, written by the
+scheduler, so "how did the pipeline look last month" has an answer.
+
+Each row holds the per-stage aggregate from PipelineView as compact
+{stage: [count, value]} JSON and deals' stages as {stage: [deal ids]} —
+stage names once per row rather than once per deal. Google Sheets caps a cell
+at 50,000 characters, so a book too big for one `deals` cell is split over
+several rows for the same day, each carrying the day's `stages`. Reads go
+through PipelineHistoryView, which decodes each row once, merges a day's rows
+and slices a date window by bisect, so a chart query touches only the days it
+asked for.
+"""
+
+import json
+from collections import Counter
+from datetime import date, timedelta
+
+from app.helpers import today_str
+from app.services.indexes import CLOSED_STAGES, DEAL_STAGES, PipelineHistoryView, PipelineView
+from app.services.sheet_service import deals_sheet, parse_epoch, pipeline_history_sheet
+
+DEFAULT_WINDOW_DAYS = 30
+
+# Largest `deals` cell written; Sheets rejects cells over 50,000 characters.
+DEALS_CELL_CHARS = 45_000
+
+
+def _deal_chunks(deals: dict[str, list[str]], limit: int) -> list[str]:
+    """{stage: [deal ids]} as compact JSON strings of at most `limit` characters
+    each; always at least one (possibly '{}')."""
+    chunks: list[dict[str, list[str]]] = [{}]
+    size = 2  # "{}"
+    for stage, ids in deals.items():
+        stage_cost = len(json.dumps(stage)) + 4  # "stage":[] plus a comma
+        for deal_id in ids:
+            cost = len(json.dumps(deal_id)) + 1 + (0 if stage in chunks[-1] else stage_cost)
+            if chunks[-1] and size + cost > limit:
+                chunks.append({})
+                size, cost = 2, len(json.dumps(deal_id)) + 1 + stage_cost
+            chunks[-1].setdefault(stage, []).append(deal_id)
+            size += cost
+    return [json.dumps(chunk, separators=(",", ":")) for chunk in chunks]
+
+
+def snapshot_pipeline(day: str | None = None) -> list[dict]:
+    """Record today's (or `day`'s) pipeline and return its rows. Re-running on
+    the same day replaces that day's rows, so the last snapshot of a day is the
+    one kept."""
+    day = day or today_str()
+    pipeline = deals_sheet.view(PipelineView)
+    stages = {}
+    for stage, agg in pipeline.stages().items():
+        if agg["count"]:
+            stages[stage] = [agg["count"], agg["value"]]
+    deals: dict[str, list[str]] = {}
+    for d in deals_sheet.get_all():
+        if d.get("id"):
+            deals.setdefault(d.get("stage", ""), []).append(d["id"])
+    stages_json = json.dumps(stages, separators=(",", ":"))
+    rows = [{"snapshot_date": day, "stages": stages_json, "deals": chunk} for chunk in _deal_chunks(deals, DEALS_CELL_CHARS)]
+
+    existing = pipeline_history_sheet.range_query("snapshot_date", day, day, include_hi=True)
+    written = pipeline_history_sheet.bulk_update(
+        {old["id"]: row for old, row in zip(existing, rows)}
+    ) if existing else []
+    written += pipeline_history_sheet.bulk_create(rows[len(existing):])
+    surplus = [old["id"] for old in existing[len(rows):]]
+    if surplus:
+        pipeline_history_sheet.bulk_delete(surplus)
+    return written
+
+
+def default_window(start: str | None, end: str | None) -> tuple[str, str]:
+    """Fill in a missing bound: end defaults to today, start to DEFAULT_WINDOW_DAYS
+    before end. Raises ValueError for a bound that isn't a YYYY-MM-DD date."""
+    end = date.fromisoformat(end).isoformat() if end else today_str()
+    if start:
+        start = date.fromisoformat(start).isoformat()
+    else:
+        start = (date.fromisoformat(end) - timedelta(days=DEFAULT_WINDOW_DAYS)).isoformat()
+    return start, end
+
+
+def pipeline_history(start: str, end: str) -> list[dict]:
+    """Per-day stage aggregates between start and end (inclusive), oldest first."""
+    history = []
+    for day, stages, _deals in pipeline_history_sheet.view(PipelineHistoryView).window(start, end):
+        open_stages = [agg for stage, agg in stages.items() if stage not in CLOSED_STAGES]
+        history.append({
+            "date": day,
+            "stages": {
+                stage: dict(zip(("count", "value"), stages.get(stage, [0, 0.0])))
+                for stage in DEAL_STAGES
+            },
+            "open_count": sum(agg[0] for agg in open_stages),
+            "open_value": sum(agg[1] for agg in open_stages),
+        })
+    return history
+
+
+def stage_flow(start: str, end: str) -> dict:
+    """Stage-to-stage moves and stage velocity over the window.
+
+    Transitions compare each snapshot with the previous one in the window; a deal
+    first seen mid-window moves from "" (new). Velocity counts, per stage, the
+    deals that left it and the average days they spent there — only for stays
+    whose entry was also observed in the window.
+    """
+    snapshots = pipeline_history_sheet.view(PipelineHistoryView).window(start, end)
+    moves: Counter = Counter()
+    entered: dict[str, float | None] = {}
+    stays: dict[str, list[float]] = {}
+    previous: dict[str, str] | None = None
+    for day, _stages, deals in snapshots:
+        now = parse_epoch(day)
+        for deal_id, stage in deals.items():
+            before = previous.get(deal_id, "") if previous is not None else stage
+            if before == stage:
+                entered.setdefault(deal_id, None)  # stay began before the window
+                continue
+            moves[(before, stage)] += 1
+            since = entered.get(deal_id)
+            if before and since is not None:
+                stays.setdefault(before, []).append((now - since) / 86400)
+            entered[deal_id] = now
+        previous = deals
+
+    return {
+        "start": start,
+        "end": end,
+        "snapshots": len(snapshots),
+        "transitions": [
+            {"from": src, "to": dst, "count": n}
+            for (src, dst), n in sorted(moves.items(), key=lambda kv: (-kv[1], kv[0]))
+        ],
+        "velocity": {
+            stage: {"exits": len(days), "avg_days": round(sum(days) / len(days), 1)}
+            for stage, days in stays.items()
+        },
+    }
@@ -13,6 +13,7 @@ apply to people only — the other entity buckets stay text-driven.
 """
 
 from app.helpers import contact_display_name
+from app.services.indexes import EngagementIndex, PrefixIndex, prefix_words
 from app.services.sheet_service import (
     companies_sheet,
     contacts_sheet,
@@ -77,8 +78,9 @@ def _score(tiers: list[str], tokens: list[str]) -> int:
 
 
 def _ranked(scored: list) -> list:
-    """Stable-sort scored (score, hit) pairs best-first and return the hits."""
-    scored.sort(key=lambda pair: -pair[0])
+    """Stable-sort scored (score, hit) pairs best-first and return the hits. A
+    score may be a tuple, compared left to right."""
+    scored.sort(key=lambda pair: pair[0], reverse=True)
     return [hit for _, hit in scored]
 
 
@@ -130,6 +132,9 @@ def unified_search(
     def deal_title(did: str) -> str:
         return deal_by_id.get(did, {}).get("title", "")
 
+    # Ties on text relevance (and filters-only searches) go to the more engaged contact.
+    engagement = interactions_sheet.view(EngagementIndex)
+
     contact_scored = []
     for c in contacts:
         if c.get("status") == "archived":
@@ -160,10 +165,12 @@ def unified_search(
             " ".join([c.get("notes", ""), c.get("source", ""), c.get("phone", ""),
                       cname, company.get("industry", ""), company.get("website", "")]),
         ]
-        contact_scored.append((_score(tiers, tokens), {
+        engagement_score = engagement.score(c.get("id", ""))
+        contact_scored.append(((_score(tiers, tokens), engagement_score), {
             **c,
             "name": contact_display_name(c),
             "company_name": cname,
+            "engagement_score": round(engagement_score, 1),
         }))
     contact_hits = _ranked(contact_scored)
 
@@ -276,3 +283,43 @@ def unified_search(
         "interactions": interaction_hits,
         "follow_ups": follow_up_hits,
     }
+
+
+# Contact and company words are indexed once per cache fill (PrefixIndex), so
+# as-you-type lookups (Telegram inline queries, name arguments to commands) are
+# bisects rather than scans.
+CONTACT_NAME_FIELDS = ("first_name", "last_name")
+
+
+def suggest_contacts(query: str, limit: int = 10, include_companies: bool = True) -> list[dict]:
+    """Active contacts where every query word starts a word of their name — or,
+    with include_companies, of their company's name. "jo sm" finds John Smith;
+    "acme" finds everyone at Acme Corp."""
+    words = prefix_words(query)
+    if not words:
+        return []
+    names = contacts_sheet.view(PrefixIndex, CONTACT_NAME_FIELDS, "company_id")
+    companies = companies_sheet.view(PrefixIndex, ("name",)) if include_companies else None
+
+    matched: list[str] | None = None
+    for word in words:
+        ids = names.prefixed(word)
+        if companies is not None:
+            for company_id in companies.prefixed(word):
+                ids += names.group(company_id)
+        if matched is None:
+            matched = list(dict.fromkeys(ids))
+        else:
+            keep = set(ids)
+            matched = [i for i in matched if i in keep]
+        if not matched:
+            return []
+
+    results = []
+    for contact_id in matched:
+        contact = contacts_sheet.get_by_id(contact_id)
+        if contact and contact.get("status") != "archived":
+            results.append(contact)
+            if len(results) == limit:
+                break
+    return results
@@ -1,5 +1,8 @@
-import time
+import threading
 import uuid
+from abc import ABC, abstractmethod
+from bisect import bisect_left, bisect_right
+from contextlib import ExitStack, contextmanager
 from datetime import datetime, timezone
 
 from cachetools import TTLCache
@@ -10,12 +13,194 @@ from app.sheets import get_worksheet
 _cache = TTLCache(maxsize=50, ttl=30)
 
 
+class SheetView(ABC):
+    """A derived structure (index, aggregate) over one tab's records.
+
+    Built once from the cached snapshot the first time it is read after a cache
+    fill, then kept current by the owning SheetService's own writes through
+    add/remove deltas — so a lookup never rescans or re-parses the tab.
+    Subclasses implement reset/add/remove; an update is remove(old) + add(new).
+    """
+
+    @abstractmethod
+    def reset(self) -> None:
+        ...
+
+    @abstractmethod
+    def add(self, record: dict) -> None:
+        ...
+
+    @abstractmethod
+    def remove(self, record: dict) -> None:
+        ...
+
+    def build(self, records: list[dict]) -> None:
+        self.reset()
+        for r in records:
+            self.add(r)
+
+
+class IdIndex(SheetView):
+    """id → record. First row wins on duplicate ids, matching a linear scan."""
+
+    def reset(self) -> None:
+        self.by_id: dict[str, dict] = {}
+
+    def add(self, record: dict) -> None:
+        self.by_id.setdefault(record.get("id", ""), record)
+
+    def remove(self, record: dict) -> None:
+        if self.by_id.get(record.get("id", "")) is record:
+            del self.by_id[record.get("id", "")]
+
+
+class GroupIndex(SheetView):
+    """field value → records carrying it, for foreign-key lookups such as every
+    deal of a contact. Rows with a blank field are left out."""
+
+    def __init__(self, field: str):
+        self.field = field
+
+    def reset(self) -> None:
+        self.groups: dict[str, list[dict]] = {}
+
+    def add(self, record: dict) -> None:
+        key = record.get(self.field, "")
+        if key:
+            self.groups.setdefault(key, []).append(record)
+
+    def remove(self, record: dict) -> None:
+        group = self.groups.get(record.get(self.field, ""), [])
+        for pos, r in enumerate(group):
+            if r is record:
+                del group[pos]
+                break
+
+
+def parse_epoch(value: str) -> float | None:
+    """Epoch seconds for a sheet date or datetime string: ISO 8601 with 'Z',
+    an explicit offset or none (taken as UTC), or a bare YYYY-MM-DD (UTC
+    midnight). None when blank or unparseable."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            dt = datetime.strptime(value[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def is_date_column(column: str) -> bool:
+    """Columns holding dates/datetimes, which get a parsed epoch shadow column."""
+    return column.endswith(("_at", "_date")) or column == "expected_close"
+
+
+class EpochColumns(SheetView):
+    """Parsed epoch-seconds shadow columns for a tab's date fields, keyed by
+    record id — each value is parsed once per cache fill (or write), not per
+    read. Read through SheetService.epoch()."""
+
+    def __init__(self, fields: tuple[str, ...]):
+        self.fields = fields
+
+    def reset(self) -> None:
+        self._by_id: dict[str, tuple[dict, dict[str, float | None]]] = {}
+
+    def add(self, record: dict) -> None:
+        parsed = {f: parse_epoch(record.get(f, "")) for f in self.fields}
+        self._by_id.setdefault(record.get("id", ""), (record, parsed))
+
+    def remove(self, record: dict) -> None:
+        entry = self._by_id.get(record.get("id", ""))
+        if entry and entry[0] is record:
+            del self._by_id[record.get("id", "")]
+
+    def get(self, record: dict, field: str) -> float | None:
+        entry = self._by_id.get(record.get("id", ""))
+        if entry and entry[0].get(field) == record.get(field):
+            return entry[1].get(field)
+        return parse_epoch(record.get(field, ""))
+
+
+class SortedIndex(SheetView):
+    """Records ordered by one field, for range queries in O(log n + k).
+
+    Date fields are ordered by their parsed epoch seconds, so '...Z' and
+    '...+00:00' timestamps interleave correctly and unparseable values are left
+    out; other fields sort as strings. `where` is a tuple of (column, value)
+    pairs restricting which rows are indexed (e.g. (("status", "pending"),)),
+    so a query never wades through rows it would filter out anyway. Rows with a
+    blank field are left out. Equal values keep the order they were indexed in."""
+
+    def __init__(self, field: str, where: tuple = ()):
+        self.field = field
+        self.where = where
+        self.timestamp = is_date_column(field)
+
+    def reset(self) -> None:
+        self._keys: list = []
+        self._records: list[dict] = []
+
+    def _key(self, value):
+        if self.timestamp and isinstance(value, str):
+            return parse_epoch(value)
+        return value or None
+
+    def _indexed_key(self, record: dict):
+        if not all(record.get(k, "") == v for k, v in self.where):
+            return None
+        return self._key(record.get(self.field, ""))
+
+    def add(self, record: dict) -> None:
+        key = self._indexed_key(record)
+        if key is None:
+            return
+        pos = bisect_right(self._keys, key)
+        self._keys.insert(pos, key)
+        self._records.insert(pos, record)
+
+    def remove(self, record: dict) -> None:
+        key = self._indexed_key(record)
+        if key is None:
+            return
+        for pos in range(bisect_left(self._keys, key), bisect_right(self._keys, key)):
+            if self._records[pos] is record:
+                del self._keys[pos], self._records[pos]
+                return
+
+    def range(self, lo=None, hi=None, include_hi: bool = False) -> list[dict]:
+        """Records with lo <= field < hi (or <= hi with include_hi), ascending.
+        Either bound may be None for an open end; date-field bounds may be ISO
+        strings or epoch seconds."""
+        lo, hi = self._key(lo), self._key(hi)
+        start = 0 if lo is None else bisect_left(self._keys, lo)
+        if hi is None:
+            end = len(self._keys)
+        else:
+            end = (bisect_right if include_hi else bisect_left)(self._keys, hi)
+        return self._records[start:end]
+
+
 class SheetService:
     """Generic CRUD over a Google Sheets worksheet tab."""
 
     def __init__(self, tab_name: str, columns: list[str]):
         self.tab_name = tab_name
         self.columns = columns
+        self.date_fields = tuple(c for c in columns if is_date_column(c))
+        # Bumped whenever the snapshot's content changes (a refill that differs, or
+        # one of our own writes). Consumers key derived caches on it.
+        self.generation = 0
+        self._snapshot: list[dict] | None = None
+        self._views: dict[tuple, SheetView] = {}
+        self._view_sources: dict[tuple, list[dict]] = {}
+        self._lock = threading.RLock()
 
     def _worksheet(self):
         return get_worksheet(self.tab_name)
@@ -27,10 +212,12 @@ class SheetService:
         headers = ws.row_values(1)
         return headers if headers else self.columns
 
-    def _get_all_records(self, force_refresh: bool = False) -> list[dict]:
-        cache_key = f"{self.tab_name}_all"
-        if not force_refresh and cache_key in _cache:
-            return _cache[cache_key]
+    @property
+    def _cache_key(self) -> str:
+        return f"{self.tab_name}_all"
+
+    def _fetch_records(self) -> list[dict]:
+        """Read every row from the sheet, bypassing the cache."""
         ws = self._worksheet()
         # numericise_ignore=['all'] keeps every cell as a raw string. Without it, gspread
         # parses anything that looks numeric — so IDs like "8e648814" become inf, "536e12"
@@ -39,13 +226,83 @@ class SheetService:
         # for normal columns and a correctness fix for ids.
         records = ws.get_all_records(numericise_ignore=["all"])
         # Convert all values to strings for consistency
-        records = [{k: str(v) for k, v in r.items()} for r in records]
-        _cache[cache_key] = records
-        return records
+        return [{k: str(v) for k, v in r.items()} for r in records]
+
+    def _get_all_records(self, force_refresh: bool = False) -> list[dict]:
+        cache_key = self._cache_key
+        if not force_refresh and cache_key in _cache:
+            return _cache[cache_key]
+        records = self._fetch_records()
+        with self._lock:
+            # A TTL refill that reads back exactly what we already hold keeps the old
+            # list, so views built on it stay valid and the generation doesn't move.
+            if records != self._snapshot:
+                self._snapshot = records
+                self.generation += 1
+            _cache[cache_key] = self._snapshot
+            return self._snapshot
 
     def _invalidate_cache(self):
-        cache_key = f"{self.tab_name}_all"
-        _cache.pop(cache_key, None)
+        _cache.pop(self._cache_key, None)
+
+    def refresh(self) -> None:
+        """Re-read the tab now rather than at cache expiry — for a process that
+        learns another one wrote to it."""
+        self._get_all_records(force_refresh=True)
+
+    def view(self, view_cls: type[SheetView], *args) -> SheetView:
+        """Return the `view_cls(*args)` view over the current snapshot, building it
+        on first use and rebuilding only when the snapshot has been refilled."""
+        records = self._get_all_records()
+        key = (view_cls, *args)
+        with self._lock:
+            view = self._views.get(key)
+            if view is None:
+                view = self._views[key] = view_cls(*args)
+            if self._view_sources.get(key) is not records:
+                view.build(records)
+                self._view_sources[key] = records
+            return view
+
+    def _apply_delta(self, old: dict | None, new: dict | None) -> None:
+        """Write-through for one record change: swap in a patched copy of the cached
+        snapshot and feed the change to every view built on it, instead of dropping
+        the cache. The list a reader already holds is never modified (copy-on-write),
+        so rows can't move or vanish under it. With nothing cached there is nothing
+        to patch — the next read refills."""
+        with self._lock:
+            current = _cache.get(self._cache_key)
+            if current is None:
+                return
+            records = list(current)
+            if old is not None:
+                pos = next((i for i, r in enumerate(records) if r.get("id") == old.get("id")), None)
+                if pos is None:
+                    # Our snapshot never saw this row (written by someone else since
+                    # the last fill) — patching would diverge from the sheet.
+                    self._invalidate_cache()
+                    return
+                old = records[pos]
+                if new is None:
+                    del records[pos]
+                else:
+                    records[pos] = new
+            elif new is not None:
+                records.append(new)
+            for key, view in self._views.items():
+                if self._view_sources.get(key) is current:
+                    if old is not None:
+                        view.remove(old)
+                    if new is not None:
+                        view.add(new)
+                    self._view_sources[key] = records
+            self._snapshot = records
+            _cache[self._cache_key] = records
+            self.generation += 1
+
+    def _cached_row(self, record: dict, sheet_cols: list[str]) -> dict:
+        """The dict a re-read would return for `record`: keyed by the sheet's headers."""
+        return {col: record.get(col, "") for col in sheet_cols}
 
     def _now(self) -> str:
         return datetime.now(timezone.utc).isoformat()
@@ -70,6 +327,25 @@ class SheetService:
             records = records[:limit]
         return records
 
+    def epoch(self, record: dict, field: str) -> float | None:
+        """record[field] as epoch seconds, from the parsed shadow column kept for
+        every date field (see EpochColumns). None when blank or unparseable."""
+        return self.view(EpochColumns, self.date_fields).get(record, field)
+
+    def range_query(
+        self,
+        field: str,
+        lo: str | float | None = None,
+        hi: str | float | None = None,
+        include_hi: bool = False,
+        where: dict | None = None,
+    ) -> list[dict]:
+        """Records with lo <= record[field] < hi (<= hi with include_hi), ascending
+        by field, optionally restricted to rows matching every `where` column.
+        Served from a sorted index built once per cache fill — O(log n + k)."""
+        key = tuple(sorted((where or {}).items()))
+        return self.view(SortedIndex, field, key).range(lo, hi, include_hi)
+
     def search(self, query: str, search_fields: list[str]) -> list[dict]:
         """Token-AND substring match across the named fields. Single-table primitive
         used for entity resolution (e.g. resolving a name to a contact). User-facing
@@ -85,11 +361,15 @@ class SheetService:
         return results
 
     def get_by_id(self, record_id: str) -> dict | None:
-        records = self._get_all_records()
-        for r in records:
-            if r.get("id") == record_id:
-                return r
-        return None
+        return self.view(IdIndex).by_id.get(record_id)
+
+    def get_related(self, field: str, value: str) -> list[dict]:
+        """Rows whose `field` equals `value` (e.g. deals by contact_id), from a
+        GroupIndex rather than a scan. Rows edited since the last cache fill come
+        after the rest."""
+        if not value:
+            return []
+        return list(self.view(GroupIndex, field).groups.get(value, []))
 
     def find_by_field(self, field: str, value: str) -> dict | None:
         records = self._get_all_records()
@@ -124,7 +404,8 @@ class SheetService:
         sheet_cols = self._sheet_columns(ws)
         rows = [[record.get(col, "") for col in sheet_cols] for record in records]
         ws.append_rows(rows, value_input_option="RAW")
-        self._invalidate_cache()
+        for record in records:
+            self._apply_delta(None, self._cached_row(record, sheet_cols))
         return records
 
     def create(self, data: dict) -> dict:
@@ -142,19 +423,21 @@ class SheetService:
         sheet_cols = self._sheet_columns(ws)
         row = [record.get(col, "") for col in sheet_cols]
         ws.append_row(row, value_input_option="RAW")
-        self._invalidate_cache()
+        self._apply_delta(None, self._cached_row(record, sheet_cols))
         return record
 
     def update(self, record_id: str, data: dict) -> dict | None:
         ws = self._worksheet()
-        records = self._get_all_records(force_refresh=True)
+        # Resolve the row against a fresh read so we never write over a row that moved
+        # or changed since the cache was filled.
+        records = self._fetch_records()
 
         row_index = None
         record = None
         for i, r in enumerate(records):
             if r.get("id") == record_id:
                 row_index = i + 2  # +1 for header, +1 for 1-indexed
-                record = r
+                record = dict(r)
                 break
 
         if record is None:
@@ -170,9 +453,49 @@ class SheetService:
         sheet_cols = self._sheet_columns(ws)
         row = [record.get(col, "") for col in sheet_cols]
         ws.update(f"A{row_index}:{chr(64 + len(sheet_cols))}{row_index}", [row])
-        self._invalidate_cache()
+        self._apply_delta(records[row_index - 2], self._cached_row(record, sheet_cols))
         return record
 
+    def bulk_update(self, updates: dict[str, dict]) -> list[dict]:
+        """Apply several record updates ({id: data}) in a single batch_update() call.
+        Same field rules as update(); unknown ids are skipped. Returns the updated
+        records."""
+        if not updates:
+            return []
+
+        ws = self._worksheet()
+        records = self._fetch_records()
+        sheet_cols = self._sheet_columns(ws)
+        last_col = chr(64 + len(sheet_cols))
+        now = self._now()
+
+        batch = []
+        changed = []
+        seen: set[str] = set()
+        for i, r in enumerate(records):
+            data = updates.get(r.get("id"))
+            if data is None or r.get("id") in seen:
+                continue
+            seen.add(r.get("id"))
+            record = dict(r)
+            for key, value in data.items():
+                if key in record and key not in ("id", "created_at") and value is not None:
+                    record[key] = str(value)
+            if "updated_at" in self.columns:
+                record["updated_at"] = now
+            row_index = i + 2
+            batch.append({
+                "range": f"A{row_index}:{last_col}{row_index}",
+                "values": [[record.get(col, "") for col in sheet_cols]],
+            })
+            changed.append((r, record))
+
+        if batch:
+            ws.batch_update(batch, value_input_option="RAW")
+        for old, record in changed:
+            self._apply_delta(old, self._cached_row(record, sheet_cols))
+        return [record for _, record in changed]
+
     def delete(self, record_id: str) -> bool:
         """Soft-delete: set status to 'archived' if status column exists, otherwise actual delete."""
         if "status" in self.columns:
@@ -180,14 +503,31 @@ class SheetService:
             return result is not None
 
         ws = self._worksheet()
-        records = self._get_all_records(force_refresh=True)
+        records = self._fetch_records()
         for i, r in enumerate(records):
             if r.get("id") == record_id:
                 ws.delete_rows(i + 2)
-                self._invalidate_cache()
+                self._apply_delta(r, None)
                 return True
         return False
 
+    def bulk_delete(self, record_ids: list[str]) -> int:
+        """Hard-delete several rows, bottom-up so earlier row numbers stay valid.
+        Soft-delete tabs (with a status column) archive in one bulk_update instead.
+        Returns the number of records removed."""
+        if "status" in self.columns:
+            return len(self.bulk_update({rid: {"status": "archived"} for rid in record_ids}))
+
+        wanted = set(record_ids)
+        ws = self._worksheet()
+        records = self._fetch_records()
+        doomed = [(i, r) for i, r in enumerate(records) if r.get("id") in wanted]
+        for i, r in reversed(doomed):
+            ws.delete_rows(i + 2)
+        for _, r in doomed:
+            self._apply_delta(r, None)
+        return len(doomed)
+
 
 # Column definitions for each tab
 CONTACTS_COLUMNS = [
@@ -223,16 +563,16 @@ USERS_COLUMNS = [
     "id", "username", "password_hash", "telegram_chat_id", "created_at",
 ]
 
-SCHEDULER_LOG_COLUMNS = [
-    "id", "job_name", "last_run_date", "created_at",
-]
-
 NOTIFICATIONS_COLUMNS = [
     "id", "type", "status", "contact_id", "company_id",
     "title", "body", "payload",
     "created_at", "resolved_at",
 ]
 
+PIPELINE_HISTORY_COLUMNS = [
+    "id", "snapshot_date", "stages", "deals", "created_at", "updated_at",
+]
+
 # Lookup used by sheets.py to auto-create tabs with correct headers
 _COLUMNS_BY_TAB = {
     "Contacts": CONTACTS_COLUMNS,
@@ -241,8 +581,8 @@ _COLUMNS_BY_TAB = {
     "Interactions": INTERACTIONS_COLUMNS,
     "FollowUps": FOLLOW_UPS_COLUMNS,
     "Users": USERS_COLUMNS,
-    "SchedulerLog": SCHEDULER_LOG_COLUMNS,
     "Notifications": NOTIFICATIONS_COLUMNS,
+    "PipelineHistory": PIPELINE_HISTORY_COLUMNS,
 }
 
 # Pre-built service instances
@@ -252,5 +592,16 @@ deals_sheet = SheetService("Deals", DEALS_COLUMNS)
 interactions_sheet = SheetService("Interactions", INTERACTIONS_COLUMNS)
 follow_ups_sheet = SheetService("FollowUps", FOLLOW_UPS_COLUMNS)
 users_sheet = SheetService("Users", USERS_COLUMNS)
-scheduler_log_sheet = SheetService("SchedulerLog", SCHEDULER_LOG_COLUMNS)
 notifications_sheet = SheetService("Notifications", NOTIFICATIONS_COLUMNS)
+pipeline_history_sheet = SheetService("PipelineHistory", PIPELINE_HISTORY_COLUMNS)
+
+
+@contextmanager
+def read_lock(*sheets: SheetService):
+    """Hold each sheet's lock while reading across them, so no write-through can
+    patch a snapshot or view mid-read. Locks are taken in the order given; fill
+    the caches first (get_all) so a slow Sheets read doesn't happen under them."""
+    with ExitStack() as stack:
+        for sheet in sheets:
+            stack.enter_context(sheet._lock)
+        yield
@@ -0,0 +1,200 @@
+"""Tasks the API hands to the background worker (run_worker.py).
+
+With `settings.worker_enabled` the Telegram bot and scheduler live in their own
+process, so the API can't call them directly. Instead it puts small JSON tasks
+— "send this pending-link prompt", "follow-ups changed" — on a queue that the
+worker drains (app/worker.py). The queue is chosen by
+`settings.worker_queue_url`: a SQLite file (the default, in the temp dir) when
+API and worker share a host, or a Redis list when they don't.
+
+Delivery is at-least-once: `take` hides a task from other takers for a
+visibility timeout rather than removing it, and the worker `ack`s it only once
+its handler has succeeded. A task whose worker crashed or whose handler failed
+reappears when the timeout runs out. The queue is built on first use
+(`get_task_queue`), so importing this module touches no file or server.
+
+Without a separate worker, `submit` runs the task's handler in-process, so the
+API code is the same either way.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from typing import NamedTuple
+
+from app.config import settings
+
+VISIBILITY_TIMEOUT_SECONDS = 300
+
+
+class Task(NamedTuple):
+    id: str
+    kind: str
+    payload: dict
+    attempts: int  # deliveries so far, this one included
+
+
+class TaskQueue(ABC):
+    """FIFO of (kind, payload) tasks shared between processes."""
+
+    @abstractmethod
+    def put(self, kind: str, payload: dict) -> None:
+        ...
+
+    @abstractmethod
+    def take(self, limit: int = 50, visibility: float = VISIBILITY_TIMEOUT_SECONDS) -> list[Task]:
+        """Up to `limit` of the oldest visible tasks, hidden from other takers
+        for `visibility` seconds. A task not acked by then is delivered again."""
+
+    @abstractmethod
+    def ack(self, task_id: str) -> None:
+        """Remove a taken task for good, once it has been handled."""
+
+
+class SQLiteTaskQueue(TaskQueue):
+    def __init__(self, path: str):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL,"
+                " payload TEXT NOT NULL, created_at REAL NOT NULL,"
+                " visible_at REAL NOT NULL DEFAULT 0, attempts INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(tasks)")}
+            for column, spec in (("visible_at", "REAL"), ("attempts", "INTEGER")):
+                if column not in columns:  # a file from before acks
+                    conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {spec} NOT NULL DEFAULT 0")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def put(self, kind: str, payload: dict) -> None:
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO tasks (kind, payload, created_at) VALUES (?, ?, ?)",
+                (kind, json.dumps(payload), time.time()),
+            )
+        finally:
+            conn.close()
+
+    def take(self, limit: int = 50, visibility: float = VISIBILITY_TIMEOUT_SECONDS) -> list[Task]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, kind, payload, attempts FROM tasks WHERE visible_at <= ? ORDER BY id LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET visible_at = ?, attempts = attempts + 1 WHERE id = ?",
+                [(now + visibility, row[0]) for row in rows],
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        return [Task(str(id_), kind, json.loads(payload), attempts + 1) for id_, kind, payload, attempts in rows]
+
+    def ack(self, task_id: str) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM tasks WHERE id = ?", (int(task_id),))
+        finally:
+            conn.close()
+
+
+# Runs atomically on the Redis server. KEYS: the id list, the in-flight zset
+# (id → visible-again time), the body hash, the attempts hash. Expired
+# in-flight ids go back to the head of the list before the pop.
+_TAKE = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for i = #expired, 1, -1 do
+  redis.call('LPUSH', KEYS[1], expired[i])
+  redis.call('ZREM', KEYS[2], expired[i])
+end
+local ids = redis.call('LPOP', KEYS[1], ARGV[3])
+if not ids then return {} end
+local out = {}
+for _, id in ipairs(ids) do
+  redis.call('ZADD', KEYS[2], ARGV[2], id)
+  table.insert(out, id)
+  table.insert(out, redis.call('HGET', KEYS[3], id))
+  table.insert(out, redis.call('HINCRBY', KEYS[4], id, 1))
+end
+return out
+"""
+
+
+class RedisTaskQueue(TaskQueue):
+    """A Redis list of task ids, for an API and worker on different hosts.
+    Needs the `redis` package."""
+
+    def __init__(self, url: str, key: str = "voss:tasks"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._key = key
+        self._keys = [key, f"{key}:inflight", f"{key}:body", f"{key}:attempts"]
+        self._take = self._client.register_script(_TAKE)
+
+    def put(self, kind: str, payload: dict) -> None:
+        task_id = self._client.incr(f"{self._key}:seq")
+        pipe = self._client.pipeline()
+        pipe.hset(f"{self._key}:body", task_id, json.dumps({"kind": kind, "payload": payload}))
+        pipe.rpush(self._key, task_id)
+        pipe.execute()
+
+    def take(self, limit: int = 50, visibility: float = VISIBILITY_TIMEOUT_SECONDS) -> list[Task]:
+        now = time.time()
+        out = self._take(keys=self._keys, args=[now, now + visibility, limit])
+        tasks = []
+        for i in range(0, len(out), 3):
+            item = json.loads(out[i + 1])
+            tasks.append(Task(out[i].decode(), item["kind"], item["payload"], int(out[i + 2])))
+        return tasks
+
+    def ack(self, task_id: str) -> None:
+        _, inflight, body, attempts = self._keys
+        pipe = self._client.pipeline()
+        pipe.zrem(inflight, task_id)
+        pipe.hdel(body, task_id)
+        pipe.hdel(attempts, task_id)
+        pipe.execute()
+
+
+def task_queue_from_url(url: str = "") -> TaskQueue:
+    """The TaskQueue for a `worker_queue_url`-style URL."""
+    if url.startswith(("redis://", "rediss://")):
+        return RedisTaskQueue(url)
+    if url.startswith("sqlite:///"):
+        return SQLiteTaskQueue(url.removeprefix("sqlite:///"))
+    if url:
+        raise ValueError(f"Unsupported worker queue URL: {url}")
+    return SQLiteTaskQueue(os.path.join(tempfile.gettempdir(), "voss-worker-tasks.db"))
+
+
+_task_queue: TaskQueue | None = None
+
+
+def get_task_queue() -> TaskQueue:
+    """The queue for `settings.worker_queue_url`, created on first use."""
+    global _task_queue
+    if _task_queue is None:
+        _task_queue = task_queue_from_url(settings.worker_queue_url)
+    return _task_queue
+
+
+async def submit(kind: str, **payload) -> None:
+    """Hand a task to the worker: queued when it runs as its own process, run
+    here otherwise. Payload values must be JSON-serialisable."""
+    if settings.worker_enabled:
+        await asyncio.to_thread(get_task_queue().put, kind, payload)
+    else:
+        from app.worker import handle
+        await handle(kind, payload)
@@ -3,12 +3,20 @@ import logging
 import re
 from datetime import datetime, timezone
 
-from telegram import Update
-from telegram.ext import Application, CommandHandler, ContextTypes, MessageHandler, filters
+from telegram import InlineQueryResultArticle, InputTextMessageContent, Update
+from telegram.ext import Application, CommandHandler, ContextTypes, InlineQueryHandler, MessageHandler, filters
 
 from app.config import settings
-from app.helpers import contact_display_name, group_follow_ups, parse_platform_handles, today_str
-from app.services.search_service import unified_search
+from app.helpers import (
+    contact_display_name,
+    parse_platform_handles,
+    resolve_or_create_company,
+    today_str,
+)
+from app.services.digest_service import build_digest
+from app.services.dispatch_service import dispatcher
+from app.services.indexes import CLOSED_STAGES, DEAL_STAGES, PipelineView
+from app.services.search_service import suggest_contacts, unified_search
 from app.services.sheet_service import (
     companies_sheet,
     contacts_sheet,
@@ -22,13 +30,31 @@ logger = logging.getLogger(__name__)
 
 _app: Application | None = None
 
+WEBHOOK_PATH = "/api/telegram/webhook"
+# Updates handled at once in webhook mode (polling handles them one by one)
+WEBHOOK_CONCURRENCY = 16
+
+
+async def feed_update(data: dict) -> bool:
+    """Queue one Update (Telegram's JSON) for the bot's handlers. False if the
+    bot isn't running in this process."""
+    app = await get_telegram_app()
+    if app is None:
+        return False
+    await app.update_queue.put(Update.de_json(data, app.bot))
+    return True
+
 
 async def get_telegram_app() -> Application | None:
     global _app
     if not settings.telegram_enabled or not settings.telegram_bot_token:
         return None
     if _app is None:
-        _app = Application.builder().token(settings.telegram_bot_token).build()
+        builder = Application.builder().token(settings.telegram_bot_token)
+        if settings.telegram_webhook_url:
+            # Updates arrive on /api/telegram/webhook; no Updater, no polling loop
+            builder = builder.updater(None).concurrent_updates(WEBHOOK_CONCURRENCY)
+        _app = builder.build()
         _app.add_handler(CommandHandler("start", cmd_start))
         _app.add_handler(CommandHandler("help", cmd_help))
         _app.add_handler(CommandHandler("today", cmd_today))
@@ -40,16 +66,26 @@ async def get_telegram_app() -> Application | None:
         _app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_reply))
         _app.add_handler(CommandHandler("link", cmd_link))
         _app.add_handler(CommandHandler("pipeline", cmd_pipeline))
+        _app.add_handler(InlineQueryHandler(handle_inline_query))
         await _app.initialize()
         await _app.start()
-        await _app.updater.start_polling()
+        if settings.telegram_webhook_url:
+            await _app.bot.set_webhook(
+                url=settings.telegram_webhook_url.rstrip("/") + WEBHOOK_PATH,
+                secret_token=settings.telegram_webhook_secret or None,
+                allowed_updates=Update.ALL_TYPES,
+            )
+        else:
+            await _app.updater.start_polling()
     return _app
 
 
 async def stop_telegram_app():
     global _app
     if _app:
-        await _app.updater.stop()
+        # The webhook stays registered, so Telegram can wake a scaled-down API
+        if _app.updater:
+            await _app.updater.stop()
         await _app.stop()
         await _app.shutdown()
         _app = None
@@ -61,6 +97,71 @@ async def send_message(chat_id: str, text: str):
         await app.bot.send_message(chat_id=int(chat_id), text=text, parse_mode="Markdown")
 
 
+# A name argument that fits several contacts is answered with up to this many
+# of them (and their ids) instead of picking one.
+CANDIDATES_SHOWN = 5
+CANDIDATES_SCANNED = 50
+
+
+def _contact_matches(ref: str) -> list[dict]:
+    """Contacts a command's contact argument could mean: the contact with that
+    id (as inserted by an inline-query pick, with or without a leading #);
+    else those whose full name is the argument, if any; else those whose
+    name words start with the given words ("John Smith", "jo sm")."""
+    ref = ref.strip()
+    if ref and " " not in ref:
+        contact = contacts_sheet.get_by_id(ref.lstrip("#"))
+        if contact:
+            return [contact]
+    matches = suggest_contacts(ref, limit=CANDIDATES_SCANNED, include_companies=False)
+    wanted = " ".join(ref.lower().split())
+    exact = [c for c in matches if contact_display_name(c, fallback="").lower() == wanted]
+    return exact or matches
+
+
+async def _reply_contact(update: Update, ref: str) -> dict | None:
+    """The one contact a command's contact argument names. Otherwise None,
+    after telling the user there is no such contact, or listing the
+    candidates with the ids to resend with when there are several."""
+    matches = _contact_matches(ref)
+    if len(matches) == 1:
+        return matches[0]
+    if not matches:
+        await update.message.reply_text(f"Contact '{ref}' not found.")
+        return None
+    lines = [f"Several contacts match '{ref}' — resend with one of these IDs:"]
+    for c in matches[:CANDIDATES_SHOWN]:
+        company = companies_sheet.get_by_id(c.get("company_id", "")) or {}
+        detail = f" ({company['name']})" if company.get("name") else ""
+        lines.append(f"  • {contact_display_name(c)}{detail} — `{c['id']}`")
+    if len(matches) > CANDIDATES_SHOWN:
+        lines.append(f"  …and {len(matches) - CANDIDATES_SHOWN} more")
+    await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
+    return None
+
+
+INLINE_RESULTS = 10
+
+
+async def handle_inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """`@bot jo…` — contacts by name or company prefix. Picking one posts its
+    card with the contact id, which every name-taking command accepts."""
+    query = update.inline_query.query
+    results = []
+    for contact in suggest_contacts(query, limit=INLINE_RESULTS):
+        name = contact_display_name(contact)
+        company = companies_sheet.get_by_id(contact.get("company_id", "")) or {}
+        detail = " · ".join(v for v in (contact.get("role", ""), company.get("name", "")) if v)
+        card = f"*{name}*" + (f" — {detail}" if detail else "") + f"\nID: `{contact['id']}`"
+        results.append(InlineQueryResultArticle(
+            id=contact["id"],
+            title=name,
+            description=detail or None,
+            input_message_content=InputTextMessageContent(card, parse_mode="Markdown"),
+        ))
+    await update.inline_query.answer(results, cache_time=0, is_personal=True)
+
+
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = update.effective_chat.id
     username = update.effective_user.username or "unknown"
@@ -91,32 +192,29 @@ async def cmd_help(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "/find query — search contacts & companies\n"
         "/link @handle Name — link social handle to contact\n"
         "/pipeline — deal summary\n"
-        "/help — show this message",
+        "/help — show this message\n\n"
+        "Type @ and the bot's username, then a few letters of a name or company, "
+        "to look up a contact. Commands that take a name also take its ID.",
         parse_mode="Markdown",
     )
 
 
 async def cmd_today(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    today = today_str()
-    follow_ups = follow_ups_sheet.get_all({"status": "pending"})
-    groups = group_follow_ups(follow_ups, today)
-    overdue = groups["overdue"]
-    todays = groups["today"]
+    digest = build_digest()
+    overdue, todays = digest["overdue"], digest["due_today"]
 
     lines = ["*Today's Follow-ups*\n"]
 
     if overdue:
         lines.append(f"*Overdue ({len(overdue)}):*")
         for f in overdue[:10]:
-            contact = contacts_sheet.get_by_id(f.get("contact_id", ""))
-            name = contact_display_name(contact)
+            name = f["contact_name"] or "Unknown"
             lines.append(f"  ❗ {f.get('title', '')} — {name} (due {f.get('due_date', '')})")
 
     if todays:
         lines.append(f"\n*Due Today ({len(todays)}):*")
         for f in todays:
-            contact = contacts_sheet.get_by_id(f.get("contact_id", ""))
-            name = contact_display_name(contact)
+            name = f["contact_name"] or "Unknown"
             time_str = f" at {f['due_time']}" if f.get("due_time") else ""
             lines.append(f"  • {f.get('title', '')} — {name}{time_str}")
 
@@ -146,20 +244,10 @@ async def cmd_note(update: Update, context: ContextTypes.DEFAULT_TYPE):
     urls = re.findall(url_pattern, note_body)
     url_str = urls[0] if urls else ""
 
-    # Search for contact
-    name_parts = contact_name.split()
-    contacts = contacts_sheet.search(name_parts[0], ["first_name", "last_name"])
-    if len(name_parts) > 1:
-        contacts = [
-            c for c in contacts
-            if name_parts[-1].lower() in c.get("last_name", "").lower()
-        ]
-
-    if not contacts:
-        await update.message.reply_text(f"Contact '{contact_name}' not found.")
+    contact = await _reply_contact(update, contact_name)
+    if not contact:
         return
 
-    contact = contacts[0]
     interactions_sheet.create({
         "contact_id": contact["id"],
         "type": "note",
@@ -195,15 +283,7 @@ async def cmd_new(update: Update, context: ContextTypes.DEFAULT_TYPE):
     engagement_stage = parts[4] if len(parts) > 4 else "new"
     inbound_channel = parts[5] if len(parts) > 5 else ""
 
-    # Resolve company
-    company_id = ""
-    if company_name:
-        company = companies_sheet.find_by_field("name", company_name)
-        if company:
-            company_id = company["id"]
-        else:
-            new_company = companies_sheet.create({"name": company_name})
-            company_id = new_company["id"]
+    company_id = resolve_or_create_company(companies_sheet, company_name)
 
     contact = contacts_sheet.create({
         "first_name": first_name,
@@ -271,20 +351,10 @@ async def cmd_followup(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text(f"Invalid date format: {due_date}\nUse YYYY-MM-DD (e.g. 2026-03-01)")
         return
 
-    # Search for contact
-    name_parts = contact_name.split()
-    contacts = contacts_sheet.search(name_parts[0], ["first_name", "last_name"])
-    if len(name_parts) > 1:
-        contacts = [
-            c for c in contacts
-            if name_parts[-1].lower() in c.get("last_name", "").lower()
-        ]
-
-    if not contacts:
-        await update.message.reply_text(f"Contact '{contact_name}' not found.")
+    contact = await _reply_contact(update, contact_name)
+    if not contact:
         return
 
-    contact = contacts[0]
     follow_ups_sheet.create({
         "contact_id": contact["id"],
         "title": title,
@@ -307,20 +377,10 @@ async def cmd_done(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await update.message.reply_text("Usage: /done John Smith")
         return
 
-    # Search for contact
-    name_parts = text.strip().split()
-    contacts = contacts_sheet.search(name_parts[0], ["first_name", "last_name"])
-    if len(name_parts) > 1:
-        contacts = [
-            c for c in contacts
-            if name_parts[-1].lower() in c.get("last_name", "").lower()
-        ]
-
-    if not contacts:
-        await update.message.reply_text(f"Contact '{text}' not found.")
+    contact = await _reply_contact(update, text)
+    if not contact:
         return
 
-    contact = contacts[0]
     name = contact_display_name(contact)
 
     # Get pending follow-ups for this contact
@@ -516,20 +576,10 @@ async def cmd_link(update: Update, context: ContextTypes.DEFAULT_TYPE):
     else:
         platform = "instagram"  # Default
 
-    # Search for contact by name
-    name_parts = contact_name.split()
-    contacts = contacts_sheet.search(name_parts[0], ["first_name", "last_name"])
-    if len(name_parts) > 1:
-        contacts = [
-            c for c in contacts
-            if name_parts[-1].lower() in c.get("last_name", "").lower()
-        ]
-
-    if not contacts:
-        await update.message.reply_text(f"Contact '{contact_name}' not found.")
+    contact = await _reply_contact(update, contact_name)
+    if not contact:
         return
 
-    contact = contacts[0]
     handles = parse_platform_handles(contact.get("platform_handles", ""))
     handles[platform] = handle
     contacts_sheet.update(contact["id"], {"platform_handles": json.dumps(handles)})
@@ -548,11 +598,7 @@ async def notify_pending_link(event, contact: dict):
 
     Called from the social capture endpoint.
     """
-    from app.services.sheet_service import users_sheet
-
-    # Find users with telegram_chat_id set
-    users = users_sheet.get_all()
-    chat_ids = [u["telegram_chat_id"] for u in users if u.get("telegram_chat_id")]
+    chat_ids = dispatcher.recipients()
 
     if not chat_ids:
         return
@@ -655,8 +701,6 @@ async def cmd_find(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def notify_deal_suggestion(contact_id: str, title: str, notes: str = "", notification_id: str = ""):
     """Send an actionable Telegram notification when a deal-worthy interaction is logged."""
-    from app.services.sheet_service import users_sheet
-
     try:
         contact = contacts_sheet.get_by_id(contact_id)
         name = contact_display_name(contact, fallback="Unknown")
@@ -672,13 +716,7 @@ async def notify_deal_suggestion(contact_id: str, title: str, notes: str = "", n
             f"  3️⃣ Ignore"
         )
 
-        chat_ids = [
-            u["telegram_chat_id"]
-            for u in users_sheet.get_all()
-            if u.get("telegram_chat_id")
-        ]
-
-        for chat_id in chat_ids:
+        for chat_id in dispatcher.recipients():
             await send_message(chat_id, msg)
             app = await get_telegram_app()
             if app:
@@ -754,24 +792,23 @@ async def _handle_deal_suggestion_reply(update: Update, context: ContextTypes.DE
 
 
 async def cmd_pipeline(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    deals = deals_sheet.get_all()
-    active = [d for d in deals if d.get("stage") not in ("won", "lost")]
-
-    stages = ["lead", "prospect", "qualified", "proposal", "negotiation"]
+    pipeline = deals_sheet.view(PipelineView)
     lines = ["*Pipeline Summary*\n"]
 
+    # Every deal not won/lost counts as active, but only the listed open
+    # stages add to the active value — a deal in an unknown stage is counted
+    # without its value, as before PipelineView (whose open_value() sums it).
     total_value = 0
-    for stage in stages:
-        stage_deals = [d for d in active if d.get("stage") == stage]
-        value = sum(float(d.get("value") or 0) for d in stage_deals)
-        total_value += value
-        if stage_deals:
-            lines.append(f"  *{stage.title()}*: {len(stage_deals)} deals (${value:,.0f})")
-
-    won = [d for d in deals if d.get("stage") == "won"]
-    won_value = sum(float(d.get("value") or 0) for d in won)
-
-    lines.append(f"\n*Total active*: {len(active)} deals (${total_value:,.0f})")
-    lines.append(f"*Won*: {len(won)} deals (${won_value:,.0f})")
+    for stage in DEAL_STAGES:
+        if stage in CLOSED_STAGES:
+            continue
+        agg = pipeline.stage(stage)
+        total_value += agg["value"]
+        if agg["count"]:
+            lines.append(f"  *{stage.title()}*: {agg['count']} deals (${agg['value']:,.0f})")
+
+    won = pipeline.stage("won")
+    lines.append(f"\n*Total active*: {pipeline.open_count()} deals (${total_value:,.0f})")
+    lines.append(f"*Won*: {won['count']} deals (${won['value']:,.0f})")
 
     await update.message.reply_text("\n".join(lines), parse_mode="Markdown")
@@ -0,0 +1,157 @@
+"""Background worker: the Telegram bot, the scheduler and the API's task queue.
+
+Runs inside the API process by default. With `settings.worker_enabled` it runs
+as its own process instead (run_worker.py), so the bot's polling loop and the
+scheduler's blocking Sheets calls stay off the API's event loop and the API
+can scale (to zero, too) on its own. Both share the data layer; the API
+reaches the worker through app.services.task_queue, whose tasks are handled
+here.
+"""
+
+import asyncio
+import logging
+import signal
+
+from app.config import settings
+from app.logging_setup import configure_logging
+from app.services.sheet_service import follow_ups_sheet
+from app.services.task_queue import get_task_queue
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL_SECONDS = 0.5
+MAX_ATTEMPTS = 5
+
+
+async def _pending_link(payload: dict) -> None:
+    from app.routers.social import EngagementEvent
+    from app.services.telegram_service import notify_pending_link
+    await notify_pending_link(EngagementEvent.model_validate(payload["event"]), payload["contact"])
+
+
+async def _deal_suggestion(payload: dict) -> None:
+    from app.services.telegram_service import notify_deal_suggestion
+    await notify_deal_suggestion(
+        payload["contact_id"], payload["title"], payload.get("notes", ""),
+        notification_id=payload.get("notification_id", ""),
+    )
+
+
+async def _follow_ups_changed(payload: dict) -> None:
+    """The API wrote to FollowUps. In a separate worker the cached tab is now
+    stale, so re-read it before the reminder timer re-arms."""
+    from app.scheduler import reminder_timer
+    if settings.worker_enabled:
+        await asyncio.to_thread(follow_ups_sheet.refresh)
+    reminder_timer.wake()
+
+
+async def _telegram_update(payload: dict) -> None:
+    """An update posted to /api/telegram/webhook."""
+    from app.services.telegram_service import feed_update
+    if not await feed_update(payload["update"]):
+        logger.warning("Telegram update received but the bot is not running")
+
+
+HANDLERS = {
+    "telegram_update": _telegram_update,
+    "pending_link": _pending_link,
+    "deal_suggestion": _deal_suggestion,
+    "follow_ups_changed": _follow_ups_changed,
+}
+
+
+async def handle(kind: str, payload: dict) -> bool:
+    """Run the task's handler. False if it failed and the task should be
+    retried; an unknown kind is logged and dropped."""
+    handler = HANDLERS.get(kind)
+    if handler is None:
+        logger.error(f"Unknown worker task: {kind}")
+        return True
+    try:
+        await handler(payload)
+    except Exception as e:
+        logger.error(f"Worker task {kind} failed: {e}")
+        return False
+    return True
+
+
+async def consume(poll_interval: float = POLL_INTERVAL_SECONDS):
+    """Drain the task queue forever, oldest task first. A task is acked once
+    its handler succeeds; a failed one is left to reappear after the queue's
+    visibility timeout, up to MAX_ATTEMPTS deliveries."""
+    while True:
+        try:
+            queue = get_task_queue()
+            tasks = await asyncio.to_thread(queue.take)
+        except Exception as e:
+            logger.error(f"Failed to read worker tasks: {e}")
+            tasks = []
+        for task in tasks:
+            if not await handle(task.kind, task.payload):
+                if task.attempts < MAX_ATTEMPTS:
+                    continue
+                logger.error(f"Worker task {task.kind} failed {task.attempts} times, dropping it")
+            try:
+                await asyncio.to_thread(queue.ack, task.id)
+            except Exception as e:
+                logger.error(f"Failed to ack worker task {task.kind}: {e}")
+        if not tasks:
+            await asyncio.sleep(poll_interval)
+
+
+async def start():
+    """Start the Telegram bot and the scheduler, if Telegram is enabled."""
+    if not settings.telegram_enabled:
+        return
+    try:
+        from app.services.telegram_service import get_telegram_app
+        await get_telegram_app()
+        logger.info("Telegram bot started")
+    except Exception as e:
+        logger.error(f"Failed to start Telegram bot: {e}")
+
+    try:
+        from app.scheduler import start_scheduler
+        start_scheduler()
+        logger.info("Scheduler started")
+    except Exception as e:
+        logger.error(f"Failed to start scheduler: {e}")
+
+
+async def stop():
+    if not settings.telegram_enabled:
+        return
+    try:
+        from app.services.telegram_service import stop_telegram_app
+        await stop_telegram_app()
+    except Exception as e:
+        logger.error(f"Error stopping Telegram bot: {e}")
+    try:
+        from app.scheduler import stop_scheduler
+        stop_scheduler()
+    except Exception as e:
+        logger.error(f"Error stopping scheduler: {e}")
+
+
+async def main():
+    """run_worker.py: host the bot and scheduler and drain the task queue
+    until SIGINT/SIGTERM."""
+    configure_logging()
+    logger.info(f"Starting CRM worker (env={settings.app_env})")
+    if settings.app_env == "production":
+        settings.validate_production()
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await start()
+    consumer = asyncio.create_task(consume())
+    try:
+        await stopping.wait()
+    finally:
+        consumer.cancel()
+        await stop()
+        logger.info("CRM worker stopped")
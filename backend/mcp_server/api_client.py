@@ -1,10 +1,47 @@
-"""HTTP client for the VOSS CRM API."""
-
-import json
+"""HTTP client for the VOSS CRM API.
+
+All tools share one pooled `httpx.AsyncClient`, so calls reuse keep-alive
+connections instead of paying a TCP + TLS handshake each time, and
+independent calls can run concurrently (see `asyncio.gather` in the tools).
+HTTP/2 is used when the `h2` package is installed; a single HTTP/2
+connection then multiplexes the parallel calls.
+
+With VOSS_MCP_TRANSPORT=inprocess the client talks to the API's routers
+through an ASGI transport instead of a socket: requests run the same routers
+and services as the HTTP API, against this process's SheetService cache,
+with no network hop, TLS or API-key check. The routers are mounted on an app
+of the client's own, without the API's middleware, and only that app trusts
+this process as its caller; it is served on an event loop in a separate
+thread — one per process, whichever loop the caller runs on — so the
+routes' blocking Sheets calls don't stall the MCP server's loop. Use it when the MCP server runs on the host that holds the Google
+credentials; remote deployments keep the default HTTP transport.
+"""
+
+import asyncio
 import os
-import urllib.request
-import urllib.error
-import urllib.parse
+import threading
+
+import httpx
+
+TIMEOUT_SECONDS = 30.0
+CONNECT_TIMEOUT_SECONDS = 10.0
+MAX_CONNECTIONS = 10
+MAX_KEEPALIVE_CONNECTIONS = 5
+KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+TRANSPORTS = ("http", "inprocess")
+INPROCESS_BASE_URL = "http://voss.inprocess"
+_INPROCESS_USER = {"id": "mcp-inprocess", "username": "mcp-inprocess"}
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_transport() -> str:
+    transport = os.environ.get("VOSS_MCP_TRANSPORT", "http").strip().lower() or "http"
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unsupported VOSS_MCP_TRANSPORT: {transport}")
+    return transport
 
 
 def _get_config():
@@ -13,66 +50,152 @@ def _get_config():
     return api_url.rstrip("/"), api_key
 
 
-def api_get(path: str, params: dict | None = None) -> dict | list:
-    """Make a GET request to the VOSS API."""
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _inprocess_app():
+    """An app with the API's routes and this process trusted as its caller.
+    The auth override is set on this app only — the API app, if it runs in
+    this process too, still authenticates. No middleware and no lifespan
+    (bot, scheduler)."""
+    from fastapi import APIRouter, FastAPI
+    from fastapi.routing import APIRoute
+
+    from app.dependencies import get_current_user
+    from app.limiter import limiter
+    from app.main import app as api_app
+
+    # Re-included rather than shared: a route resolves overrides through the
+    # app it was included into.
+    routes = APIRouter()
+    routes.routes.extend(r for r in api_app.routes if isinstance(r, APIRoute))
+    app = FastAPI()
+    app.state.limiter = limiter
+    app.include_router(routes)
+    app.dependency_overrides[get_current_user] = lambda: _INPROCESS_USER
+    return app
+
+
+class _LoopThreadTransport(httpx.AsyncBaseTransport):
+    """Serves requests through an ASGI app on an event loop in a thread of its
+    own. Background tasks a route starts keep running on that loop after the
+    response. One is shared by every client in the process (see
+    _inprocess_transport), so closing a client leaves it running."""
+
+    def __init__(self, app):
+        self._inner = httpx.ASGITransport(app=app)
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._run, name="voss-mcp-inprocess", daemon=True).start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        future = asyncio.run_coroutine_threadsafe(self._inner.handle_async_request(request), self._loop)
+        return await asyncio.wrap_future(future)
+
+
+_inprocess: _LoopThreadTransport | None = None
+
+
+def _inprocess_transport() -> _LoopThreadTransport:
+    """The process's in-process transport and its loop thread, created once.
+    Clients come and go with the caller's event loop; the thread does not."""
+    global _inprocess
+    if _inprocess is None:
+        _inprocess = _LoopThreadTransport(_inprocess_app())
+    return _inprocess
+
+
+def _new_client() -> httpx.AsyncClient:
+    timeout = httpx.Timeout(TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS)
+    if _get_transport() == "inprocess":
+        return httpx.AsyncClient(
+            transport=_inprocess_transport(),
+            base_url=INPROCESS_BASE_URL,
+            timeout=timeout,
+        )
     base_url, api_key = _get_config()
-    url = f"{base_url}{path}"
+    return httpx.AsyncClient(
+        base_url=base_url,
+        headers={"X-API-Key": api_key},
+        http2=_http2_available(),
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client, created on first use. An httpx client belongs to
+    the event loop it first ran on, so a new loop gets a new client."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _discard(_client, _client_loop)
+        _client = _new_client()
+        _client_loop = loop
+    return _client
+
+
+def _discard(client: httpx.AsyncClient | None, loop: asyncio.AbstractEventLoop | None) -> None:
+    """Close a client being replaced, on the loop it belongs to if that loop
+    still runs; a finished loop has already dropped its connections."""
+    if client is not None and not client.is_closed and loop is not None and loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+
+async def aclose() -> None:
+    """Close the shared client's pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _request(
+    method: str, path: str, *, params: dict | None = None,
+    data: dict | None = None, timeout: float | None = None,
+) -> dict | list:
+    kwargs = {}
     if params:
-        filtered = {k: v for k, v in params.items() if v is not None and v != ""}
-        if filtered:
-            url += "?" + urllib.parse.urlencode(filtered)
-
-    req = urllib.request.Request(url)
-    req.add_header("X-API-Key", api_key)
-
-    try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read())
-    except urllib.error.HTTPError as e:
-        body = e.read().decode()
-        raise RuntimeError(f"API error {e.code}: {body}") from e
+        kwargs["params"] = params
+    if data is not None:
+        kwargs["json"] = data
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    resp = await get_client().request(method, path, **kwargs)
+    if resp.is_error:
+        raise RuntimeError(f"API error {resp.status_code}: {resp.text}")
+    return resp.json()
+
+
+async def api_get(path: str, params: dict | None = None, timeout: float | None = None) -> dict | list:
+    """Make a GET request to the VOSS API."""
+    if params:
+        params = {k: v for k, v in params.items() if v is not None and v != ""}
+    return await _request("GET", path, params=params, timeout=timeout)
 
 
-def api_post(path: str, data: dict) -> dict:
+async def api_post(path: str, data: dict, timeout: float | None = None) -> dict:
     """Make a POST request to the VOSS API."""
-    base_url, api_key = _get_config()
-    url = f"{base_url}{path}"
-
-    body = json.dumps(data).encode()
-    req = urllib.request.Request(url, data=body, method="POST")
-    req.add_header("Content-Type", "application/json")
-    req.add_header("X-API-Key", api_key)
-
-    try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read())
-    except urllib.error.HTTPError as e:
-        body = e.read().decode()
-        raise RuntimeError(f"API error {e.code}: {body}") from e
+    return await _request("POST", path, data=data, timeout=timeout)
 
 
-def api_put(path: str, data: dict) -> dict:
+async def api_put(path: str, data: dict, timeout: float | None = None) -> dict:
     """Make a PUT request to the VOSS API."""
-    return _api_write(path, data, "PUT")
+    return await _request("PUT", path, data=data, timeout=timeout)
 
 
-def api_patch(path: str, data: dict | None = None) -> dict:
+async def api_patch(path: str, data: dict | None = None, timeout: float | None = None) -> dict:
     """Make a PATCH request to the VOSS API."""
-    return _api_write(path, data or {}, "PATCH")
-
-
-def _api_write(path: str, data: dict, method: str) -> dict:
-    base_url, api_key = _get_config()
-    url = f"{base_url}{path}"
-
-    body = json.dumps(data).encode()
-    req = urllib.request.Request(url, data=body, method=method)
-    req.add_header("Content-Type", "application/json")
-    req.add_header("X-API-Key", api_key)
-
-    try:
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read())
-    except urllib.error.HTTPError as e:
-        body = e.read().decode()
-        raise RuntimeError(f"API error {e.code}: {body}") from e
+    return await _request("PATCH", path, data=data or {}, timeout=timeout)
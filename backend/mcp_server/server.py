@@ -1,7 +1,5 @@
 """Voss CRM MCP Server — wires up all tools using FastMCP."""
 
-import asyncio
-
 from mcp.server.fastmcp import FastMCP
 
 from mcp_server.tools.companies import update_company
@@ -35,8 +33,7 @@ async def tool_search(query: str = "", role: str = "", segment: str = "",
     - segment / engagement_stage: exact match on those fields
     - tags: substring match on tags
     A filters-only call (no query text) returns the whole filtered group."""
-    return await asyncio.to_thread(
-        search_voss, query, role, segment, engagement_stage, tags)
+    return await search_voss(query, role, segment, engagement_stage, tags)
 
 
 # --- Contacts ---
@@ -44,7 +41,7 @@ async def tool_search(query: str = "", role: str = "", segment: str = "",
 @mcp.tool()
 async def tool_get_contact_details(contact_id: str) :
     """Get full profile for a contact including interactions, deals, and follow-ups."""
-    return await asyncio.to_thread(get_contact_details, contact_id)
+    return await get_contact_details(contact_id)
 
 
 @mcp.tool()
@@ -72,8 +69,8 @@ async def tool_update_contact(
     this — not log_interaction — when capturing a structured fact about a
     contact. company_name is resolved server-side and the company is created
     automatically if it doesn't exist."""
-    return await asyncio.to_thread(
-        update_contact, contact_id, first_name, last_name, email, phone,
+    return await update_contact(
+        contact_id, first_name, last_name, email, phone,
         role, linkedin_url, platform_handles, urls,
         company_name, company_id,
         tags, notes, segment, engagement_stage,
@@ -98,8 +95,8 @@ async def tool_create_contact(
 ) :
     """Create a new contact in the CRM. company_name is resolved server-side
     and the company is created automatically if it doesn't exist."""
-    return await asyncio.to_thread(
-        create_contact, first_name, last_name, email, phone,
+    return await create_contact(
+        first_name, last_name, email, phone,
         role, company_name, source, tags, notes,
         segment, engagement_stage, inbound_channel,
     )
@@ -120,8 +117,8 @@ async def tool_update_company(
     notes, or rename). Use this when you've learned something about a
     company so the fact lands on the company entity, not buried in an
     interaction note."""
-    return await asyncio.to_thread(
-        update_company, company_id, name, industry, website, size, notes,
+    return await update_company(
+        company_id, name, industry, website, size, notes,
     )
 
 
@@ -137,8 +134,8 @@ async def tool_log_interaction(
     deal_id: str = "",
 ) :
     """Log an interaction (call, email, meeting, or note) with a contact."""
-    return await asyncio.to_thread(
-        log_interaction, contact_id, type, subject, body, direction, deal_id,
+    return await log_interaction(
+        contact_id, type, subject, body, direction, deal_id,
     )
 
 
@@ -149,8 +146,8 @@ async def tool_get_interaction_history(
     limit: int = 20,
 ) :
     """Get recent interaction history, optionally filtered by contact or deal."""
-    return await asyncio.to_thread(
-        get_interaction_history, contact_id, deal_id, limit,
+    return await get_interaction_history(
+        contact_id, deal_id, limit,
     )
 
 
@@ -167,8 +164,8 @@ async def tool_update_interaction(
     """Amend a previously-logged interaction — typo fixes, body additions,
     direction correction. Prefer this over logging a duplicate interaction
     when the right thing is to update an existing record."""
-    return await asyncio.to_thread(
-        update_interaction, interaction_id, type, subject, body,
+    return await update_interaction(
+        interaction_id, type, subject, body,
         direction, url, occurred_at,
     )
 
@@ -178,19 +175,19 @@ async def tool_update_interaction(
 @mcp.tool()
 async def tool_get_pipeline() :
     """Get an overview of all deals grouped by stage with values."""
-    return await asyncio.to_thread(get_pipeline)
+    return await get_pipeline()
 
 
 @mcp.tool()
 async def tool_get_deal(deal_id: str) :
     """Get full details about a specific deal."""
-    return await asyncio.to_thread(get_deal, deal_id)
+    return await get_deal(deal_id)
 
 
 @mcp.tool()
 async def tool_update_deal_stage(deal_id: str, stage: str) :
     """Move a deal to a new pipeline stage. Valid stages: lead, prospect, qualified, proposal, negotiation, won, lost."""
-    return await asyncio.to_thread(update_deal_stage, deal_id, stage)
+    return await update_deal_stage(deal_id, stage)
 
 
 @mcp.tool()
@@ -206,8 +203,8 @@ async def tool_create_deal(
     notes: str = "",
 ) :
     """Create a new deal. Accepts contact/company names (resolved automatically)."""
-    return await asyncio.to_thread(
-        create_deal, title, contact_name, company_name, stage,
+    return await create_deal(
+        title, contact_name, company_name, stage,
         value, currency, priority, expected_close, notes,
     )
 
@@ -223,8 +220,8 @@ async def tool_promote_contact_to_deal(
     notes: str = "",
 ) :
     """Create a deal from a contact, automatically resolving their company. Handy after logging a deal-worthy interaction."""
-    return await asyncio.to_thread(
-        promote_contact_to_deal, contact_name, title, stage,
+    return await promote_contact_to_deal(
+        contact_name, title, stage,
         value, currency, priority, notes,
     )
 
@@ -243,8 +240,8 @@ async def tool_update_deal(
     notes: str = "",
 ) :
     """Update an existing deal. Only provided fields are changed. Accepts contact/company names."""
-    return await asyncio.to_thread(
-        update_deal, deal_id, title, contact_name, company_name, stage,
+    return await update_deal(
+        deal_id, title, contact_name, company_name, stage,
         value, currency, priority, expected_close, notes,
     )
 
@@ -258,8 +255,8 @@ async def tool_get_follow_ups(
     contact_id: str = "",
 ) :
     """Get follow-ups, optionally filtered by status, overdue, or contact."""
-    return await asyncio.to_thread(
-        get_follow_ups, status, overdue_only, contact_id,
+    return await get_follow_ups(
+        status, overdue_only, contact_id,
     )
 
 
@@ -273,15 +270,15 @@ async def tool_create_follow_up(
     notes: str = "",
 ) :
     """Schedule a new follow-up for a contact. due_date format: YYYY-MM-DD."""
-    return await asyncio.to_thread(
-        create_follow_up, contact_id, title, due_date, due_time, deal_id, notes,
+    return await create_follow_up(
+        contact_id, title, due_date, due_time, deal_id, notes,
     )
 
 
 @mcp.tool()
 async def tool_complete_follow_up(follow_up_id: str) :
     """Mark a follow-up as completed."""
-    return await asyncio.to_thread(complete_follow_up, follow_up_id)
+    return await complete_follow_up(follow_up_id)
 
 
 @mcp.tool()
@@ -297,8 +294,8 @@ async def tool_update_follow_up(
     For rescheduling specifically (which sets status to 'snoozed' and clears
     reminder_sent so the new date triggers a fresh notification), use
     tool_snooze_follow_up — its side-effects matter for downstream alerting."""
-    return await asyncio.to_thread(
-        update_follow_up, follow_up_id, title, due_date, due_time, notes, status,
+    return await update_follow_up(
+        follow_up_id, title, due_date, due_time, notes, status,
     )
 
 
@@ -312,8 +309,8 @@ async def tool_snooze_follow_up(
     Sets status='snoozed' and clears reminder_sent so the new due date
     triggers a fresh notification. Use this rather than tool_update_follow_up
     for reschedule operations."""
-    return await asyncio.to_thread(
-        snooze_follow_up, follow_up_id, due_date, due_time,
+    return await snooze_follow_up(
+        follow_up_id, due_date, due_time,
     )
 
 
@@ -322,4 +319,4 @@ async def tool_snooze_follow_up(
 @mcp.tool()
 async def tool_get_dashboard_summary() :
     """Get a high-level CRM dashboard: pipeline summary, overdue follow-ups, today's tasks, and recent activity."""
-    return await asyncio.to_thread(get_dashboard_summary)
+    return await get_dashboard_summary()
@@ -6,7 +6,7 @@ from mcp_server.api_client import api_put
 _UPDATE_FIELDS = ("name", "industry", "website", "size", "notes")
 
 
-def update_company(
+async def update_company(
     company_id: str,
     name: str = "",
     industry: str = "",
@@ -20,6 +20,6 @@ def update_company(
     payload = {k: v for k, v in locals().items() if k in _UPDATE_FIELDS and v}
     if not payload:
         return "No fields to update."
-    record = api_put(f"/api/companies/{company_id}", payload)
+    record = await api_put(f"/api/companies/{company_id}", payload)
     display = record.get("name") or company_id
     return f"Updated company **{display}** (ID: {company_id})."
@@ -15,7 +15,7 @@ _UPDATE_FIELDS = (
 )
 
 
-def update_contact(
+async def update_contact(
     contact_id: str,
     first_name: str = "",
     last_name: str = "",
@@ -42,13 +42,17 @@ def update_contact(
     }
     if not payload:
         return "No fields to update."
-    record = api_put(f"/api/contacts/{contact_id}", payload)
+    record = await api_put(f"/api/contacts/{contact_id}", payload)
     name = contact_name(record)
     return f"Updated contact **{name}** (ID: {contact_id})."
 
 
-def get_contact_details(contact_id: str) -> str:
-    contact = api_get(f"/api/contacts/{contact_id}")
+async def get_contact_details(contact_id: str) -> str:
+    full = await api_get(
+        f"/api/contacts/{contact_id}/full",
+        {"include": "deals,interactions,follow_ups", "follow_up_status": "pending", "interactions_limit": "10"},
+    )
+    contact, deals, fups = full["contact"], full["deals"], full["follow_ups"]
     name = contact_name(contact)
 
     lines = [f"# {name}"]
@@ -73,7 +77,6 @@ def get_contact_details(contact_id: str) -> str:
         lines.append("")
 
     # Deals for this contact
-    deals = api_get("/api/deals", {"contact_id": contact_id})
     if deals:
         lines.append(f"## Deals ({len(deals)})")
         for d in deals:
@@ -85,7 +88,6 @@ def get_contact_details(contact_id: str) -> str:
         lines.append("")
 
     # Follow-ups for this contact
-    fups = api_get("/api/follow-ups", {"contact_id": contact_id, "status": "pending"})
     if fups:
         lines.append(f"## Pending Follow-ups ({len(fups)})")
         for f in fups:
@@ -95,10 +97,10 @@ def get_contact_details(contact_id: str) -> str:
             lines.append(f"- {f.get('title', 'Untitled')} — due {due} (ID: {f['id']})")
         lines.append("")
 
-    # Recent interactions
-    interactions = api_get("/api/interactions", {"contact_id": contact_id, "limit": "10"})
+    # Recent interactions, newest first
+    interactions = full["interactions"]
     if interactions:
-        lines.append(f"## Recent Interactions (last {len(interactions)})")
+        lines.append(f"## Recent Interactions (last {len(interactions)} of {full['counts']['interactions']})")
         for i in interactions:
             date = (i.get("occurred_at") or i.get("created_at", ""))[:10]
             direction = f" [{i.get('direction')}]" if i.get("direction") else ""
@@ -110,7 +112,7 @@ def get_contact_details(contact_id: str) -> str:
     return "\n".join(lines)
 
 
-def create_contact(
+async def create_contact(
     first_name: str,
     last_name: str = "",
     email: str = "",
@@ -142,7 +144,7 @@ def create_contact(
     data = {k: v for k, v in data.items() if v}
     data["first_name"] = first_name  # always required
 
-    record = api_post("/api/contacts", data)
+    record = await api_post("/api/contacts", data)
     name = f"{first_name} {last_name}".strip()
     # The API dedups: a re-add of an existing person enriches that contact rather
     # than creating a duplicate. Report which happened so the agent doesn't claim
@@ -5,8 +5,8 @@ import json
 from mcp_server.api_client import api_get
 
 
-def get_dashboard_summary() -> str:
-    summary = api_get("/api/dashboard/summary")
+async def get_dashboard_summary() -> str:
+    summary = await api_get("/api/dashboard/summary")
     lines = ["# CRM Dashboard\n"]
 
     # Pipeline
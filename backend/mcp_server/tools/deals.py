@@ -1,12 +1,14 @@
 """Deal tools — calls VOSS API over HTTP."""
 
+import asyncio
+
 from mcp_server.api_client import api_get, api_post, api_put
 from mcp_server.helpers import format_currency
 
 
-def get_pipeline() -> str:
-    deals = api_get("/api/deals")
-    if not deals:
+async def get_pipeline() -> str:
+    pipeline, deals = await asyncio.gather(api_get("/api/deals/pipeline"), api_get("/api/deals"))
+    if not pipeline.get("total_count"):
         return "No deals in the pipeline."
 
     stages = {}
@@ -14,15 +16,15 @@ def get_pipeline() -> str:
         stage = d.get("stage", "unknown")
         stages.setdefault(stage, []).append(d)
 
-    stage_order = ["lead", "prospect", "qualified", "proposal", "negotiation", "won", "lost"]
     lines = ["# Deal Pipeline\n"]
-    for stage in stage_order:
-        if stage not in stages:
+    for stage, agg in pipeline["stages"].items():
+        if not agg["count"]:
             continue
-        stage_deals = stages[stage]
-        total = sum(float(d.get("value", 0) or 0) for d in stage_deals)
-        lines.append(f"## {stage.upper()} ({len(stage_deals)} deals — {format_currency(str(total))})")
-        for d in stage_deals:
+        totals = " + ".join(
+            format_currency(str(value), currency) for currency, value in agg["by_currency"].items()
+        ) or format_currency("0")
+        lines.append(f"## {stage.upper()} ({agg['count']} deals — {totals})")
+        for d in stages.get(stage, []):
             val = format_currency(d.get("value", "0"), d.get("currency", "GBP"))
             contact = d.get("contact_name", "")
             lines.append(f"- {d.get('title', 'Untitled')} — {val}" + (f" ({contact})" if contact else "") + f" [ID: {d['id']}]")
@@ -30,8 +32,8 @@ def get_pipeline() -> str:
     return "\n".join(lines)
 
 
-def get_deal(deal_id: str) -> str:
-    deal = api_get(f"/api/deals/{deal_id}")
+async def get_deal(deal_id: str) -> str:
+    deal = await api_get(f"/api/deals/{deal_id}")
     lines = [f"# {deal.get('title', 'Untitled')}"]
     lines.append(f"Stage: {deal.get('stage', '').upper()}")
     lines.append(f"Value: {format_currency(deal.get('value', '0'), deal.get('currency', 'GBP'))}")
@@ -49,12 +51,12 @@ def get_deal(deal_id: str) -> str:
     return "\n".join(lines)
 
 
-def update_deal_stage(deal_id: str, stage: str) -> str:
-    deal = api_put(f"/api/deals/{deal_id}", {"stage": stage})
+async def update_deal_stage(deal_id: str, stage: str) -> str:
+    deal = await api_put(f"/api/deals/{deal_id}", {"stage": stage})
     return f"Deal **{deal.get('title', deal_id)}** moved to **{stage.upper()}**."
 
 
-def create_deal(
+async def create_deal(
     title: str,
     contact_name: str = "",
     company_name: str = "",
@@ -82,11 +84,11 @@ def create_deal(
     if notes:
         data["notes"] = notes
 
-    deal = api_post("/api/deals", data)
+    deal = await api_post("/api/deals", data)
     return f"Created deal **{title}** (ID: {deal['id']}) in stage {stage.upper()}."
 
 
-def promote_contact_to_deal(
+async def promote_contact_to_deal(
     contact_name_str: str,
     title: str,
     stage: str = "lead",
@@ -95,7 +97,7 @@ def promote_contact_to_deal(
     priority: str = "medium",
     notes: str = "",
 ) -> str:
-    return create_deal(
+    return await create_deal(
         title=title,
         contact_name=contact_name_str,
         stage=stage,
@@ -106,7 +108,7 @@ def promote_contact_to_deal(
     )
 
 
-def update_deal(
+async def update_deal(
     deal_id: str,
     title: str = "",
     contact_name: str = "",
@@ -132,5 +134,5 @@ def update_deal(
     if not data:
         return "No fields to update."
 
-    deal = api_put(f"/api/deals/{deal_id}", data)
+    deal = await api_put(f"/api/deals/{deal_id}", data)
     return f"Updated deal **{deal.get('title', deal_id)}** (ID: {deal_id})."
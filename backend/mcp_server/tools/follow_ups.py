@@ -6,25 +6,23 @@ from mcp_server.api_client import api_get, api_patch, api_post, api_put
 _UPDATE_FIELDS = ("title", "due_date", "due_time", "notes", "status")
 
 
-def get_follow_ups(
+async def get_follow_ups(
     status: str = "pending",
     overdue_only: bool = False,
     contact_id: str = "",
 ) -> str:
-    params = {"status": status}
-    if contact_id:
-        params["contact_id"] = contact_id
-
-    fups = api_get("/api/follow-ups", params)
-    if not fups:
-        return "No follow-ups found."
-
     if overdue_only:
-        from datetime import date
-        today = date.today().isoformat()
-        fups = [f for f in fups if f.get("due_date", "") < today]
-        if not fups:
-            return "No overdue follow-ups."
+        # Overdue rows come from the digest, which carries contact names
+        fups = [] if status not in ("", "pending") else (await api_get("/api/dashboard/digest"))["overdue"]
+        if contact_id:
+            fups = [f for f in fups if f.get("contact_id") == contact_id]
+    else:
+        params = {"status": status}
+        if contact_id:
+            params["contact_id"] = contact_id
+        fups = await api_get("/api/follow-ups", params)
+    if not fups:
+        return "No overdue follow-ups." if overdue_only else "No follow-ups found."
 
     lines = [f"Found {len(fups)} follow-up(s):\n"]
     for f in fups:
@@ -40,7 +38,7 @@ def get_follow_ups(
     return "\n".join(lines)
 
 
-def create_follow_up(
+async def create_follow_up(
     contact_id: str,
     title: str,
     due_date: str,
@@ -60,16 +58,16 @@ def create_follow_up(
     if notes:
         data["notes"] = notes
 
-    fup = api_post("/api/follow-ups", data)
+    fup = await api_post("/api/follow-ups", data)
     return f"Created follow-up **{title}** due {due_date} (ID: {fup['id']})."
 
 
-def complete_follow_up(follow_up_id: str) -> str:
-    fup = api_patch(f"/api/follow-ups/{follow_up_id}/complete")
+async def complete_follow_up(follow_up_id: str) -> str:
+    fup = await api_patch(f"/api/follow-ups/{follow_up_id}/complete")
     return f"Follow-up **{fup.get('title', follow_up_id)}** marked as completed."
 
 
-def update_follow_up(
+async def update_follow_up(
     follow_up_id: str,
     title: str = "",
     due_date: str = "",
@@ -83,12 +81,12 @@ def update_follow_up(
     payload = {k: v for k, v in locals().items() if k in _UPDATE_FIELDS and v}
     if not payload:
         return "No fields to update."
-    fup = api_put(f"/api/follow-ups/{follow_up_id}", payload)
+    fup = await api_put(f"/api/follow-ups/{follow_up_id}", payload)
     title_disp = fup.get("title") or follow_up_id
     return f"Updated follow-up \"{title_disp}\" (ID: {follow_up_id})."
 
 
-def snooze_follow_up(
+async def snooze_follow_up(
     follow_up_id: str,
     due_date: str,
     due_time: str = "",
@@ -98,7 +96,7 @@ def snooze_follow_up(
     due_date is required (YYYY-MM-DD)."""
     if not due_date or not due_date.strip():
         raise ValueError("snooze_follow_up requires a due_date (YYYY-MM-DD)")
-    fup = api_patch(
+    fup = await api_patch(
         f"/api/follow-ups/{follow_up_id}/snooze",
         {"due_date": due_date, "due_time": due_time},
     )
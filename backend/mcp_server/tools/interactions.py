@@ -6,7 +6,7 @@ from mcp_server.api_client import api_get, api_post, api_put
 _UPDATE_FIELDS = ("type", "subject", "body", "direction", "url", "occurred_at")
 
 
-def update_interaction(
+async def update_interaction(
     interaction_id: str,
     type: str = "",
     subject: str = "",
@@ -21,12 +21,12 @@ def update_interaction(
     payload = {k: v for k, v in locals().items() if k in _UPDATE_FIELDS and v}
     if not payload:
         return "No fields to update."
-    record = api_put(f"/api/interactions/{interaction_id}", payload)
+    record = await api_put(f"/api/interactions/{interaction_id}", payload)
     subj = record.get("subject") or "(no subject)"
     return f"Updated interaction \"{subj}\" (ID: {interaction_id})."
 
 
-def log_interaction(
+async def log_interaction(
     contact_id: str,
     type: str,
     subject: str,
@@ -46,7 +46,7 @@ def log_interaction(
     if deal_id:
         data["deal_id"] = deal_id
 
-    result = api_post("/api/interactions", data)
+    result = await api_post("/api/interactions", data)
     interaction = result.get("interaction", result)
     msg = f"Logged {type} interaction: **{subject}** (ID: {interaction['id']})"
     suggestion = result.get("suggestion")
@@ -55,7 +55,7 @@ def log_interaction(
     return msg
 
 
-def get_interaction_history(
+async def get_interaction_history(
     contact_id: str = "",
     deal_id: str = "",
     limit: int = 20,
@@ -68,7 +68,7 @@ def get_interaction_history(
     if limit != 20:
         params["limit"] = str(limit)
 
-    interactions = api_get("/api/interactions", params)
+    interactions = await api_get("/api/interactions", params)
     if not interactions:
         return "No interactions found."
 
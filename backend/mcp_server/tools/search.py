@@ -4,7 +4,7 @@ from mcp_server.api_client import api_get
 from mcp_server.helpers import format_currency
 
 
-def search(query: str, role: str = "", segment: str = "",
+async def search(query: str, role: str = "", segment: str = "",
            engagement_stage: str = "", tags: str = "") -> str:
     filters = {"role": role, "segment": segment,
                "engagement_stage": engagement_stage, "tags": tags}
@@ -13,7 +13,7 @@ def search(query: str, role: str = "", segment: str = "",
 
     params = {"q": query}
     params.update({k: v for k, v in filters.items() if v.strip()})
-    result = api_get("/api/search", params)
+    result = await api_get("/api/search", params)
     total = result.get("total", 0)
     # Describe what was searched — referencing the query text, or the filters when
     # there is no text (a filters-only call), so the message never reads "''".
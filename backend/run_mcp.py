@@ -3,6 +3,10 @@
 
 Sets up sys.path and working directory so that `app.*` imports
 and .env loading work correctly when spawned by Claude Desktop.
+
+Tools call the API at VOSS_API_URL by default; with
+VOSS_MCP_TRANSPORT=inprocess they run the API's routers in this process
+instead (see mcp_server/api_client.py).
 """
 
 import os
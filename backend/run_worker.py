@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+"""Entry point for the Voss CRM background worker.
+
+Hosts the Telegram bot, the scheduler and the API's task queue in their own
+process. Set WORKER_ENABLED=true for both this and the API so the API stops
+running them itself.
+"""
+
+import asyncio
+import os
+import sys
+
+# Same path setup as run_mcp.py, so `app.*` imports and .env loading resolve
+# wherever this is launched from.
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+os.chdir(backend_dir)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+from app.worker import main
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+"""
+Find duplicate contacts and companies across the whole CRM, and optionally merge them.
+
+Usage:
+    cd backend && python -m scripts.dedup_book           # report only
+    cd backend && python -m scripts.dedup_book --apply   # merge every proposed group
+"""
+
+import os
+import sys
+
+# Ensure the backend package is importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.dedup_service import (
+    find_company_duplicates,
+    find_contact_duplicates,
+    merge_companies,
+    merge_contacts,
+)
+
+
+def print_proposals(label: str, proposals: list[dict]) -> None:
+    print(f"{len(proposals)} {label} groups")
+    for p in proposals:
+        names = ", ".join(f"{r['name']} ({r['id']})" for r in p["records"])
+        print(f"  keep {p['keep']} <- {', '.join(p['merge'])}  [{', '.join(p['reasons'])}]  {names}")
+
+
+def main():
+    apply = "--apply" in sys.argv[1:]
+
+    companies = find_company_duplicates()
+    print_proposals("company", companies)
+    if apply and companies:
+        print(f"Merged companies: {merge_companies(companies)}")
+
+    # Re-scan contacts after company merges so company_id is already re-pointed.
+    contacts = find_contact_duplicates()
+    print_proposals("contact", contacts)
+    if apply and contacts:
+        print(f"Merged contacts: {merge_contacts(contacts)}")
+
+    if not apply and (companies or contacts):
+        print("\nRe-run with --apply to merge.")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ import sys
 # Ensure the backend package is importable
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.helpers import resolve_or_create_companies
 from app.services.sheet_service import companies_sheet, contacts_sheet
 
 CSV_PATH = os.path.expanduser(
@@ -72,33 +73,19 @@ def main():
 
     print(f"Read {len(rows)} rows from CSV")
 
-    # Fetch existing company names for dedup
-    existing = companies_sheet.get_all()
-    existing_names = {c["name"].strip().lower() for c in existing}
-    print(f"Found {len(existing_names)} existing companies in CRM")
-
-    # Prepare batches
+    # Build company records and parse each row's leaders
     company_data_list = []
-    contact_data_list = []
-    skipped = 0
+    leaders_by_row = []
 
     for row in rows:
-        company_name = row["name"].strip()
-        if company_name.lower() in existing_names:
-            skipped += 1
-            continue
-
-        # Build company record
-        company = {
-            "name": company_name,
+        company_data_list.append({
+            "name": row["name"].strip(),
             "industry": row.get("industry", "").strip(),
             "website": row.get("website", "").strip(),
             "size": row.get("employees_linkedin", "").strip(),
             "notes": build_company_notes(row),
-        }
-        company_data_list.append(company)
+        })
 
-        # Parse leaders for this company (stored temporarily, linked after bulk create)
         leaders = []
         ceo = parse_leader(row.get("ceo", ""))
         if ceo:
@@ -113,43 +100,37 @@ def main():
                 leader = parse_leader(chunk)
                 if leader:
                     leaders.append(leader)
+        leaders_by_row.append(leaders)
 
-        # Store leaders with company index so we can link after bulk create
-        for leader in leaders:
-            contact_data_list.append({
-                "_company_index": len(company_data_list) - 1,
-                **leader,
-            })
-
-    print(f"Skipped {skipped} duplicate companies")
-    print(f"Preparing to create {len(company_data_list)} companies and {len(contact_data_list)} contacts")
-
-    if not company_data_list:
-        print("Nothing to import.")
-        return
-
-    # Bulk create companies
-    print("Creating companies...")
-    created_companies = companies_sheet.bulk_create(company_data_list)
+    # Resolve every company through the normalised name/domain index in one
+    # pass; only companies not already in the CRM are created (one bulk call).
+    print("Resolving companies...")
+    company_ids, created_companies = resolve_or_create_companies(companies_sheet, company_data_list)
+    created_ids = {c["id"] for c in created_companies}
     print(f"  Created {len(created_companies)} companies")
 
-    # Build contact records with company_id links
+    # Leaders are only imported for newly created companies
     contact_records = []
-    for c in contact_data_list:
-        company_idx = c.pop("_company_index")
-        company_id = created_companies[company_idx]["id"]
-        contact_records.append({
-            "company_id": company_id,
-            "first_name": c["first_name"],
-            "last_name": c["last_name"],
-            "role": c["role"],
-            "source": "linkedin",
-            "segment": "consulting",
-            "engagement_stage": "new",
-            "inbound_channel": "cold_outbound",
-            "tags": "uk_it_consulting_prospects",
-            "status": "active",
-        })
+    skipped = 0
+    for company_id, leaders in zip(company_ids, leaders_by_row):
+        if company_id not in created_ids:
+            skipped += 1
+            continue
+        for leader in leaders:
+            contact_records.append({
+                "company_id": company_id,
+                "first_name": leader["first_name"],
+                "last_name": leader["last_name"],
+                "role": leader["role"],
+                "source": "linkedin",
+                "segment": "consulting",
+                "engagement_stage": "new",
+                "inbound_channel": "cold_outbound",
+                "tags": "uk_it_consulting_prospects",
+                "status": "active",
+            })
+
+    print(f"Skipped {skipped} rows for companies already in the CRM")
 
     # Bulk create contacts
     print("Creating contacts...")
@@ -159,7 +140,7 @@ def main():
     print(f"\nDone! Summary:")
     print(f"  Companies created: {len(created_companies)}")
     print(f"  Contacts created:  {len(created_contacts)}")
-    print(f"  Companies skipped: {skipped}")
+    print(f"  Rows skipped:      {skipped}")
 
 
 if __name__ == "__main__":
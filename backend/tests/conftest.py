@@ -1,3 +1,4 @@
+from contextlib import ExitStack
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -46,12 +47,17 @@ def _make_mock_worksheet():
             if 0 <= row_idx < len(ws._data):
                 ws._data[row_idx] = values[0]
 
+    def batch_update(data, **kwargs):
+        for item in data:
+            update(item["range"], item["values"])
+
     ws.row_values = row_values
     ws.get_all_records = get_all_records
     ws.append_row = append_row
     ws.append_rows = append_rows
     ws.delete_rows = delete_rows
     ws.update = update
+    ws.batch_update = batch_update
     return ws
 
 
@@ -67,6 +73,40 @@ def make_mock_worksheet():
     return _make_mock_worksheet
 
 
+# Every CRM tab; users is left to the auth fixtures.
+BOOK_TABS = (
+    "contacts_sheet",
+    "companies_sheet",
+    "deals_sheet",
+    "interactions_sheet",
+    "follow_ups_sheet",
+    "notifications_sheet",
+    "pipeline_history_sheet",
+)
+
+
+@pytest.fixture
+def book(request, make_mock_worksheet):
+    """An empty in-memory worksheet per tab, keyed by sheet name and patched
+    onto the sheet_service singletons, with the cache cleared either side.
+    Narrow the tabs with indirect parametrisation, e.g.
+    @pytest.mark.parametrize("book", [("deals_sheet",)], indirect=True)."""
+    from app.services import sheet_service
+    from app.services.sheet_service import _cache
+
+    _cache.clear()
+    sheets = {}
+    with ExitStack() as stack:
+        for name in getattr(request, "param", BOOK_TABS):
+            service = getattr(sheet_service, name)
+            ws = make_mock_worksheet()
+            ws._headers = service.columns
+            sheets[name] = ws
+            stack.enter_context(patch.object(service, "_worksheet", return_value=ws))
+        yield sheets
+    _cache.clear()
+
+
 @pytest.fixture
 def mock_sheets(mock_worksheet):
     """Patch get_worksheet to return the mock."""
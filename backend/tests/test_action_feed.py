@@ -0,0 +1,111 @@
+"""Action-feed snapshot: served precomputed, rebuilt when a source tab changes."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.helpers import days_ago_label
+from app.services import action_feed_service, sheet_service
+from app.services.action_feed_service import ActionFeedSnapshot
+from app.services.sheet_service import parse_epoch
+
+
+@pytest.fixture
+def snapshot(book):
+    """Fresh snapshot over empty per-tab worksheets."""
+    fresh = ActionFeedSnapshot()
+    with patch("app.routers.dashboard.action_feed_snapshot", fresh):
+        yield fresh
+
+
+def _add_overdue_follow_up():
+    sheet_service.follow_ups_sheet.create({
+        "contact_id": "c1", "title": "Chase", "due_date": "2000-01-01", "status": "pending",
+    })
+
+
+class TestActionFeedSnapshot:
+    def test_endpoint_serves_snapshot_with_timestamp(self, client, auth_headers, snapshot):
+        resp = client.get("/api/dashboard/action-feed", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["computed_at"]
+        assert data["action_required"]["overdue_total"] == 0
+
+    def test_wait_reflects_a_write(self, client, auth_headers, snapshot):
+        first = client.get("/api/dashboard/action-feed", headers=auth_headers).json()
+        _add_overdue_follow_up()
+        resp = client.get("/api/dashboard/action-feed?wait=true", headers=auth_headers)
+        assert resp.json()["action_required"]["overdue_total"] == 1
+        assert resp.json()["computed_at"] >= first["computed_at"]
+
+    @pytest.mark.asyncio
+    async def test_rebuilds_on_request_only_after_a_change(self, snapshot):
+        first = await snapshot.get()
+        with patch.object(action_feed_service, "build_action_feed") as build:
+            await snapshot.get()
+            await snapshot.refresh()
+        build.assert_not_called()
+
+        _add_overdue_follow_up()
+        assert not snapshot.is_current()
+        # Served the previous snapshot straight away; the rebuild runs behind it.
+        served = await snapshot.get()
+        assert served["action_required"]["overdue_total"] == 0
+        await snapshot.refresh()
+        fresh = await snapshot.get()
+        assert fresh["action_required"]["overdue_total"] == 1
+        assert fresh["computed_at"] >= first["computed_at"]
+
+    @pytest.mark.asyncio
+    async def test_requests_during_a_rebuild_share_it(self, snapshot):
+        import threading
+
+        await snapshot.get()
+        _add_overdue_follow_up()
+        release = threading.Event()
+        build = action_feed_service.build_action_feed
+
+        def slow_build():
+            release.wait(5)
+            return build()
+
+        with patch.object(action_feed_service, "build_action_feed", side_effect=slow_build) as builder:
+            served = [await snapshot.get() for _ in range(3)]
+            assert all(s["action_required"]["overdue_total"] == 0 for s in served)
+            release.set()
+            await snapshot.refresh()
+        assert builder.call_count == 1
+        assert (await snapshot.get())["action_required"]["overdue_total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_build_holds_the_source_locks(self, snapshot):
+        import threading
+
+        held = []
+
+        def probe():
+            for sheet in action_feed_service.SOURCES:
+                free = sheet._lock.acquire(blocking=False)
+                if free:
+                    sheet._lock.release()
+                held.append(not free)
+
+        def build():
+            # Probe from another thread: an RLock is re-entrant for its owner.
+            thread = threading.Thread(target=probe)
+            thread.start()
+            thread.join()
+            return {}
+
+        with patch.object(action_feed_service, "build_action_feed", side_effect=build):
+            await snapshot.refresh()
+        assert held and all(held)
+
+
+def test_days_ago_label_counts_calendar_days():
+    now = parse_epoch("2024-03-10T00:30:00Z")
+    assert days_ago_label(parse_epoch("2024-03-09T23:50:00Z"), now) == "yesterday"
+    assert days_ago_label(parse_epoch("2024-03-10T00:10:00+00:00"), now) == "today"
+    assert days_ago_label(parse_epoch("2024-03-05"), now) == "5d ago"
+    assert days_ago_label(None, now) == ""
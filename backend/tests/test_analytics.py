@@ -0,0 +1,128 @@
+"""Generic group-by / filter / aggregate queries (analytics_service + /api/analytics)."""
+
+import pytest
+
+from app.services import analytics_service, sheet_service
+from app.services.analytics_service import AnalyticsError, run_query
+
+
+@pytest.fixture
+def book(book):
+    analytics_service._frames.clear()
+    analytics_service._results.clear()
+    return book
+
+
+def _deal(did, stage, value, created):
+    return [did, "c1", "", f"Deal {did}", stage, value, "USD", "", "", "", created, created]
+
+
+def _interaction(iid, contact_id, kind, occurred):
+    return [iid, contact_id, "", kind, "", "", "", "inbound", occurred, occurred]
+
+
+def _contact(cid, segment):
+    row = {c: "" for c in sheet_service.CONTACTS_COLUMNS}
+    row.update(id=cid, first_name=cid, segment=segment)
+    return [row[c] for c in sheet_service.CONTACTS_COLUMNS]
+
+
+class TestRunQuery:
+    def test_deal_value_by_stage_by_month(self, book):
+        book["deals_sheet"]._data += [
+            _deal("d1", "lead", "100", "2024-01-05T10:00:00Z"),
+            _deal("d2", "lead", "50", "2024-01-20T10:00:00+00:00"),
+            _deal("d3", "lead", "", "2024-02-01T00:00:00Z"),
+            _deal("d4", "won", "1,000", "2024-01-31T23:30:00-02:00"),  # Feb 1st in UTC
+        ]
+        result = run_query("deals", group_by=["stage", "created_at:month"],
+                           metrics=[("sum", "value"), ("count", ""), ("max", "value")])
+        assert result["rows"] == [
+            {"stage": "lead", "created_at:month": "2024-01", "sum_value": 150.0, "count": 2, "max_value": 100.0},
+            {"stage": "lead", "created_at:month": "2024-02", "sum_value": 0.0, "count": 1, "max_value": None},
+            {"stage": "won", "created_at:month": "2024-02", "sum_value": 1000.0, "count": 1, "max_value": 1000.0},
+        ]
+
+    def test_interactions_by_type_by_week_per_segment(self, book):
+        book["contacts_sheet"]._data += [_contact("c1", "investor"), _contact("c2", "founder")]
+        book["interactions_sheet"]._data += [
+            _interaction("i1", "c1", "email", "2024-03-04T09:00:00Z"),   # Monday
+            _interaction("i2", "c1", "email", "2024-03-10T09:00:00Z"),   # Sunday, same week
+            _interaction("i3", "c2", "call", "2024-03-11T09:00:00Z"),
+            _interaction("i4", "ghost", "call", "2024-03-11T09:00:00Z"),
+        ]
+        result = run_query("interactions", group_by=["contact.segment", "type", "occurred_at:week"])
+        assert result["rows"] == [
+            {"contact.segment": "", "type": "call", "occurred_at:week": "2024-03-11", "count": 1},
+            {"contact.segment": "founder", "type": "call", "occurred_at:week": "2024-03-11", "count": 1},
+            {"contact.segment": "investor", "type": "email", "occurred_at:week": "2024-03-04", "count": 2},
+        ]
+
+    def test_filters(self, book):
+        book["deals_sheet"]._data += [
+            _deal("d1", "lead", "100", "2024-01-05T00:00:00Z"),
+            _deal("d2", "won", "300", "2024-02-05T00:00:00Z"),
+            _deal("d3", "lost", "500", "2024-03-05T00:00:00Z"),
+        ]
+        result = run_query("deals", metrics=[("sum", "value"), ("avg", "value")], filters=[
+            ("stage", "not_in", ["lost"]), ("created_at", "gte", "2024-01-01"), ("value", "gt", "50"),
+        ])
+        assert result["matched"] == 2
+        assert result["rows"] == [{"sum_value": 400.0, "avg_value": 200.0}]
+        assert run_query("deals", filters=[("stage", "eq", "nope")])["rows"] == [{"count": 0}]
+
+    def test_numeric_equality_ignores_cell_formatting(self, book):
+        book["deals_sheet"]._data += [
+            _deal("d1", "lead", "5000", "2024-01-05T00:00:00Z"),
+            _deal("d2", "lead", "5,000.00", "2024-01-05T00:00:00Z"),
+            _deal("d3", "lead", "300", "2024-01-05T00:00:00Z"),
+        ]
+        assert run_query("deals", filters=[("value", "eq", 5000)])["matched"] == 2
+        assert run_query("deals", filters=[("value", "ne", 5000.0)])["matched"] == 1
+        assert run_query("deals", filters=[("value", "in", [300, "5000"])])["matched"] == 2
+        assert run_query("deals", filters=[("value", "eq", "5000")])["matched"] == 1
+
+    def test_result_cache_follows_generation(self, book):
+        book["deals_sheet"]._data.append(_deal("d1", "lead", "100", "2024-01-05T00:00:00Z"))
+        first = run_query("deals", group_by=["stage"])
+        assert run_query("deals", group_by=["stage"]) is first
+
+        sheet_service.deals_sheet.create({"stage": "won", "value": "10"})
+        assert [r["stage"] for r in run_query("deals", group_by=["stage"])["rows"]] == ["lead", "won"]
+
+    @pytest.mark.parametrize("kwargs", [
+        {"tab": "users"},
+        {"tab": "deals", "group_by": ["nope"]},
+        {"tab": "deals", "group_by": ["stage:month"]},
+        {"tab": "deals", "group_by": ["created_at:fortnight"]},
+        {"tab": "companies", "group_by": ["contact.segment"]},
+        {"tab": "deals", "metrics": [("median", "value")]},
+        {"tab": "deals", "filters": [("value", "gt", "lots")]},
+    ])
+    def test_invalid_queries(self, book, kwargs):
+        with pytest.raises(AnalyticsError):
+            run_query(**kwargs)
+
+
+class TestAnalyticsEndpoint:
+    def test_query(self, client, auth_headers, book):
+        book["deals_sheet"]._data.append(_deal("d1", "lead", "100", "2024-01-05T00:00:00Z"))
+        resp = client.post("/api/analytics", headers=auth_headers, json={
+            "tab": "deals", "group_by": ["stage"], "metrics": [{"op": "sum", "field": "value"}],
+        })
+        assert resp.status_code == 200
+        assert resp.json()["rows"] == [{"stage": "lead", "sum_value": 100.0}]
+
+    def test_json_number_filter_matches_cell_text(self, client, auth_headers, book):
+        book["deals_sheet"]._data.append(_deal("d1", "lead", "5000", "2024-01-05T00:00:00Z"))
+        resp = client.post("/api/analytics", headers=auth_headers, json={
+            "tab": "deals", "filters": [{"field": "value", "op": "eq", "value": 5000}],
+        })
+        assert resp.json()["matched"] == 1
+
+    def test_bad_column_is_400(self, client, auth_headers, book):
+        resp = client.post("/api/analytics", headers=auth_headers, json={"tab": "deals", "group_by": ["nope"]})
+        assert resp.status_code == 400
+
+    def test_requires_auth(self, client):
+        assert client.post("/api/analytics", json={"tab": "deals"}).status_code in (401, 403)
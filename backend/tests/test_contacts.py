@@ -262,3 +262,143 @@ class TestContactCreateDedup:
         assert data["segment"] == "Quant"               # blank field backfilled
         assert data["engagement_stage"] == "accepted"   # stage advanced
         assert data["role"] == "CTO"                     # set field not clobbered
+
+    def test_match_by_linkedin_url_ignores_url_form(self, client, auth_headers, seeded_contacts_ws):
+        resp = self._post(client, auth_headers, seeded_contacts_ws, {
+            "first_name": "Anyone", "last_name": "Else",
+            "linkedin_url": "https://www.LinkedIn.com/in/jsmith/?utm_source=share",
+        })
+        assert resp.status_code == 200
+        assert resp.json()["id"] == "c1"
+
+    def test_match_by_email_is_case_insensitive(self, client, auth_headers, seeded_contacts_ws):
+        resp = self._post(client, auth_headers, seeded_contacts_ws, {
+            "first_name": "Other", "last_name": "Person", "email": "JANE@Example.com",
+        })
+        assert resp.status_code == 200
+        assert resp.json()["id"] == "c2"
+
+    def test_repeat_in_same_batch_dedups_against_new_row(self, client, auth_headers, seeded_contacts_ws):
+        _cache.clear()
+        with patch("app.routers.contacts.contacts_sheet._worksheet", return_value=seeded_contacts_ws):
+            first = client.post("/api/contacts", headers=auth_headers, json={
+                "first_name": "Ada", "last_name": "Lovelace, FRS",
+            })
+            second = client.post("/api/contacts", headers=auth_headers, json={
+                "first_name": "ada", "last_name": "Lovelace",
+            })
+        assert first.status_code == 201
+        assert second.status_code == 200
+        assert second.json()["id"] == first.json()["id"]
+
+
+class TestContactActivity:
+    def test_activity_summary_newest_first(self, client, auth_headers, seeded_contacts_ws, make_mock_worksheet):
+        from app.services.sheet_service import INTERACTIONS_COLUMNS
+
+        interactions_ws = make_mock_worksheet()
+        interactions_ws._headers = INTERACTIONS_COLUMNS
+        interactions_ws._data += [
+            ["i1", "c1", "", "email", "Intro", "", "", "outbound", "2024-01-01T09:00:00", "2024-01-01"],
+            ["i2", "c1", "", "email", "Re: Intro", "", "", "inbound", "2024-01-03T09:00:00", "2024-01-03"],
+            ["i3", "c2", "", "call", "Other", "", "", "inbound", "2024-01-05T09:00:00", "2024-01-05"],
+        ]
+        _cache.clear()
+        with patch("app.routers.contacts.contacts_sheet._worksheet", return_value=seeded_contacts_ws), \
+             patch("app.routers.contacts.interactions_sheet._worksheet", return_value=interactions_ws):
+            resp = client.get("/api/contacts/c1/activity?limit=1", headers=auth_headers)
+            assert resp.status_code == 200
+            data = resp.json()
+            assert data["interaction_count"] == 2
+            assert data["last_inbound_at"] == "2024-01-03T09:00:00"
+            assert data["last_outbound_at"] == "2024-01-01T09:00:00"
+            assert [r["id"] for r in data["recent"]] == ["i2"]
+
+            assert client.get("/api/contacts/nope/activity", headers=auth_headers).status_code == 404
+
+    def test_list_sorted_by_engagement(self, client, auth_headers, seeded_contacts_ws, make_mock_worksheet):
+        from app.services.sheet_service import INTERACTIONS_COLUMNS
+
+        interactions_ws = make_mock_worksheet()
+        interactions_ws._headers = INTERACTIONS_COLUMNS
+        interactions_ws._data += [
+            ["i1", "c2", "", "email", "", "", "", "inbound", "2024-01-03T09:00:00", "2024-01-03"],
+            ["i2", "c2", "", "call", "", "", "", "inbound", "2024-01-05T09:00:00", "2024-01-05"],
+        ]
+        _cache.clear()
+        with patch("app.routers.contacts.contacts_sheet._worksheet", return_value=seeded_contacts_ws), \
+             patch("app.routers.contacts.interactions_sheet._worksheet", return_value=interactions_ws):
+            resp = client.get("/api/contacts?sort=engagement&limit=1", headers=auth_headers)
+            assert resp.status_code == 200
+            [top] = resp.json()
+            assert top["id"] == "c2"
+            assert top["engagement_score"] > 0
+
+            unsorted = client.get("/api/contacts", headers=auth_headers).json()
+            assert [c["id"] for c in unsorted] == ["c1", "c2"]
+            assert unsorted[0]["engagement_score"] == 0.0
+
+
+class TestContactFull:
+    @pytest.fixture
+    def book(self, seeded_contacts_ws, seeded_companies_ws, make_mock_worksheet):
+        from app.services import sheet_service
+
+        _cache.clear()
+        stack = ExitStack()
+        stack.enter_context(patch.object(sheet_service.contacts_sheet, "_worksheet", return_value=seeded_contacts_ws))
+        stack.enter_context(patch.object(sheet_service.companies_sheet, "_worksheet", return_value=seeded_companies_ws))
+        for name, headers in (
+            ("deals_sheet", sheet_service.DEALS_COLUMNS),
+            ("follow_ups_sheet", sheet_service.FOLLOW_UPS_COLUMNS),
+            ("interactions_sheet", sheet_service.INTERACTIONS_COLUMNS),
+        ):
+            ws = make_mock_worksheet()
+            ws._headers = headers
+            stack.enter_context(patch.object(getattr(sheet_service, name), "_worksheet", return_value=ws))
+        with stack:
+            deals, fups, interactions = (
+                sheet_service.deals_sheet, sheet_service.follow_ups_sheet, sheet_service.interactions_sheet,
+            )
+            deals.create({"title": "Pilot", "contact_id": "c1", "stage": "lead"})
+            deals.create({"title": "Jane's deal", "contact_id": "c2", "stage": "lead"})
+            renewal = deals.create({"title": "Renewal", "contact_id": "c1", "stage": "lead"})
+            deals.update(renewal["id"], {"stage": "proposal", "updated_at": "2999-01-01T00:00:00"})
+            fups.create({"title": "Later", "contact_id": "c1", "due_date": "2024-02-01", "status": "pending"})
+            fups.create({"title": "Sooner", "contact_id": "c1", "due_date": "2024-01-15", "status": "pending"})
+            fups.create({"title": "Done", "contact_id": "c1", "due_date": "2024-01-10", "status": "completed"})
+            for day in ("01", "03", "02"):
+                interactions.create({"contact_id": "c1", "type": "email", "subject": f"Jan {day}",
+                                     "occurred_at": f"2024-01-{day}T09:00:00"})
+            yield
+        _cache.clear()
+
+    def test_joined_view(self, client, auth_headers, book):
+        resp = client.get("/api/contacts/c1/full", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["contact"]["name"] == "John Smith"
+        assert data["contact"]["company_name"] == "Acme Corp"
+        assert data["company"]["id"] == "comp1"
+        assert [d["title"] for d in data["deals"]] == ["Renewal", "Pilot"]
+        assert [f["title"] for f in data["follow_ups"]] == ["Done", "Sooner", "Later"]
+        assert [i["subject"] for i in data["interactions"]] == ["Jan 03", "Jan 02", "Jan 01"]
+        assert data["counts"] == {"deals": 2, "interactions": 3, "follow_ups": 3}
+
+    def test_sections_limits_and_projection(self, client, auth_headers, book):
+        resp = client.get(
+            "/api/contacts/c1/full?include=interactions,follow_ups&interactions_limit=1"
+            "&follow_up_status=pending&fields=first_name,interactions.subject",
+            headers=auth_headers,
+        )
+        data = resp.json()
+        assert data["contact"] == {"id": "c1", "first_name": "John"}
+        assert "deals" not in data and "company" not in data
+        assert [i.keys() for i in data["interactions"]] == [{"id", "subject"}]
+        assert data["interactions"][0]["subject"] == "Jan 03"
+        assert [f["title"] for f in data["follow_ups"]] == ["Sooner", "Later"]
+        assert data["counts"] == {"interactions": 3, "follow_ups": 2}
+
+    def test_unknown_contact_or_section(self, client, auth_headers, book):
+        assert client.get("/api/contacts/nope/full", headers=auth_headers).status_code == 404
+        assert client.get("/api/contacts/c1/full?include=notes", headers=auth_headers).status_code == 400
@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -56,3 +56,34 @@ class TestDealEndpoints:
             "stage": "invalid_stage",
         })
         assert resp.status_code == 422
+
+    def test_pipeline_aggregates(self, client, auth_headers, seeded_deals_ws):
+        with patch("app.routers.deals.deals_sheet._worksheet", return_value=seeded_deals_ws):
+            resp = client.get("/api/deals/pipeline", headers=auth_headers)
+            assert resp.status_code == 200
+            data = resp.json()
+            assert data["stages"]["proposal"] == {"count": 1, "value": 50000.0, "by_currency": {"USD": 50000.0}}
+            assert data["open_value"] == 60000.0
+
+            client.patch("/api/deals/d1/stage", headers=auth_headers, json={"stage": "won"})
+            data = client.get("/api/deals/pipeline", headers=auth_headers).json()
+            assert data["stages"]["won"]["count"] == 1
+            assert (data["open_count"], data["open_value"]) == (1, 10000.0)
+
+    @pytest.mark.asyncio
+    async def test_telegram_pipeline_totals(self, mock_sheets, seeded_deals_ws):
+        from app.services.telegram_service import cmd_pipeline
+
+        seeded_deals_ws._data.append([
+            "d3", "c2", "comp1", "Parked", "on-hold", "7000",
+            "USD", "", "", "", "2024-01-03T00:00:00", "2024-01-03T00:00:00",
+        ])
+        update = MagicMock()
+        update.message.reply_text = AsyncMock()
+        with patch("app.services.telegram_service.deals_sheet._worksheet", return_value=seeded_deals_ws):
+            await cmd_pipeline(update, MagicMock())
+        text = update.message.reply_text.await_args.args[0]
+        assert "*Proposal*: 1 deals ($50,000)" in text
+        # The off-list stage counts as active but adds nothing to the value.
+        assert "*Total active*: 3 deals ($60,000)" in text
+        assert "*Won*: 0 deals ($0)" in text
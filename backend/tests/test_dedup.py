@@ -0,0 +1,175 @@
+"""Whole-book duplicate detection and bulk merge (dedup_service + /api/dedup)."""
+
+import json
+from unittest.mock import patch
+
+from app.services import sheet_service
+from app.services.dedup_service import (
+    find_company_duplicates,
+    find_contact_duplicates,
+    merge_companies,
+    merge_contacts,
+)
+
+
+def _contact(cid, first, last, email="", linkedin="", handles=None, source="manual",
+             created="2024-01-01T00:00:00", company_id="", tags="", status="active"):
+    row = {c: "" for c in sheet_service.CONTACTS_COLUMNS}
+    row.update(id=cid, first_name=first, last_name=last, email=email, linkedin_url=linkedin,
+               platform_handles=json.dumps(handles) if handles else "", source=source,
+               created_at=created, updated_at=created, company_id=company_id, tags=tags,
+               status=status)
+    return [row[c] for c in sheet_service.CONTACTS_COLUMNS]
+
+
+def _company(cid, name, website="", created="2024-01-01T00:00:00", industry=""):
+    return [cid, name, industry, website, "", "", created, created]
+
+
+class TestContactProposals:
+    def test_groups_by_email_linkedin_and_handle(self, book):
+        book["contacts_sheet"]._data += [
+            _contact("c1", "John", "Smith", email="john@acme.example"),
+            _contact("c2", "Johnny", "S", email="JOHN@acme.example", created="2024-02-01T00:00:00"),
+            _contact("c3", "Sarah", "Chen", linkedin="https://www.linkedin.com/in/schen/"),
+            _contact("c4", "S", "Chen", handles={"linkedin": "https://linkedin.com/in/schen"},
+                     source="linkedin_organic"),
+            _contact("c5", "Nobody", "Else", email="nobody@else.example"),
+        ]
+        proposals = {p["keep"]: p for p in find_contact_duplicates()}
+        assert set(proposals) == {"c1", "c3"}
+        assert proposals["c1"]["merge"] == ["c2"]
+        assert proposals["c1"]["reasons"] == ["email"]
+        assert proposals["c3"]["merge"] == ["c4"]
+
+    def test_name_match_is_vetoed_by_conflicting_emails(self, book):
+        book["contacts_sheet"]._data += [
+            _contact("c1", "John", "Smith", email="john@one.example"),
+            _contact("c2", "John", "Smith", email="john@two.example"),
+            _contact("c3", "Jane", "Doe"),
+            _contact("c4", "Jane", "Doe (she/her)"),
+        ]
+        proposals = find_contact_duplicates()
+        assert [(p["keep"], p["merge"], p["reasons"]) for p in proposals] == [("c3", ["c4"], ["name"])]
+
+    def test_organic_contact_never_survives(self, book):
+        book["contacts_sheet"]._data += [
+            _contact("c1", "Sarah", "Chen", handles={"instagram": "@sarahc"},
+                     source="instagram_organic", created="2023-01-01T00:00:00"),
+            _contact("c2", "Sarah", "Chen", handles={"instagram": "@SarahC"}),
+        ]
+        [proposal] = find_contact_duplicates()
+        assert proposal["keep"] == "c2"
+        assert proposal["merge"] == ["c1"]
+
+    def test_archived_contacts_are_ignored(self, book):
+        book["contacts_sheet"]._data += [
+            _contact("c1", "John", "Smith", email="john@acme.example"),
+            _contact("c2", "John", "Smith", email="john@acme.example", status="archived"),
+        ]
+        assert find_contact_duplicates() == []
+
+
+class TestMergeContacts:
+    def test_repoints_children_and_archives_duplicate(self, book):
+        book["contacts_sheet"]._data += [
+            _contact("c1", "John", "Smith", email="john@acme.example", tags="vip"),
+            _contact("c2", "John", "Smith", email="john@acme.example", company_id="comp9",
+                     handles={"x": "@jsmith"}, tags="vip,investor"),
+            _contact("c3", "Jane", "Doe"),
+        ]
+        book["interactions_sheet"]._data += [
+            ["i1", "c2", "", "email", "Hi", "", "", "inbound", "2024-03-01", "2024-03-01"],
+            ["i2", "c3", "", "email", "Hi", "", "", "inbound", "2024-03-01", "2024-03-01"],
+        ]
+        book["deals_sheet"]._data.append(
+            ["d1", "c2", "", "Deal", "lead", "100", "USD", "", "", "", "2024-01-01", "2024-01-01"])
+        book["follow_ups_sheet"]._data.append(
+            ["f1", "c2", "", "Call", "2024-04-01", "", "pending", "", "", "2024-01-01", ""])
+
+        result = merge_contacts(find_contact_duplicates())
+
+        assert result == {"merged": 1, "interactions": 1, "deals": 1, "follow_ups": 1, "notifications": 0}
+        assert sheet_service.interactions_sheet.get_by_id("i1")["contact_id"] == "c1"
+        assert sheet_service.interactions_sheet.get_by_id("i2")["contact_id"] == "c3"
+        assert sheet_service.deals_sheet.get_by_id("d1")["contact_id"] == "c1"
+        assert sheet_service.follow_ups_sheet.get_by_id("f1")["contact_id"] == "c1"
+
+        survivor = sheet_service.contacts_sheet.get_by_id("c1")
+        assert survivor["company_id"] == "comp9"
+        assert json.loads(survivor["platform_handles"]) == {"x": "@jsmith"}
+        assert survivor["tags"] == "vip,investor"
+        merged = sheet_service.contacts_sheet.get_by_id("c2")
+        assert merged["status"] == "archived"
+        assert "Merged into c1" in merged["notes"]
+
+    def test_one_batch_write_per_tab(self, book):
+        book["contacts_sheet"]._data += [
+            _contact(f"c{i}", "John", "Smith", email=f"js{i // 2}@acme.example") for i in range(6)
+        ]
+        book["interactions_sheet"]._data += [
+            [f"i{i}", f"c{i}", "", "email", "", "", "", "inbound", "", ""] for i in range(6)
+        ]
+        with patch.object(book["interactions_sheet"], "update") as single_update:
+            result = merge_contacts(find_contact_duplicates())
+        single_update.assert_not_called()
+        assert result["merged"] == 3
+        assert result["interactions"] == 3
+        assert {r["contact_id"] for r in sheet_service.interactions_sheet.get_all()} == {"c0", "c2", "c4"}
+
+    def test_unknown_ids_are_skipped(self, book):
+        book["contacts_sheet"]._data.append(_contact("c1", "John", "Smith"))
+        result = merge_contacts([{"keep": "c1", "merge": ["ghost"]}, {"keep": "ghost", "merge": ["c1"]}])
+        assert result["merged"] == 0
+        assert sheet_service.contacts_sheet.get_by_id("c1")["status"] == "active"
+
+
+class TestCompanies:
+    def test_proposals_by_name_and_domain(self, book):
+        book["companies_sheet"]._data += [
+            _company("comp1", "Acme Corp", "https://acme.example"),
+            _company("comp2", "ACME Corporation Ltd.", created="2024-02-01T00:00:00"),
+            _company("comp3", "Widgets", "http://www.acme.example/about", created="2024-03-01T00:00:00"),
+            _company("comp4", "Acme", "https://other.example"),
+        ]
+        [proposal] = find_company_duplicates()
+        assert proposal["keep"] == "comp1"
+        assert sorted(proposal["merge"]) == ["comp2", "comp3"]
+
+    def test_merge_repoints_contacts_and_removes_rows(self, book):
+        book["companies_sheet"]._data += [
+            _company("comp1", "Acme Corp"),
+            _company("comp2", "Acme Ltd", "https://acme.example", industry="tools",
+                     created="2024-02-01T00:00:00"),
+        ]
+        book["contacts_sheet"]._data.append(_contact("c1", "John", "Smith", company_id="comp2"))
+
+        result = merge_companies(find_company_duplicates())
+
+        assert result["merged"] == 1
+        assert result["contacts"] == 1
+        assert sheet_service.contacts_sheet.get_by_id("c1")["company_id"] == "comp1"
+        assert sheet_service.companies_sheet.get_by_id("comp2") is None
+        survivor = sheet_service.companies_sheet.get_by_id("comp1")
+        assert survivor["website"] == "https://acme.example"
+        assert survivor["industry"] == "tools"
+
+
+class TestDedupEndpoints:
+    def test_proposals_then_merge(self, client, auth_headers, book):
+        book["contacts_sheet"]._data += [
+            _contact("c1", "John", "Smith", email="john@acme.example"),
+            _contact("c2", "John", "Smith", email="john@acme.example"),
+        ]
+        resp = client.get("/api/dedup/proposals", headers=auth_headers)
+        assert resp.status_code == 200
+        groups = resp.json()["contacts"]
+        assert groups[0]["keep"] == "c1"
+
+        resp = client.post("/api/dedup/merge", headers=auth_headers, json={"contacts": groups})
+        assert resp.status_code == 200
+        assert resp.json()["contacts"]["merged"] == 1
+        assert client.get("/api/dedup/proposals", headers=auth_headers).json()["contacts"] == []
+
+    def test_merge_requires_auth(self, client):
+        assert client.post("/api/dedup/merge", json={}).status_code in (401, 403)
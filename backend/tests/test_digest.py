@@ -0,0 +1,123 @@
+"""Join-once digest builder and the views that render from it."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app import scheduler
+from app.services import digest_service, lease_service, sheet_service
+from app.services.digest_service import build_digest
+from app.services.lease_service import SQLiteLeaseStore
+
+
+@pytest.fixture
+def book(book):
+    digest_service._cached = None
+    with patch.object(digest_service, "today_str", return_value="2024-03-15"):
+        yield book
+
+
+def _seed():
+    acme = sheet_service.companies_sheet.create({"name": "Acme"})
+    ann = sheet_service.contacts_sheet.create({"first_name": "Ann", "last_name": "Lee", "company_id": acme["id"]})
+    fups = sheet_service.follow_ups_sheet
+    fups.create({"title": "Old", "contact_id": ann["id"], "due_date": "2024-03-01", "status": "pending"})
+    fups.create({"title": "Late", "contact_id": ann["id"], "due_date": "2024-03-15", "due_time": "16:00", "status": "pending"})
+    fups.create({"title": "Early", "contact_id": "gone", "due_date": "2024-03-15", "due_time": "09:00", "status": "pending"})
+    fups.create({"title": "Done", "contact_id": ann["id"], "due_date": "2024-03-02", "status": "completed"})
+    fups.create({"title": "Next week", "contact_id": ann["id"], "due_date": "2024-03-22", "status": "pending"})
+    return ann
+
+
+class TestBuildDigest:
+    def test_splits_and_joins_names(self, book):
+        _seed()
+        digest = build_digest()
+        assert [f["title"] for f in digest["overdue"]] == ["Old"]
+        assert digest["overdue"][0]["contact_name"] == "Ann Lee"
+        assert digest["overdue"][0]["company_name"] == "Acme"
+        assert [(f["title"], f["contact_name"]) for f in digest["due_today"]] == [("Early", ""), ("Late", "Ann Lee")]
+
+    def test_joins_by_id_and_is_cached_until_change(self, book):
+        ann = _seed()
+        with patch.object(sheet_service.contacts_sheet, "get_all", wraps=sheet_service.contacts_sheet.get_all) as scan:
+            digest = build_digest()
+            with patch.object(sheet_service.contacts_sheet, "get_by_id") as lookup:
+                again = build_digest()
+        assert again == digest and again["overdue"] is digest["overdue"]
+        lookup.assert_not_called()
+        # Only the generation check reads the tab; the join goes through the id index.
+        assert scan.call_count == 2
+
+        sheet_service.contacts_sheet.update(ann["id"], {"first_name": "Anne"})
+        assert build_digest()["overdue"][0]["contact_name"] == "Anne Lee"
+
+    def test_stale_cutoff_is_taken_per_call(self, book):
+        import time
+
+        sheet_service.deals_sheet.create({"title": "Pilot", "stage": "lead"})
+        assert build_digest()["stale_deals"] == []
+        later = time.time() + 15 * 86400
+        with patch.object(digest_service.time, "time", return_value=later):
+            assert [d["title"] for d in build_digest()["stale_deals"]] == ["Pilot"]
+
+
+class TestRenderers:
+    @pytest.mark.asyncio
+    async def test_morning_digest(self, book, tmp_path):
+        _seed()
+        with patch.object(lease_service, "_leases", SQLiteLeaseStore(str(tmp_path / "leases.db"))), \
+                patch.object(scheduler.dispatcher, "broadcast", new=AsyncMock()) as send:
+            await scheduler.morning_digest()
+        [text] = send.await_args.args
+        assert "1 overdue follow-ups" in text
+        assert "Old — Ann Lee" in text
+        assert "Early — ?" in text
+
+    @pytest.mark.asyncio
+    async def test_cmd_today(self, book):
+        from app.services.telegram_service import cmd_today
+        _seed()
+        update = MagicMock()
+        update.message.reply_text = AsyncMock()
+        await cmd_today(update, MagicMock())
+        text = update.message.reply_text.await_args.args[0]
+        assert "Old — Ann Lee (due 2024-03-01)" in text
+        assert text.index("Early") < text.index("Late")
+
+    def test_summary_and_digest_endpoints(self, client, auth_headers, book):
+        _seed()
+        with patch.object(sheet_service.interactions_sheet, "range_query", return_value=[]):
+            summary = client.get("/api/dashboard/summary", headers=auth_headers).json()
+        assert summary["overdue_count"] == 1
+        assert summary["overdue_follow_ups"][0]["contact_name"] == "Ann Lee"
+        resp = client.get("/api/dashboard/digest", headers=auth_headers)
+        assert resp.status_code == 200
+        assert len(resp.json()["due_today"]) == 2
+
+    def test_summary_counts_activity_logged_this_week(self, client, auth_headers, book):
+        from datetime import datetime, timedelta, timezone
+
+        now = datetime.now(timezone.utc)
+        recent, old = (now - timedelta(days=1)).isoformat(), (now - timedelta(days=30)).isoformat()
+        ws = book["interactions_sheet"]
+        row = {c: "" for c in sheet_service.INTERACTIONS_COLUMNS}
+        for iid, occurred, created in (("i1", old, recent), ("i2", recent, old), ("i3", "", recent)):
+            row.update(id=iid, occurred_at=occurred, created_at=created)
+            ws._data.append([row[c] for c in sheet_service.INTERACTIONS_COLUMNS])
+        summary = client.get("/api/dashboard/summary", headers=auth_headers).json()
+        # Back-dated i1 and undated i3 were logged this week; i2 was not.
+        assert summary["recent_activity_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_mcp_overdue_renders_from_digest(self):
+        from mcp_server.tools.follow_ups import get_follow_ups
+        digest = {"overdue": [
+            {"id": "f1", "title": "Old", "due_date": "2024-03-01", "contact_id": "c1", "contact_name": "Ann Lee"},
+            {"id": "f2", "title": "Other", "due_date": "2024-03-02", "contact_id": "c2", "contact_name": "Bo"},
+        ]}
+        with patch("mcp_server.tools.follow_ups.api_get", return_value=digest) as get:
+            result = await get_follow_ups(overdue_only=True, contact_id="c1")
+        get.assert_called_once_with("/api/dashboard/digest")
+        assert "Old — due 2024-03-01 (Ann Lee) [ID: f1]" in result
+        assert "Other" not in result
@@ -0,0 +1,84 @@
+"""Concurrent, rate-limited Telegram fan-out (dispatch_service)."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.services import dispatch_service, sheet_service
+from app.services.dispatch_service import TelegramDispatcher, coalesce
+from app.services.sheet_service import USERS_COLUMNS, _cache
+
+
+@pytest.fixture
+def users(make_mock_worksheet):
+    _cache.clear()
+    ws = make_mock_worksheet()
+    ws._headers = USERS_COLUMNS
+    ws._data += [
+        ["u1", "ann", "x", "101", ""],
+        ["u2", "bob", "x", "102", ""],
+        ["u3", "cat", "x", "", ""],
+    ]
+    with patch.object(sheet_service.users_sheet, "_worksheet", return_value=ws):
+        yield ws
+    _cache.clear()
+
+
+def test_coalesce_packs_texts_under_the_limit():
+    assert coalesce(["a" * 4, "b" * 4, "c" * 4], limit=10) == ["aaaa\n\nbbbb", "cccc"]
+    assert coalesce(["x" * 20], limit=10) == ["x" * 20]
+    assert coalesce([]) == []
+
+
+def test_recipients_are_cached_until_users_change(users):
+    dispatcher = TelegramDispatcher(send=None)
+    assert dispatcher.recipients() == ["101", "102"]
+    first = dispatcher.recipients()
+    assert dispatcher.recipients() is first
+    sheet_service.users_sheet.update("u3", {"telegram_chat_id": "103"})
+    assert dispatcher.recipients() == ["101", "102", "103"]
+
+
+@pytest.mark.asyncio
+async def test_chats_run_concurrently_but_each_chat_is_paced(users):
+    sent: list[tuple[str, str, float]] = []
+
+    async def send(chat_id, text):
+        sent.append((chat_id, text, time.monotonic()))
+
+    dispatcher = TelegramDispatcher(send=send)
+    with patch.object(dispatch_service, "PER_CHAT_INTERVAL", 0.1):
+        assert await dispatcher.broadcast_many(["one", "two"]) == set()
+        assert [(c, t) for c, t, _ in sent] == [("101", "one\n\ntwo"), ("102", "one\n\ntwo")]
+
+        sent.clear()
+        await asyncio.gather(dispatcher.broadcast("a"), dispatcher.broadcast("b"))
+        by_chat = {}
+        for chat, _text, at in sent:
+            by_chat.setdefault(chat, []).append(at)
+        # Different chats went out together; repeat sends to one chat were spaced.
+        assert abs(by_chat["101"][0] - by_chat["102"][0]) < 0.05
+        assert by_chat["101"][1] - by_chat["101"][0] >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_logged_not_raised(users):
+    async def send(chat_id, text):
+        if chat_id == "101":
+            raise RuntimeError("blocked by user")
+
+    assert await TelegramDispatcher(send=send).broadcast("hi") is True
+
+
+@pytest.mark.asyncio
+async def test_texts_no_chat_received_are_reported(users):
+    async def send(chat_id, text):
+        if "two" in text:
+            raise RuntimeError("telegram down")
+
+    dispatcher = TelegramDispatcher(send=send)
+    with patch.object(dispatch_service, "MAX_MESSAGE_LENGTH", 3), \
+            patch.object(dispatch_service, "PER_CHAT_INTERVAL", 0):
+        assert await dispatcher.broadcast_many(["one", "two", "six"]) == {1}
@@ -0,0 +1,31 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.services.sheet_service import FOLLOW_UPS_COLUMNS
+
+
+class TestFollowUpEndpoints:
+    @pytest.fixture
+    def seeded_follow_ups_ws(self, mock_worksheet):
+        mock_worksheet._headers = FOLLOW_UPS_COLUMNS
+        mock_worksheet._data += [
+            ["f1", "c1", "", "Call back", "2000-01-02", "", "pending", "", "", "2000-01-01", ""],
+            ["f2", "c2", "", "Send deck", "2000-01-01", "", "pending", "", "", "2000-01-01", ""],
+            ["f3", "c1", "", "Done already", "2000-01-01", "", "completed", "", "", "2000-01-01", ""],
+            ["f4", "c1", "", "Next year", "2999-01-01", "", "pending", "", "", "2000-01-01", ""],
+        ]
+        return mock_worksheet
+
+    def test_overdue_oldest_first(self, client, auth_headers, seeded_follow_ups_ws):
+        with patch("app.routers.follow_ups.follow_ups_sheet._worksheet", return_value=seeded_follow_ups_ws):
+            resp = client.get("/api/follow-ups?overdue=true", headers=auth_headers)
+            assert resp.status_code == 200
+            assert [f["id"] for f in resp.json()] == ["f2", "f1"]
+
+    def test_overdue_with_contact_and_status(self, client, auth_headers, seeded_follow_ups_ws):
+        with patch("app.routers.follow_ups.follow_ups_sheet._worksheet", return_value=seeded_follow_ups_ws):
+            resp = client.get("/api/follow-ups?overdue=true&contact_id=c1", headers=auth_headers)
+            assert [f["id"] for f in resp.json()] == ["f1"]
+            resp = client.get("/api/follow-ups?overdue=true&status=completed", headers=auth_headers)
+            assert resp.json() == []
@@ -0,0 +1,70 @@
+"""Weighted pipeline forecast and its cached stage conversion matrix."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.services import analytics_service, forecast_service, sheet_service
+from app.services.forecast_service import DEFAULT_WIN_RATES, PRIOR_WEIGHT, conversion_matrix, forecast
+from app.services.pipeline_history_service import snapshot_pipeline
+
+
+@pytest.fixture
+def book(book):
+    analytics_service._frames.clear()
+    forecast_service._cached = None
+    return book
+
+
+def _deal(stage, value="1000", currency="USD", expected_close=""):
+    return sheet_service.deals_sheet.create({
+        "title": stage, "stage": stage, "value": value, "currency": currency, "expected_close": expected_close,
+    })
+
+
+class TestConversionMatrix:
+    def test_priors_without_history(self, book):
+        rates = conversion_matrix().win_rates
+        assert list(rates) == [DEFAULT_WIN_RATES[s] for s in forecast_service.DEAL_STAGES]
+
+    def test_history_moves_rates_and_cache_follows_deals(self, book):
+        won = _deal("proposal")
+        lost = _deal("proposal")
+        snapshot_pipeline("2024-01-01")
+        sheet_service.deals_sheet.update(won["id"], {"stage": "won"})
+        sheet_service.deals_sheet.update(lost["id"], {"stage": "lost"})
+
+        matrix = conversion_matrix()
+        assert conversion_matrix() is matrix
+        proposal = forecast_service._STAGE_INDEX["proposal"]
+        # one of two proposals won, blended with the 0.5 prior: (1 + 5 * 0.5) / (2 + 5)
+        assert matrix.win_rates[proposal] == pytest.approx((1 + PRIOR_WEIGHT * 0.5) / (2 + PRIOR_WEIGHT))
+        assert matrix.matrix[proposal][forecast_service._WON] == 0.5
+        assert matrix.closed == 2
+
+        _deal("lead")
+        assert conversion_matrix() is not matrix
+
+
+class TestForecast:
+    def test_weighted_by_month_and_currency(self, book):
+        with patch.object(forecast_service, "today_str", return_value="2024-03-15"):
+            _deal("proposal", "1000", expected_close="2024-04-10")
+            _deal("negotiation", "2,000", expected_close="2024-04-30")
+            _deal("lead", "500", currency="EUR", expected_close="2024-01-05")  # overdue → this month
+            _deal("qualified", "300")
+            _deal("won", "9999", expected_close="2024-04-01")
+            result = forecast()
+
+        assert result["by_month"] == [
+            {"month": "2024-03", "currency": "EUR", "deals": 1, "pipeline_value": 500.0, "weighted_value": 50.0},
+            {"month": "2024-04", "currency": "USD", "deals": 2, "pipeline_value": 3000.0, "weighted_value": 1900.0},
+            {"month": "unscheduled", "currency": "USD", "deals": 1, "pipeline_value": 300.0, "weighted_value": 90.0},
+        ]
+        assert result["totals"]["USD"] == {"pipeline_value": 3300.0, "weighted_value": 1990.0}
+
+    def test_endpoint(self, client, auth_headers, book):
+        resp = client.get("/api/dashboard/forecast", headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.json()["by_month"] == []
+        assert resp.json()["win_rates"]["won"] == 1.0
@@ -0,0 +1,265 @@
+"""Domain indexes stay in step with their tab through SheetService write-through."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.helpers import find_contact_by_handle, resolve_or_create_companies, resolve_or_create_company
+from app.services.indexes import HandleIndex, PrefixIndex
+from app.services.sheet_service import COMPANIES_COLUMNS, CONTACTS_COLUMNS, SheetService, _cache
+
+
+@pytest.fixture
+def contacts(mock_worksheet):
+    _cache.clear()
+    mock_worksheet._headers = CONTACTS_COLUMNS
+    svc = SheetService("IndexContacts", CONTACTS_COLUMNS)
+    with patch.object(svc, "_worksheet", return_value=mock_worksheet):
+        yield svc
+    _cache.clear()
+
+
+@pytest.fixture
+def companies(make_mock_worksheet):
+    _cache.clear()
+    ws = make_mock_worksheet()
+    ws._headers = COMPANIES_COLUMNS
+    svc = SheetService("IndexCompanies", COMPANIES_COLUMNS)
+    with patch.object(svc, "_worksheet", return_value=ws):
+        yield svc
+    _cache.clear()
+
+
+class TestPrefixIndex:
+    def test_follows_renames_and_company_moves(self, contacts):
+        ann = contacts.create({"first_name": "Ann", "last_name": "O'Neil", "company_id": "co1"})
+        anna = contacts.create({"first_name": "Anna", "last_name": "Lee", "company_id": "co1"})
+        index = contacts.view(PrefixIndex, ("first_name", "last_name"), "company_id")
+        assert index.prefixed("an") == [ann["id"], anna["id"]]
+        assert index.prefixed("neil") == [ann["id"]]
+
+        contacts.update(ann["id"], {"first_name": "Beth", "company_id": "co2"})
+        assert index.prefixed("an") == [anna["id"]]
+        assert index.prefixed("be") == [ann["id"]]
+        assert index.group("co1") == [anna["id"]]
+        assert index.group("co2") == [ann["id"]]
+
+
+class TestHandleIndex:
+    def test_lookup_is_case_and_slash_insensitive(self, contacts):
+        c = contacts.create({
+            "first_name": "Sarah",
+            "platform_handles": json.dumps({"instagram": "@SarahChen_/"}),
+        })
+        assert find_contact_by_handle(contacts, "instagram", "@sarahchen_")["id"] == c["id"]
+        assert find_contact_by_handle(contacts, "linkedin", "@sarahchen_") is None
+
+    def test_linking_a_handle_updates_the_index(self, contacts):
+        c = contacts.create({"first_name": "Sarah"})
+        assert find_contact_by_handle(contacts, "instagram", "@sarah") is None
+        contacts.update(c["id"], {"platform_handles": json.dumps({"instagram": "@sarah"})})
+        assert find_contact_by_handle(contacts, "instagram", "@sarah")["id"] == c["id"]
+
+    def test_replacing_a_handle_drops_the_old_key(self, contacts):
+        c = contacts.create({
+            "first_name": "Sarah",
+            "platform_handles": json.dumps({"instagram": "@old"}),
+        })
+        contacts.get_all()
+        contacts.update(c["id"], {"platform_handles": json.dumps({"instagram": "@new"})})
+        index = contacts.view(HandleIndex)
+        assert index.lookup("instagram", "@old") is None
+        assert index.lookup("instagram", "@new") == c["id"]
+
+    def test_first_contact_in_sheet_order_wins(self, contacts):
+        first = contacts.create({"first_name": "A", "platform_handles": json.dumps({"instagram": "@dup"})})
+        contacts.create({"first_name": "B", "platform_handles": json.dumps({"instagram": "@dup"})})
+        assert find_contact_by_handle(contacts, "instagram", "@dup")["id"] == first["id"]
+
+
+class TestDedupIndex:
+    def test_archiving_removes_contact_from_dedup_keys(self, contacts):
+        from app.services.indexes import DedupIndex
+
+        c = contacts.create({"first_name": "Ann", "last_name": "Lee", "email": "ann@x.com", "status": "active"})
+        index = contacts.view(DedupIndex)
+        assert index.match(email="ANN@x.com") == c["id"]
+        contacts.delete(c["id"])  # soft delete → status archived
+        index = contacts.view(DedupIndex)
+        assert index.match(email="ann@x.com") is None
+        assert index.match(first_name="Ann", last_name="Lee") is None
+
+
+class TestCompanyIndex:
+    def test_name_variants_resolve_to_one_company(self, companies):
+        acme = resolve_or_create_company(companies, "Acme Ltd")
+        assert resolve_or_create_company(companies, "acme") == acme
+        assert resolve_or_create_company(companies, "  ACME   Limited. ") == acme
+        assert resolve_or_create_company(companies, "Acme & Co") == acme
+        assert resolve_or_create_company(companies, "ACME and Company Ltd") == acme
+        assert len(companies.get_all()) == 1
+
+    def test_normalised_names_and_domains(self):
+        from app.helpers import normalise_company_name, website_domain
+
+        assert normalise_company_name("Acme & Co") == "acme"
+        assert normalise_company_name("Johnson & Johnson") == "johnson & johnson"
+        assert normalise_company_name("AT&T Inc.") == "at&t"
+        assert website_domain("bob@acme.com") == "acme.com"
+        assert website_domain("mailto:Bob@www.Acme.com") == "acme.com"
+        assert website_domain("https://user@www.acme.com:8443/about") == "acme.com"
+        assert website_domain("acme.com") == "acme.com"
+        assert website_domain("") == ""
+
+    def test_website_domain_wins_and_conflicting_domain_blocks_name(self, companies):
+        acme = companies.create({"name": "Acme", "website": "https://acme.example"})
+        assert resolve_or_create_company(companies, "Acme Group", website="http://www.acme.example/") == acme["id"]
+        other = resolve_or_create_company(companies, "Acme", website="https://acme-other.example")
+        assert other != acme["id"]
+
+    def test_renaming_updates_the_index(self, companies):
+        c = companies.create({"name": "Old Name"})
+        companies.update(c["id"], {"name": "New Name Inc"})
+        assert resolve_or_create_company(companies, "new name") == c["id"]
+        assert resolve_or_create_company(companies, "Old Name") != c["id"]
+
+    def test_batch_resolution_creates_each_new_company_once(self, companies):
+        existing = companies.create({"name": "Existing Ltd"})
+        ids, created = resolve_or_create_companies(companies, [
+            {"name": "existing"},
+            {"name": "NewCo", "industry": "tools"},
+            {"name": "NEWCO LIMITED"},
+            {"name": ""},
+        ])
+        assert ids[0] == existing["id"]
+        assert ids[1] == ids[2] == created[0]["id"]
+        assert ids[3] == ""
+        assert len(created) == 1
+        assert created[0]["industry"] == "tools"
+
+
+class TestPipelineView:
+    @pytest.fixture
+    def deals(self, make_mock_worksheet):
+        from app.services.sheet_service import DEALS_COLUMNS
+
+        _cache.clear()
+        ws = make_mock_worksheet()
+        ws._headers = DEALS_COLUMNS
+        svc = SheetService("IndexDeals", DEALS_COLUMNS)
+        with patch.object(svc, "_worksheet", return_value=ws):
+            yield svc
+        _cache.clear()
+
+    def test_tracks_stage_moves_and_deletes(self, deals):
+        from app.services.indexes import PipelineView
+
+        a = deals.create({"title": "A", "stage": "lead", "value": "100.10", "currency": "USD"})
+        deals.create({"title": "B", "stage": "lead", "value": "50", "currency": "GBP"})
+        deals.create({"title": "C", "stage": "won", "value": "1000"})
+        pipeline = deals.view(PipelineView)
+        assert pipeline.stage("lead") == {"count": 2, "value": 150.1, "by_currency": {"USD": 100.1, "GBP": 50.0}}
+        assert pipeline.open_value() == 150.1
+
+        deals.update(a["id"], {"stage": "proposal"})
+        assert pipeline.stage("lead") == {"count": 1, "value": 50.0, "by_currency": {"GBP": 50.0}}
+        assert pipeline.stage("proposal")["count"] == 1
+
+        deals.delete(a["id"])
+        assert pipeline.stage("proposal") == {"count": 0, "value": 0.0, "by_currency": {}}
+        assert (pipeline.open_count(), pipeline.total_count()) == (1, 2)
+
+    def test_blank_or_bad_values_count_as_zero(self, deals):
+        from app.services.indexes import PipelineView
+
+        deals.create({"title": "A", "stage": "lead", "value": ""})
+        deals.create({"title": "B", "stage": "lead", "value": "n/a"})
+        assert deals.view(PipelineView).stage("lead")["value"] == 0.0
+
+
+class TestActivityIndex:
+    @pytest.fixture
+    def interactions(self, make_mock_worksheet):
+        from app.services.sheet_service import INTERACTIONS_COLUMNS
+
+        _cache.clear()
+        ws = make_mock_worksheet()
+        ws._headers = INTERACTIONS_COLUMNS
+        svc = SheetService("IndexInteractions", INTERACTIONS_COLUMNS)
+        with patch.object(svc, "_worksheet", return_value=ws):
+            yield svc
+        _cache.clear()
+
+    def test_timeline_and_last_by_direction(self, interactions):
+        from app.services.indexes import ActivityIndex
+
+        b = interactions.create({"contact_id": "c1", "direction": "outbound", "occurred_at": "2024-02-01"})
+        a = interactions.create({"contact_id": "c1", "direction": "inbound", "occurred_at": "2024-01-01"})
+        c = interactions.create({"contact_id": "c1", "occurred_at": "2024-03-01"})
+        interactions.create({"contact_id": "c2", "direction": "inbound", "occurred_at": "2024-05-01"})
+        activity = interactions.view(ActivityIndex)
+
+        assert activity.timeline("c1") == [a["id"], b["id"], c["id"]]
+        assert activity.count("c1") == 3
+        assert activity.last("c1")["id"] == c["id"]
+        assert activity.last("c1", "inbound")["id"] == a["id"]
+        assert activity.last("c1", "outbound")["id"] == b["id"]
+        assert [r["id"] for r in activity.recent("c1", 2)] == [c["id"], b["id"]]
+        assert activity.last("nobody") is None
+
+    def test_follows_reassignment_and_deletes(self, interactions):
+        from app.services.indexes import ActivityIndex
+
+        a = interactions.create({"contact_id": "c1", "direction": "inbound", "occurred_at": "2024-01-01"})
+        activity = interactions.view(ActivityIndex)
+        interactions.update(a["id"], {"contact_id": "c2"})
+        assert activity.count("c1") == 0
+        assert activity.last("c2", "inbound")["id"] == a["id"]
+        interactions.delete(a["id"])
+        assert activity.contact_ids() == []
+
+
+class TestEngagementIndex:
+    NOW = 1_717_200_000.0  # 2024-06-01T00:00:00Z
+
+    @pytest.fixture
+    def interactions(self, make_mock_worksheet):
+        from app.services.sheet_service import INTERACTIONS_COLUMNS
+
+        _cache.clear()
+        ws = make_mock_worksheet()
+        ws._headers = INTERACTIONS_COLUMNS
+        svc = SheetService("EngagementInteractions", INTERACTIONS_COLUMNS)
+        with patch.object(svc, "_worksheet", return_value=ws):
+            yield svc
+        _cache.clear()
+
+    def test_recent_frequent_inbound_ranks_first(self, interactions):
+        from app.services.indexes import EngagementIndex
+
+        for day in ("2024-05-25", "2024-05-28", "2024-05-30"):
+            interactions.create({"contact_id": "warm", "direction": "inbound", "occurred_at": day})
+        interactions.create({"contact_id": "cold", "direction": "outbound", "occurred_at": "2023-06-01"})
+        interactions.create({"contact_id": "quiet", "direction": "outbound", "occurred_at": "2024-05-30"})
+        engagement = interactions.view(EngagementIndex)
+
+        assert [cid for cid, _ in engagement.ranking(self.NOW)] == ["warm", "quiet", "cold"]
+        assert engagement.score("nobody", self.NOW) == 0.0
+
+    def test_incremental_updates_match_a_rebuild(self, interactions):
+        from app.services.indexes import EngagementIndex
+
+        a = interactions.create({"contact_id": "c1", "direction": "inbound", "occurred_at": "2024-05-01"})
+        engagement = interactions.view(EngagementIndex)
+        interactions.create({"contact_id": "c1", "direction": "outbound", "occurred_at": "2024-05-30"})
+        interactions.create({"contact_id": "c2", "direction": "inbound", "occurred_at": "2024-05-20"})
+        interactions.update(a["id"], {"contact_id": "c2"})
+
+        fresh = EngagementIndex()
+        fresh.build(interactions.get_all())
+        for cid in ("c1", "c2"):
+            assert engagement.score(cid, self.NOW) == pytest.approx(fresh.score(cid, self.NOW))
+
+        interactions.delete(a["id"])
+        assert engagement.score("c2", self.NOW) < fresh.score("c2", self.NOW)
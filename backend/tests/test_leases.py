@@ -0,0 +1,155 @@
+"""Scheduler job leases: claim / finish / release, TTL expiry and fencing."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app import scheduler
+from app.config import settings
+from app.services import lease_service
+from app.services.lease_service import SQLiteLeaseStore, lease_store
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "leases.db")
+
+
+class TestSQLiteLeaseStore:
+    def test_one_holder_then_done_for_the_day(self, db):
+        a, b = SQLiteLeaseStore(db, owner="a"), SQLiteLeaseStore(db, owner="b")
+        lease = a.claim("digest", "2024-03-01")
+        assert lease is not None
+        assert b.claim("digest", "2024-03-01") is None  # held
+
+        assert a.finish(lease)
+        assert b.claim("digest", "2024-03-01") is None  # done today
+        assert b.claim("digest", "2024-03-02").token == lease.token + 1
+        assert b.claim("other", "2024-03-01") is not None
+
+    def test_release_allows_retry(self, db):
+        a, b = SQLiteLeaseStore(db, owner="a"), SQLiteLeaseStore(db, owner="b")
+        lease = a.claim("digest", "2024-03-01")
+        a.release(lease)
+        assert b.claim("digest", "2024-03-01") is not None
+
+    def test_expired_holder_is_fenced_off(self, db):
+        a, b = SQLiteLeaseStore(db, owner="a"), SQLiteLeaseStore(db, owner="b")
+        stale = a.claim("digest", "2024-03-01", ttl=-1)  # already expired
+        fresh = b.claim("digest", "2024-03-01")
+        assert fresh.token > stale.token
+        assert not a.finish(stale)
+        assert b.claim("digest", "2024-03-01") is None  # still b's
+        assert b.finish(fresh)
+
+    def test_racing_claims_have_one_winner(self, db):
+        stores = [SQLiteLeaseStore(db, owner=f"c{i}") for i in range(8)]
+        with ThreadPoolExecutor(len(stores)) as pool:
+            leases = list(pool.map(lambda s: s.claim("digest", "2024-03-01"), stores))
+        assert sum(lease is not None for lease in leases) == 1
+
+    def test_last_run_is_the_last_finished_period(self, db):
+        a, b = SQLiteLeaseStore(db, owner="a"), SQLiteLeaseStore(db, owner="b")
+        assert b.last_run("digest") == ""
+        a.finish(a.claim("digest", "2024-03-01"))
+        a.release(a.claim("digest", "2024-03-02"))
+        assert b.last_run("digest") == "2024-03-01"
+
+    def test_store_from_url(self, db):
+        assert isinstance(lease_store(f"sqlite:///{db}"), SQLiteLeaseStore)
+        with pytest.raises(ValueError):
+            lease_store("memcached://x")
+
+    def test_store_is_built_on_first_use(self, db):
+        with patch.object(lease_service, "_leases", None), \
+                patch.object(settings, "scheduler_lock_url", f"sqlite:///{db}"):
+            store = lease_service.get_leases()
+            assert lease_service.get_leases() is store
+
+    def test_temp_file_store_is_development_only(self, db):
+        with patch.object(settings, "app_env", "production"):
+            with pytest.raises(RuntimeError, match="SCHEDULER_LOCK_URL"):
+                lease_store("")
+            assert isinstance(lease_store(f"sqlite:///{db}"), SQLiteLeaseStore)
+
+
+class TestRunOnce:
+    @pytest.mark.asyncio
+    async def test_each_container_checks_the_shared_lease(self, db):
+        job = AsyncMock()
+        stores = [SQLiteLeaseStore(db, owner=f"c{i}") for i in range(4)]
+
+        async def container(store):
+            with patch.object(lease_service, "_leases", store):
+                return await scheduler._run_once("morning_digest", job)
+
+        ran = [await container(s) for s in stores]
+        assert ran == [True, False, False, False]
+        assert job.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_run_releases_for_retry(self, db):
+        store = SQLiteLeaseStore(db)
+        failing = AsyncMock(side_effect=RuntimeError("sheets 503"))
+        with patch.object(lease_service, "_leases", store):
+            with pytest.raises(RuntimeError):
+                await scheduler._run_once("stale_deal_alerts", failing)
+            assert await scheduler._run_once("stale_deal_alerts", AsyncMock())
+
+
+class TestCatchUp:
+    @pytest.fixture
+    def jobs(self, db):
+        digest, alerts, snapshot = AsyncMock(), AsyncMock(), AsyncMock()
+        store = SQLiteLeaseStore(db)
+        with patch.object(lease_service, "_leases", store), \
+                patch.dict(scheduler.DAILY_JOBS, {"morning_digest": (9, 30, digest),
+                                                  "stale_deal_alerts": (18, 0, alerts)}), \
+                patch.object(scheduler, "_take_pipeline_snapshot", snapshot):
+            yield store, digest, alerts, snapshot
+
+    @staticmethod
+    def _at(hour, minute):
+        class Clock(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime(2024, 3, 1, hour, minute, tzinfo=timezone.utc)
+        return patch.object(scheduler, "datetime", Clock), patch.object(scheduler, "today_str", lambda: "2024-03-01")
+
+    @pytest.mark.asyncio
+    async def test_runs_jobs_past_their_time_without_a_run_today(self, jobs):
+        store, digest, alerts, _ = jobs
+        store.finish(store.claim("morning_digest", "2024-02-29"))
+        clock, today = self._at(12, 0)
+        with clock, today:
+            await scheduler._catch_up_missed_jobs()
+        digest.assert_awaited_once()
+        alerts.assert_not_awaited()  # not 18:00 yet
+
+    @pytest.mark.asyncio
+    async def test_skips_jobs_already_run_today(self, jobs):
+        store, digest, alerts, _ = jobs
+        store.finish(store.claim("morning_digest", "2024-03-01"))
+        clock, today = self._at(19, 0)
+        with clock, today:
+            await scheduler._catch_up_missed_jobs()
+        digest.assert_not_awaited()
+        alerts.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_startup_snapshot_once_a_day_and_nightly_still_runs(self, jobs, db):
+        _, _, _, snapshot = jobs
+        clock, today = self._at(8, 0)
+        with clock, today:
+            for owner in ("a", "b"):  # two containers starting
+                with patch.object(lease_service, "_leases", SQLiteLeaseStore(db, owner=owner)):
+                    await scheduler._catch_up_missed_jobs()
+            assert snapshot.await_count == 1
+
+            await scheduler.pipeline_snapshot()  # 23:55 overwrites it
+            await scheduler.pipeline_snapshot()  # ...once, across containers
+            assert snapshot.await_count == 2
+            await scheduler._catch_up_missed_jobs()  # restart after 23:55
+            assert snapshot.await_count == 2
@@ -0,0 +1,155 @@
+"""MCP HTTP client: one pooled async client, and parallel calls from composite tools."""
+
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+
+from mcp_server import api_client
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    """Route the shared client through a recording mock transport."""
+    requests = []
+    routes = {}
+    in_flight = {"now": 0, "max": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        status, body = routes.get(request.url.path, (200, {}))
+        return httpx.Response(status, json=body)
+
+    monkeypatch.setenv("VOSS_API_URL", "https://crm.example/")
+    monkeypatch.setenv("VOSS_API_KEY", "k1")
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        api_client.httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    monkeypatch.setattr(api_client, "_client", None)
+    yield requests, routes, in_flight
+
+
+class TestApiClient:
+    @pytest.mark.asyncio
+    async def test_requests_share_one_client(self, transport):
+        requests, routes, _ = transport
+        routes["/api/deals"] = (200, [{"id": "d1"}])
+        assert await api_client.api_get("/api/deals", {"contact_id": "c1", "stage": ""}) == [{"id": "d1"}]
+        client = api_client.get_client()
+        await api_client.api_put("/api/deals/d1", {"stage": "won"})
+        assert api_client.get_client() is client
+
+        get, put = requests
+        assert str(get.url) == "https://crm.example/api/deals?contact_id=c1"
+        assert get.headers["X-API-Key"] == "k1"
+        assert put.method == "PUT"
+        assert json.loads(put.content) == {"stage": "won"}
+        await api_client.aclose()
+        assert client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_error_status_raises(self, transport):
+        _, routes, _ = transport
+        routes["/api/deals/nope"] = (404, {"detail": "Deal not found"})
+        with pytest.raises(RuntimeError, match="API error 404: .*Deal not found"):
+            await api_client.api_get("/api/deals/nope")
+
+    @pytest.mark.asyncio
+    async def test_pipeline_fetches_in_parallel(self, transport):
+        from mcp_server.tools.deals import get_pipeline
+
+        requests, routes, in_flight = transport
+        routes["/api/deals/pipeline"] = (200, {"total_count": 1, "stages": {
+            "lead": {"count": 1, "by_currency": {"GBP": 100}}}})
+        routes["/api/deals"] = (200, [{"id": "d1", "title": "Pilot", "stage": "lead", "value": "100"}])
+
+        result = await get_pipeline()
+        assert len(requests) == 2
+        assert in_flight["max"] == 2
+        assert "Pilot — £100 [ID: d1]" in result
+
+    @pytest.mark.asyncio
+    async def test_contact_details_is_one_request(self, transport):
+        from mcp_server.tools.contacts import get_contact_details
+
+        requests, routes, _ = transport
+        routes["/api/contacts/c1/full"] = (200, {
+            "contact": {"id": "c1", "first_name": "Ann", "created_at": "2024-01-01"},
+            "deals": [{"id": "d1", "title": "Pilot", "stage": "lead", "value": "100"}],
+            "follow_ups": [],
+            "interactions": [{"id": "i1", "type": "call", "subject": "Intro", "occurred_at": "2024-01-02"}],
+            "counts": {"deals": 1, "follow_ups": 0, "interactions": 4},
+        })
+
+        result = await get_contact_details("c1")
+        [request] = requests
+        assert request.url.params["follow_up_status"] == "pending"
+        assert result.startswith("# Ann")
+        assert "Pilot" in result
+        assert "## Recent Interactions (last 1 of 4)" in result
+
+
+class TestInProcessTransport:
+    @pytest.fixture
+    def inprocess(self, monkeypatch, mock_sheets, seeded_contacts_ws):
+        monkeypatch.setenv("VOSS_MCP_TRANSPORT", "inprocess")
+        monkeypatch.delenv("VOSS_API_KEY", raising=False)
+        monkeypatch.setattr(api_client, "_client", None)
+        monkeypatch.setattr(api_client, "_inprocess", None)
+        yield seeded_contacts_ws
+
+    @pytest.mark.asyncio
+    async def test_tools_run_against_the_local_app(self, inprocess):
+        from app.main import app
+        from app.routers import contacts
+        from mcp_server.tools.contacts import update_contact
+
+        client = api_client.get_client()
+        assert isinstance(client._transport, api_client._LoopThreadTransport)
+        threads = []
+        get_by_id = contacts.contacts_sheet.get_by_id
+
+        def recording_get_by_id(record_id):
+            threads.append(threading.current_thread())
+            return get_by_id(record_id)
+
+        with pytest.MonkeyPatch.context() as mp:
+            mp.setattr(contacts.contacts_sheet, "get_by_id", recording_get_by_id)
+            contact = await api_client.api_get("/api/contacts/c1")
+        assert contact["first_name"] == "John"
+        assert threads and threads[0] is not threading.current_thread()
+        assert not app.dependency_overrides  # the API app still authenticates
+
+        result = await update_contact("c1", role="CTO & founder")
+        assert result == "Updated contact **John Smith** (ID: c1)."
+        assert "CTO & founder" in inprocess._data[0]
+
+        with pytest.raises(RuntimeError, match="API error 404"):
+            await api_client.api_get("/api/contacts/nope")
+        await api_client.aclose()
+
+    def test_one_loop_thread_across_event_loops(self, inprocess):
+        def loop_threads():
+            return sum(t.name == "voss-mcp-inprocess" for t in threading.enumerate())
+
+        async def call():
+            await api_client.api_get("/api/contacts/c1")
+            return api_client.get_client()
+
+        before = loop_threads()
+        clients = [asyncio.run(call()) for _ in range(3)]
+        assert len({id(c._transport) for c in clients}) == 1
+        assert loop_threads() == before + 1
+
+    def test_unknown_transport_is_rejected(self, monkeypatch):
+        monkeypatch.setenv("VOSS_MCP_TRANSPORT", "grpc")
+        with pytest.raises(ValueError):
+            api_client._get_transport()
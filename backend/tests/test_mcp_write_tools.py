@@ -12,35 +12,39 @@ import pytest
 class TestUpdateContact:
     """t02 — `update_contact` wraps PUT /api/contacts/{id}."""
 
-    def test_sends_only_non_empty_fields(self):
+    @pytest.mark.asyncio
+    async def test_sends_only_non_empty_fields(self):
         from mcp_server.tools.contacts import update_contact
         with patch("mcp_server.tools.contacts.api_put") as mock_put:
             mock_put.return_value = {"id": "c1", "first_name": "Tim", "last_name": "Kiel"}
-            update_contact(contact_id="c1", email="tim.kiel@serco.com", phone="")
+            await update_contact(contact_id="c1", email="tim.kiel@serco.com", phone="")
         mock_put.assert_called_once_with("/api/contacts/c1", {"email": "tim.kiel@serco.com"})
 
-    def test_returns_named_confirmation(self):
+    @pytest.mark.asyncio
+    async def test_returns_named_confirmation(self):
         from mcp_server.tools.contacts import update_contact
         with patch("mcp_server.tools.contacts.api_put") as mock_put:
             mock_put.return_value = {"id": "c1", "first_name": "Tim", "last_name": "Kiel"}
-            result = update_contact(contact_id="c1", email="x@y.com")
+            result = await update_contact(contact_id="c1", email="x@y.com")
         assert "Tim Kiel" in result
         assert "c1" in result
 
-    def test_no_fields_returns_message_without_api_call(self):
+    @pytest.mark.asyncio
+    async def test_no_fields_returns_message_without_api_call(self):
         from mcp_server.tools.contacts import update_contact
         with patch("mcp_server.tools.contacts.api_put") as mock_put:
-            result = update_contact(contact_id="c1")
+            result = await update_contact(contact_id="c1")
         assert result == "No fields to update."
         mock_put.assert_not_called()
 
-    def test_forwards_company_name(self):
+    @pytest.mark.asyncio
+    async def test_forwards_company_name(self):
         """company_name must reach the API as-is so resolution happens server-side
         (t01 covers the resolution itself). Closes the silent-drop bug class."""
         from mcp_server.tools.contacts import update_contact
         with patch("mcp_server.tools.contacts.api_put") as mock_put:
             mock_put.return_value = {"id": "c1", "first_name": "Tim", "last_name": "Kiel"}
-            update_contact(contact_id="c1", company_name="Serco")
+            await update_contact(contact_id="c1", company_name="Serco")
         called_path, called_body = mock_put.call_args.args
         assert called_path == "/api/contacts/c1"
         assert called_body.get("company_name") == "Serco"
@@ -56,27 +60,30 @@ class TestUpdateContact:
 class TestUpdateCompany:
     """t03 — `update_company` wraps PUT /api/companies/{id}."""
 
-    def test_sends_only_non_empty_fields(self):
+    @pytest.mark.asyncio
+    async def test_sends_only_non_empty_fields(self):
         from mcp_server.tools.companies import update_company
         with patch("mcp_server.tools.companies.api_put") as mock_put:
             mock_put.return_value = {"id": "co1", "name": "Endava"}
-            update_company(company_id="co1", industry="IT consultancy", website="")
+            await update_company(company_id="co1", industry="IT consultancy", website="")
         mock_put.assert_called_once_with(
             "/api/companies/co1", {"industry": "IT consultancy"},
         )
 
-    def test_returns_named_confirmation(self):
+    @pytest.mark.asyncio
+    async def test_returns_named_confirmation(self):
         from mcp_server.tools.companies import update_company
         with patch("mcp_server.tools.companies.api_put") as mock_put:
             mock_put.return_value = {"id": "co1", "name": "Endava"}
-            result = update_company(company_id="co1", industry="IT")
+            result = await update_company(company_id="co1", industry="IT")
         assert "Endava" in result
         assert "co1" in result
 
-    def test_no_fields_returns_message_without_api_call(self):
+    @pytest.mark.asyncio
+    async def test_no_fields_returns_message_without_api_call(self):
         from mcp_server.tools.companies import update_company
         with patch("mcp_server.tools.companies.api_put") as mock_put:
-            result = update_company(company_id="co1")
+            result = await update_company(company_id="co1")
         assert result == "No fields to update."
         mock_put.assert_not_called()
 
@@ -93,26 +100,29 @@ class TestUpdateCompany:
 class TestUpdateInteraction:
     """t04 — `update_interaction` wraps PUT /api/interactions/{id}."""
 
-    def test_sends_only_non_empty_fields(self):
+    @pytest.mark.asyncio
+    async def test_sends_only_non_empty_fields(self):
         from mcp_server.tools.interactions import update_interaction
         with patch("mcp_server.tools.interactions.api_put") as mock_put:
             mock_put.return_value = {"id": "i1", "subject": "Updated subject"}
-            update_interaction(interaction_id="i1", subject="Updated subject", body="")
+            await update_interaction(interaction_id="i1", subject="Updated subject", body="")
         mock_put.assert_called_once_with(
             "/api/interactions/i1", {"subject": "Updated subject"},
         )
 
-    def test_returns_confirmation_with_subject(self):
+    @pytest.mark.asyncio
+    async def test_returns_confirmation_with_subject(self):
         from mcp_server.tools.interactions import update_interaction
         with patch("mcp_server.tools.interactions.api_put") as mock_put:
             mock_put.return_value = {"id": "i1", "subject": "Initial call"}
-            result = update_interaction(interaction_id="i1", subject="Initial call")
+            result = await update_interaction(interaction_id="i1", subject="Initial call")
         assert "Initial call" in result or "i1" in result
 
-    def test_no_fields_returns_message_without_api_call(self):
+    @pytest.mark.asyncio
+    async def test_no_fields_returns_message_without_api_call(self):
         from mcp_server.tools.interactions import update_interaction
         with patch("mcp_server.tools.interactions.api_put") as mock_put:
-            result = update_interaction(interaction_id="i1")
+            result = await update_interaction(interaction_id="i1")
         assert result == "No fields to update."
         mock_put.assert_not_called()
 
@@ -127,27 +137,30 @@ class TestUpdateInteraction:
 class TestUpdateFollowUp:
     """t05a — `update_follow_up` wraps PUT /api/follow-ups/{id}."""
 
-    def test_sends_only_non_empty_fields(self):
+    @pytest.mark.asyncio
+    async def test_sends_only_non_empty_fields(self):
         from mcp_server.tools.follow_ups import update_follow_up
         with patch("mcp_server.tools.follow_ups.api_put") as mock_put:
             mock_put.return_value = {"id": "f1", "title": "Send proposal"}
-            update_follow_up(follow_up_id="f1", title="Send proposal", notes="")
+            await update_follow_up(follow_up_id="f1", title="Send proposal", notes="")
         mock_put.assert_called_once_with(
             "/api/follow-ups/f1", {"title": "Send proposal"},
         )
 
-    def test_no_fields_returns_message_without_api_call(self):
+    @pytest.mark.asyncio
+    async def test_no_fields_returns_message_without_api_call(self):
         from mcp_server.tools.follow_ups import update_follow_up
         with patch("mcp_server.tools.follow_ups.api_put") as mock_put:
-            result = update_follow_up(follow_up_id="f1")
+            result = await update_follow_up(follow_up_id="f1")
         assert result == "No fields to update."
         mock_put.assert_not_called()
 
-    def test_returns_confirmation(self):
+    @pytest.mark.asyncio
+    async def test_returns_confirmation(self):
         from mcp_server.tools.follow_ups import update_follow_up
         with patch("mcp_server.tools.follow_ups.api_put") as mock_put:
             mock_put.return_value = {"id": "f1", "title": "Send proposal"}
-            result = update_follow_up(follow_up_id="f1", title="Send proposal")
+            result = await update_follow_up(follow_up_id="f1", title="Send proposal")
         assert "Send proposal" in result
 
 
@@ -157,26 +170,29 @@ class TestSnoozeFollowUp:
     setting status='snoozed' and reminder_sent=FALSE; the explicit tool
     keeps that intent visible to the agent."""
 
-    def test_hits_patch_snooze_path_with_due_date(self):
+    @pytest.mark.asyncio
+    async def test_hits_patch_snooze_path_with_due_date(self):
         from mcp_server.tools.follow_ups import snooze_follow_up
         with patch("mcp_server.tools.follow_ups.api_patch") as mock_patch:
             mock_patch.return_value = {"id": "f1", "title": "Send proposal"}
-            snooze_follow_up(follow_up_id="f1", due_date="2026-06-01")
+            await snooze_follow_up(follow_up_id="f1", due_date="2026-06-01")
         mock_patch.assert_called_once_with(
             "/api/follow-ups/f1/snooze", {"due_date": "2026-06-01", "due_time": ""},
         )
 
-    def test_includes_due_time_when_provided(self):
+    @pytest.mark.asyncio
+    async def test_includes_due_time_when_provided(self):
         from mcp_server.tools.follow_ups import snooze_follow_up
         with patch("mcp_server.tools.follow_ups.api_patch") as mock_patch:
             mock_patch.return_value = {"id": "f1", "title": "Send proposal"}
-            snooze_follow_up(follow_up_id="f1", due_date="2026-06-01", due_time="14:00")
+            await snooze_follow_up(follow_up_id="f1", due_date="2026-06-01", due_time="14:00")
         called_args = mock_patch.call_args.args
         assert called_args[1]["due_time"] == "14:00"
 
-    def test_requires_due_date(self):
+    @pytest.mark.asyncio
+    async def test_requires_due_date(self):
         from mcp_server.tools.follow_ups import snooze_follow_up
         with patch("mcp_server.tools.follow_ups.api_patch") as mock_patch:
             with pytest.raises(ValueError):
-                snooze_follow_up(follow_up_id="f1", due_date="")
+                await snooze_follow_up(follow_up_id="f1", due_date="")
         mock_patch.assert_not_called()
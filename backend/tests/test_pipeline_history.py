@@ -0,0 +1,100 @@
+"""Daily pipeline snapshots and the history / stage-flow range queries."""
+
+import json
+from unittest.mock import patch
+
+from app.services import pipeline_history_service, sheet_service
+from app.services.pipeline_history_service import pipeline_history, snapshot_pipeline, stage_flow
+
+
+def _set_stages(stages: dict[str, str]):
+    """Create or move deals (by title) so each one sits in the given stage."""
+    for title, stage in stages.items():
+        deal = sheet_service.deals_sheet.find_by_field("title", title)
+        if deal:
+            sheet_service.deals_sheet.update(deal["id"], {"stage": stage})
+        else:
+            sheet_service.deals_sheet.create({"title": title, "stage": stage, "value": "100"})
+
+
+def _run_days(days: dict[str, dict[str, str]]):
+    for day, stages in days.items():
+        _set_stages(stages)
+        snapshot_pipeline(day)
+
+
+class TestSnapshot:
+    def test_row_is_compact_and_upserted_per_day(self, book):
+        _set_stages({"d1": "lead", "d2": "lead", "d3": "won"})
+        snapshot_pipeline("2024-03-01")
+        _set_stages({"d2": "qualified"})
+        snapshot_pipeline("2024-03-01")
+
+        [row] = sheet_service.pipeline_history_sheet.get_all()
+        assert row["snapshot_date"] == "2024-03-01"
+        assert json.loads(row["stages"]) == {"lead": [1, 100.0], "qualified": [1, 100.0], "won": [1, 100.0]}
+        ids = {d["title"]: d["id"] for d in sheet_service.deals_sheet.get_all()}
+        assert json.loads(row["deals"]) == {"lead": [ids["d1"]], "qualified": [ids["d2"]], "won": [ids["d3"]]}
+
+    def test_large_day_is_split_across_rows(self, book):
+        _set_stages({f"d{n}": "lead" if n % 2 else "won" for n in range(12)})
+        with patch.object(pipeline_history_service, "DEALS_CELL_CHARS", 60):
+            rows = snapshot_pipeline("2024-03-01")
+        assert len(rows) > 2
+        assert all(len(row["deals"]) <= 60 for row in rows)
+        assert {row["snapshot_date"] for row in rows} == {"2024-03-01"}
+        [day] = pipeline_history("2024-03-01", "2024-03-01")
+        assert (day["stages"]["lead"]["count"], day["stages"]["won"]["count"]) == (6, 6)
+        view = sheet_service.pipeline_history_sheet.view(pipeline_history_service.PipelineHistoryView)
+        assert len(view.window("2024-03-01", "2024-03-01")[0][2]) == 12
+
+        # A re-run that fits in one cell rewrites the first row and drops the rest.
+        _set_stages({"d0": "qualified"})
+        [row] = snapshot_pipeline("2024-03-01")
+        assert len(book["pipeline_history_sheet"]._data) == 1
+        [(_day, _stages, deals)] = view.window("2024-03-01", "2024-03-01")
+        assert sorted(set(deals.values())) == ["lead", "qualified", "won"]
+        assert len(deals) == 12
+
+
+class TestRangeQueries:
+    def test_history_reads_only_the_window(self, book):
+        _run_days({
+            "2024-03-01": {"d1": "lead"},
+            "2024-03-02": {"d2": "lead"},
+            "2024-03-03": {"d1": "won"},
+        })
+        history = pipeline_history("2024-03-02", "2024-03-03")
+        assert [h["date"] for h in history] == ["2024-03-02", "2024-03-03"]
+        assert history[0]["stages"]["lead"] == {"count": 2, "value": 200.0}
+        assert history[1]["open_count"] == 1
+        assert history[1]["stages"]["won"]["count"] == 1
+
+    def test_flow_and_velocity(self, book):
+        _run_days({
+            "2024-03-01": {"d1": "lead"},
+            "2024-03-02": {"d2": "lead"},
+            "2024-03-05": {"d1": "qualified", "d2": "qualified"},
+            "2024-03-06": {"d2": "won"},
+        })
+        flow = stage_flow("2024-03-01", "2024-03-06")
+        assert flow["snapshots"] == 4
+        assert {(t["from"], t["to"]): t["count"] for t in flow["transitions"]} == {
+            ("", "lead"): 1, ("lead", "qualified"): 2, ("qualified", "won"): 1,
+        }
+        # d1's lead stay started before the first snapshot, so only d2's counts.
+        assert flow["velocity"] == {
+            "lead": {"exits": 1, "avg_days": 3.0},
+            "qualified": {"exits": 1, "avg_days": 1.0},
+        }
+
+    def test_endpoints(self, client, auth_headers, book):
+        _run_days({"2024-03-01": {"d1": "lead"}, "2024-03-02": {"d1": "won"}})
+        resp = client.get("/api/deals/pipeline/history?start=2024-03-01&end=2024-03-31", headers=auth_headers)
+        assert resp.status_code == 200
+        assert len(resp.json()["history"]) == 2
+        resp = client.get("/api/deals/pipeline/flow?start=2024-03-01&end=2024-03-31", headers=auth_headers)
+        assert resp.json()["transitions"] == [{"from": "lead", "to": "won", "count": 1}]
+        assert client.get("/api/deals/pipeline/flow?start=March", headers=auth_headers).status_code == 422
+        assert client.get("/api/deals/pipeline/flow?start=2024-02-30", headers=auth_headers).status_code == 400
+        assert client.get("/api/deals/pipeline/history?end=2024-13-01", headers=auth_headers).status_code == 400
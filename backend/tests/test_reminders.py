@@ -0,0 +1,212 @@
+"""Follow-up reminders: the ReminderQueue timer heap and the scheduler's timer."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app import scheduler
+from app.services import lease_service, sheet_service
+from app.services.indexes import ReminderQueue
+from app.services.lease_service import SQLiteLeaseStore
+from app.services.sheet_service import parse_epoch
+
+
+@pytest.fixture
+def follow_ups(book):
+    return sheet_service.follow_ups_sheet
+
+
+@pytest.fixture(autouse=True)
+def lease_db(tmp_path):
+    db = str(tmp_path / "leases.db")
+    with patch.object(lease_service, "_leases", SQLiteLeaseStore(db, owner="here")):
+        yield db
+
+
+def _at(minutes: int) -> tuple[str, str]:
+    """(due_date, due_time) `minutes` from now, in UTC."""
+    when = datetime.now(timezone.utc) + timedelta(minutes=minutes)
+    return when.strftime("%Y-%m-%d"), when.strftime("%H:%M")
+
+
+class TestReminderQueue:
+    def test_orders_by_due_time_and_follows_edits(self, follow_ups):
+        late = follow_ups.create({"title": "late", "due_date": "2024-03-01", "due_time": "17:45", "status": "pending"})
+        early = follow_ups.create({"title": "early", "due_date": "2024-03-01", "due_time": "09:10", "status": "pending"})
+        follow_ups.create({"title": "no time", "due_date": "2024-03-01", "status": "pending"})
+        queue = follow_ups.view(ReminderQueue)
+        assert queue.next_due() == parse_epoch("2024-03-01T09:10")
+
+        follow_ups.update(early["id"], {"status": "completed"})
+        assert queue.next_due() == parse_epoch("2024-03-01T17:45")
+        # Snoozing re-times the reminder and re-arms it
+        follow_ups.update(late["id"], {"due_time": "18:05", "status": "snoozed", "reminder_sent": "FALSE"})
+        assert queue.next_due() == parse_epoch("2024-03-01T18:05")
+
+    def test_due_splits_late_and_stays_queued_until_marked(self, follow_ups):
+        stale = follow_ups.create({"title": "old", "due_date": "2024-03-01", "due_time": "08:00", "status": "pending"})
+        fresh = follow_ups.create({"title": "now", "due_date": "2024-03-02", "due_time": "08:00", "status": "pending"})
+        queue = follow_ups.view(ReminderQueue)
+        now = parse_epoch("2024-03-02T08:01")
+
+        def ids(pair):
+            return [[f["id"] for f in part] for part in pair]
+
+        assert ids(queue.due(now, grace=3600)) == [[fresh["id"]], [stale["id"]]]
+        assert ids(queue.due(now, grace=3600)) == [[fresh["id"]], [stale["id"]]]
+        follow_ups.update(fresh["id"], {"reminder_sent": "TRUE"})
+        queue.discard(stale["id"])
+        assert queue.due(now, grace=3600) == ([], [])
+        assert queue.next_due() is None
+
+    def test_on_change_fires_on_writes(self, follow_ups):
+        queue = follow_ups.view(ReminderQueue)
+        calls = []
+        queue.on_change = lambda: calls.append(1)
+        date, time = _at(30)
+        follow_ups.create({"title": "x", "due_date": date, "due_time": time, "status": "pending"})
+        assert calls
+
+
+class TestReminderTimer:
+    @pytest.mark.asyncio
+    async def test_batch_is_one_broadcast_and_one_write(self, follow_ups):
+        date, time = _at(-1)
+        due = [follow_ups.create({"title": f"R{i}", "due_date": date, "due_time": time, "status": "pending"})
+               for i in range(3)]
+        ws = follow_ups._worksheet()
+        with patch.object(scheduler.dispatcher, "broadcast_many", new=AsyncMock()) as send, \
+                patch.object(ws, "update") as single_update:
+            await scheduler.send_follow_up_reminders(due)
+        single_update.assert_not_called()
+        [texts] = send.await_args.args
+        assert [t.split(": ")[1].split(" —")[0] for t in texts] == ["R0", "R1", "R2"]
+        assert all(follow_ups.get_by_id(f["id"])["reminder_sent"] == "TRUE" for f in due)
+
+    @pytest.mark.asyncio
+    async def test_late_reminders_go_out_as_one_missed_digest(self, follow_ups):
+        late = follow_ups.create({"title": "Overnight", "due_date": "2024-03-01", "due_time": "02:00",
+                                  "status": "pending"})
+        with patch.object(scheduler.dispatcher, "broadcast_many", new=AsyncMock()) as send:
+            await scheduler.send_follow_up_reminders([], [late])
+        [texts] = send.await_args.args
+        assert texts == ["🕓 *1 missed reminders*\n  • Overnight — ? (due 2024-03-01 02:00)"]
+        assert follow_ups.get_by_id(late["id"])["reminder_sent"] == "TRUE"
+
+    @pytest.mark.asyncio
+    async def test_failed_send_is_unmarked_for_retry(self, follow_ups):
+        date, time = _at(-1)
+        due = follow_ups.create({"title": "Call", "due_date": date, "due_time": time, "status": "pending"})
+        queue = follow_ups.view(ReminderQueue)
+        with patch.object(scheduler.dispatcher, "broadcast_many", new=AsyncMock(side_effect=RuntimeError)):
+            with pytest.raises(RuntimeError):
+                await scheduler.send_follow_up_reminders([due])
+        assert follow_ups.get_by_id(due["id"])["reminder_sent"] == "FALSE"
+        assert queue.next_due() is not None
+        with patch.object(scheduler.dispatcher, "broadcast_many", new=AsyncMock()) as send:
+            assert await scheduler.send_follow_up_reminders([due]) == {due["id"]}
+        send.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_reminder_leased_by_another_container_is_not_sent(self, follow_ups, lease_db):
+        date, time = _at(-1)
+        due = follow_ups.create({"title": "Call", "due_date": date, "due_time": time, "status": "pending"})
+        other = SQLiteLeaseStore(lease_db, owner="there")
+        lease = other.claim(f"reminder:{due['id']}", f"{date} {time}")
+        with patch.object(scheduler.dispatcher, "broadcast_many", new=AsyncMock()) as send:
+            assert await scheduler.send_follow_up_reminders([due]) == set()
+            assert send.await_args.args == ([],)
+            assert follow_ups.get_by_id(due["id"])["reminder_sent"] != "TRUE"
+
+            other.finish(lease)  # sent there
+            assert await scheduler.send_follow_up_reminders([due]) == set()
+            # Re-timed: a new due time is a new reminder
+            retimed = follow_ups.update(due["id"], {"due_time": "23:59"})
+            assert await scheduler.send_follow_up_reminders([retimed]) == {due["id"]}
+
+    @pytest.mark.asyncio
+    async def test_undelivered_reminders_are_unmarked_for_retry(self, follow_ups):
+        date, time = _at(-1)
+        due = [follow_ups.create({"title": f"R{i}", "due_date": date, "due_time": time, "status": "pending"})
+               for i in range(2)]
+        with patch.object(scheduler.dispatcher, "broadcast_many", new=AsyncMock(return_value={1})):
+            with pytest.raises(scheduler.ReminderSendError):
+                await scheduler.send_follow_up_reminders(due)
+        assert follow_ups.get_by_id(due[0]["id"])["reminder_sent"] == "TRUE"
+        assert follow_ups.get_by_id(due[1]["id"])["reminder_sent"] == "FALSE"
+        with patch.object(scheduler.dispatcher, "broadcast_many", new=AsyncMock(return_value=set())):
+            assert await scheduler.send_follow_up_reminders([due[1]]) == {due[1]["id"]}
+
+    @pytest.mark.asyncio
+    async def test_edited_follow_up_is_reminded_once(self, follow_ups):
+        date, time = _at(-1)
+        due = follow_ups.create({"title": "Call Ann", "due_date": date, "due_time": time, "status": "pending"})
+        follow_ups.view(ReminderQueue)
+        follow_ups.update(due["id"], {"notes": "edited"})  # same due time
+
+        timer = scheduler.ReminderTimer()
+        with patch.object(scheduler.dispatcher, "broadcast_many", new=AsyncMock(return_value=set())) as send:
+            timer.start()
+            try:
+                for _ in range(50):
+                    if send.await_count:
+                        break
+                    await asyncio.sleep(0.02)
+                await asyncio.sleep(0.05)
+            finally:
+                timer.stop()
+        [texts] = send.await_args.args
+        assert len(texts) == 1 and "Call Ann" in texts[0]
+        assert send.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_reminder_whose_row_is_gone_is_not_resent(self, follow_ups):
+        date, time = _at(-1)
+        follow_ups.create({"title": "Gone", "due_date": date, "due_time": time, "status": "pending"})
+        follow_ups._worksheet()._data.clear()  # deleted in the sheet; our cache still has it
+
+        timer = scheduler.ReminderTimer()
+        with patch.object(scheduler.dispatcher, "broadcast_many", new=AsyncMock()) as send:
+            timer.start()
+            try:
+                for _ in range(50):
+                    if follow_ups.view(ReminderQueue).next_due() is None:
+                        break
+                    await asyncio.sleep(0.02)
+                await asyncio.sleep(0.05)
+            finally:
+                timer.stop()
+        assert follow_ups.view(ReminderQueue).next_due() is None
+        # Claimed nothing, so sent nothing — and didn't spin retrying it.
+        assert send.await_count <= 1
+        assert all(call.args[0] == [] for call in send.await_args_list)
+
+    @pytest.mark.asyncio
+    async def test_sends_off_boundary_reminder_and_wakes_on_create(self, follow_ups):
+        date, time = _at(-1)  # a minute ago — not on a :00/:30 boundary in general
+        due = follow_ups.create({"title": "Call Ann", "due_date": date, "due_time": time, "status": "pending"})
+        follow_ups.create({"title": "Later", "due_date": _at(120)[0], "due_time": _at(120)[1], "status": "pending"})
+
+        timer = scheduler.ReminderTimer()
+        with patch.object(scheduler.dispatcher, "broadcast_many", new=AsyncMock()) as send:
+            timer.start()
+            try:
+                for _ in range(50):
+                    if send.await_count:
+                        break
+                    await asyncio.sleep(0.02)
+                assert send.await_count == 1
+                assert "Call Ann" in send.await_args.args[0][0]
+                assert follow_ups.get_by_id(due["id"])["reminder_sent"] == "TRUE"
+
+                # Timer is now asleep until "Later"; a new due reminder wakes it.
+                follow_ups.create({"title": "Urgent", "due_date": date, "due_time": time, "status": "pending"})
+                for _ in range(50):
+                    if send.await_count == 2:
+                        break
+                    await asyncio.sleep(0.02)
+                assert send.await_count == 2
+            finally:
+                timer.stop()
@@ -25,6 +25,14 @@ def _clear_cache():
 def _stub_sheet(records: list[dict]) -> MagicMock:
     sheet = MagicMock()
     sheet.get_all.return_value = records
+
+    def view(view_cls, *args):
+        built = view_cls(*args)
+        built.build(records)
+        return built
+
+    sheet.view.side_effect = view
+    sheet.get_by_id.side_effect = {r["id"]: r for r in records}.get
     return sheet
 
 
@@ -423,3 +431,79 @@ class TestSearchEndpoint:
             assert key in body
         contact_ids = {c["id"] for c in body["contacts"]}
         assert {"c_andrew", "c_tom"}.issubset(contact_ids)
+
+
+def test_engagement_breaks_relevance_ties(voss_data):
+    """Filters-only search has no text score, so engagement orders the people."""
+    result = search_service.unified_search("", roles=["cto", "vp", "account"])
+    ids = [c["id"] for c in result["contacts"]]
+    # Andrew's interaction is more recent than Jane's; Tom has none.
+    assert ids == ["c_andrew", "c_jane", "c_tom"]
+    assert result["contacts"][-1]["engagement_score"] == 0.0
+
+
+class TestSuggestContacts:
+    def test_name_prefixes_and_company(self, voss_data):
+        def ids(query, **kwargs):
+            return [c["id"] for c in search_service.suggest_contacts(query, **kwargs)]
+
+        assert ids("and") == ["c_andrew"]
+        assert ids("t VIN") == ["c_tom"]
+        # Company words match everyone at the company; archived contacts are left out
+        assert ids("endava") == ["c_andrew", "c_tom"]
+        assert ids("endava to") == ["c_tom"]
+        assert ids("endava", include_companies=False) == []
+        assert ids("endava", limit=1) == ["c_andrew"]
+        assert ids("") == []
+
+    @pytest.mark.asyncio
+    async def test_telegram_inline_query_and_id_arguments(self, voss_data, monkeypatch):
+        from unittest.mock import AsyncMock
+
+        from app.services import telegram_service
+
+        monkeypatch.setattr(telegram_service, "contacts_sheet", search_service.contacts_sheet)
+        monkeypatch.setattr(telegram_service, "companies_sheet", search_service.companies_sheet)
+        update = MagicMock()
+        update.inline_query.query = "endava"
+        update.inline_query.answer = AsyncMock()
+        await telegram_service.handle_inline_query(update, MagicMock())
+        [results] = update.inline_query.answer.await_args.args
+        assert [r.id for r in results] == ["c_andrew", "c_tom"]
+        assert results[0].description == "CTO · Endava"
+        assert "`c_andrew`" in results[0].input_message_content.message_text
+
+        def matches(ref):
+            return [c["id"] for c in telegram_service._contact_matches(ref)]
+
+        assert matches("c_tom") == ["c_tom"]
+        assert matches("#c_tom") == ["c_tom"]
+        assert matches("Andrew Ross") == ["c_andrew"]
+        assert matches("Endava") == []
+
+    @pytest.mark.asyncio
+    async def test_telegram_ambiguous_name_lists_the_candidates(self, voss_data, monkeypatch):
+        from unittest.mock import AsyncMock
+
+        from app.services import telegram_service
+
+        ross = {"id": "c_ross", "company_id": "", "first_name": "Andrew", "last_name": "Ross", "status": "active"}
+        contacts = _stub_sheet(search_service.contacts_sheet.get_all.return_value + [ross])
+        monkeypatch.setattr(search_service, "contacts_sheet", contacts)
+        monkeypatch.setattr(telegram_service, "contacts_sheet", contacts)
+        monkeypatch.setattr(telegram_service, "companies_sheet", search_service.companies_sheet)
+        update = MagicMock()
+        update.message.reply_text = AsyncMock()
+
+        # An exact full name wins over longer names it prefixes
+        assert await telegram_service._reply_contact(update, "andrew  ross") == ross
+        update.message.reply_text.assert_not_awaited()
+
+        assert await telegram_service._reply_contact(update, "andrew ro") is None
+        [text] = update.message.reply_text.await_args.args
+        assert text.startswith("Several contacts match 'andrew ro'")
+        assert "Andrew Rossiter (Endava) — `c_andrew`" in text
+        assert "Andrew Ross — `c_ross`" in text
+
+        assert await telegram_service._reply_contact(update, "nobody") is None
+        assert update.message.reply_text.await_args.args == ("Contact 'nobody' not found.",)
@@ -37,6 +37,7 @@ class TestAuthBypass:
         ("GET", "/api/contacts"),
         ("POST", "/api/contacts"),
         ("GET", "/api/contacts/test-id"),
+        ("GET", "/api/contacts/test-id/full"),
         ("PUT", "/api/contacts/test-id"),
         ("DELETE", "/api/contacts/test-id"),
         ("GET", "/api/companies"),
@@ -49,6 +50,7 @@ class TestAuthBypass:
         ("POST", "/api/interactions"),
         ("GET", "/api/dashboard/summary"),
         ("GET", "/api/dashboard/stale-deals"),
+        ("GET", "/api/dashboard/digest"),
         ("POST", "/api/email/draft"),
         ("GET", "/api/auth/me"),
     ]
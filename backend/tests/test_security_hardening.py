@@ -69,6 +69,20 @@ class TestProductionSecretValidation:
         )
         s.validate_production()  # Should not raise
 
+    def test_validate_production_requires_a_shared_lock_store_for_the_scheduler(self):
+        s = Settings(
+            _env_file=None,
+            app_env="production",
+            jwt_secret_key="real-secret",
+            invite_code="real-code",
+            voss_api_key="real-key",
+            telegram_enabled=True,
+        )
+        with pytest.raises(RuntimeError, match="SCHEDULER_LOCK_URL"):
+            s.validate_production()
+        s.telegram_enabled = False  # no scheduler, no leases
+        s.validate_production()
+
     def test_validate_production_reports_all_issues(self):
         s = Settings(_env_file=None, app_env="production")
         with pytest.raises(RuntimeError) as exc_info:
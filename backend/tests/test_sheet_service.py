@@ -2,7 +2,7 @@ from unittest.mock import patch
 
 import pytest
 
-from app.services.sheet_service import SheetService, _cache
+from app.services.sheet_service import SheetService, SheetView, _cache, parse_epoch
 
 
 class TestSheetService:
@@ -91,3 +91,154 @@ class TestSheetService:
         assert len(service.get_all()) == 1
         service.create({"name": "Bob"})
         assert len(service.get_all()) == 2
+
+    def test_get_by_id_after_update_sees_new_values(self, service):
+        created = service.create({"name": "Alice"})
+        service.get_all()  # warm the snapshot so the update is written through
+        service.update(created["id"], {"name": "Alicia"})
+        assert service.get_by_id(created["id"])["name"] == "Alicia"
+
+    def test_writes_patch_the_cached_snapshot(self, service, mock_worksheet):
+        service.create({"name": "Alice"})
+        service.get_all()
+        calls = []
+        original = mock_worksheet.get_all_records
+        mock_worksheet.get_all_records = lambda **kw: calls.append(1) or original(**kw)
+        service.create({"name": "Bob"})
+        # create() reads nothing back; the cached snapshot already holds Bob
+        assert [r["name"] for r in service.get_all()] == ["Alice", "Bob"]
+        assert calls == []
+
+    def test_writes_never_mutate_a_list_already_handed_out(self, service):
+        alice = service.create({"name": "Alice"})
+        service.create({"name": "Bob"})
+        held = service.get_all()
+        service.create({"name": "Cara"})
+        service.update(alice["id"], {"name": "Alicia"})
+        assert [r["name"] for r in held] == ["Alice", "Bob"]
+        assert [r["name"] for r in service.get_all()] == ["Alicia", "Bob", "Cara"]
+
+
+class TestSheetViews:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        _cache.clear()
+        yield
+        _cache.clear()
+
+    @pytest.fixture
+    def service(self, mock_worksheet):
+        columns = ["id", "name", "status", "created_at", "updated_at"]
+        mock_worksheet._headers = columns
+        svc = SheetService("ViewTab", columns)
+        with patch.object(svc, "_worksheet", return_value=mock_worksheet):
+            yield svc
+
+    class _Counting(SheetView):
+        builds = 0
+
+        def reset(self):
+            type(self).builds += 1
+            self.names = set()
+
+        def add(self, record):
+            self.names.add(record["name"])
+
+        def remove(self, record):
+            self.names.discard(record["name"])
+
+    def test_view_built_once_and_patched_by_writes(self, service):
+        self._Counting.builds = 0
+        a = service.create({"name": "Alice"})
+        assert service.view(self._Counting).names == {"Alice"}
+        service.create({"name": "Bob"})
+        service.update(a["id"], {"name": "Alicia"})
+        assert service.view(self._Counting).names == {"Alicia", "Bob"}
+        assert self._Counting.builds == 1
+
+    def test_view_rebuilt_after_cache_refill(self, service, mock_worksheet):
+        self._Counting.builds = 0
+        service.create({"name": "Alice"})
+        service.view(self._Counting)
+        _cache.clear()
+        mock_worksheet._data[0][1] = "Changed elsewhere"
+        assert service.view(self._Counting).names == {"Changed elsewhere"}
+        assert self._Counting.builds == 2
+
+    def test_identical_refill_keeps_view_and_generation(self, service):
+        self._Counting.builds = 0
+        service.create({"name": "Alice"})
+        service.view(self._Counting)
+        generation = service.generation
+        _cache.clear()
+        service.view(self._Counting)
+        assert self._Counting.builds == 1
+        assert service.generation == generation
+
+
+class TestRangeQuery:
+    @pytest.fixture
+    def service(self, mock_worksheet):
+        _cache.clear()
+        columns = ["id", "title", "due_date", "status", "created_at"]
+        mock_worksheet._headers = columns
+        svc = SheetService("RangeTab", columns)
+        with patch.object(svc, "_worksheet", return_value=mock_worksheet):
+            yield svc
+        _cache.clear()
+
+    def test_half_open_and_inclusive_bounds(self, service):
+        for day in ("2024-01-03", "2024-01-01", "2024-01-02", "2024-01-02", ""):
+            service.create({"title": day, "due_date": day, "status": "pending"})
+        assert [r["due_date"] for r in service.range_query("due_date", hi="2024-01-02")] == ["2024-01-01"]
+        assert [r["due_date"] for r in service.range_query("due_date", "2024-01-02", "2024-01-02", include_hi=True)] == [
+            "2024-01-02", "2024-01-02"]
+        assert len(service.range_query("due_date", lo="2024-01-02")) == 3
+        assert len(service.range_query("due_date")) == 4  # blank due_date is not indexed
+
+    def test_where_follows_status_changes(self, service):
+        a = service.create({"due_date": "2024-01-01", "status": "pending"})
+        service.create({"due_date": "2024-01-01", "status": "completed"})
+        assert [r["id"] for r in service.range_query("due_date", where={"status": "pending"})] == [a["id"]]
+        service.update(a["id"], {"status": "completed"})
+        assert service.range_query("due_date", where={"status": "pending"}) == []
+        assert len(service.range_query("due_date", where={"status": "completed"})) == 2
+
+    def test_moved_date_is_reindexed(self, service):
+        a = service.create({"due_date": "2024-01-05", "status": "pending"})
+        service.range_query("due_date")
+        service.update(a["id"], {"due_date": "2023-12-31"})
+        assert [r["id"] for r in service.range_query("due_date", hi="2024-01-01")] == [a["id"]]
+        service.delete(a["id"])  # soft delete: archived rows leave a pending-only index
+        assert service.range_query("due_date", where={"status": "pending"}) == []
+
+    def test_mixed_offsets_order_by_instant(self, service):
+        for ts in ("2024-01-01T12:00:00Z", "2024-01-01T13:30:00+02:00", "2024-01-01T11:00:00"):
+            service.create({"title": ts, "due_date": ts, "status": "pending"})
+        # 13:30+02:00 is 11:30Z, so it sorts between the naive 11:00 and 12:00Z.
+        assert [r["title"] for r in service.range_query("due_date")] == [
+            "2024-01-01T11:00:00", "2024-01-01T13:30:00+02:00", "2024-01-01T12:00:00Z"]
+        cutoff = parse_epoch("2024-01-01T11:45:00Z")
+        assert len(service.range_query("due_date", hi=cutoff)) == 2
+
+
+class TestEpochColumns:
+    def test_parse_epoch(self):
+        assert parse_epoch("2024-01-01T00:00:00Z") == parse_epoch("2024-01-01T02:00:00+02:00")
+        assert parse_epoch("2024-01-01") == parse_epoch("2024-01-01T00:00:00")
+        assert parse_epoch("") is None
+        assert parse_epoch("next week") is None
+
+    def test_accessor_follows_updates(self, mock_worksheet):
+        _cache.clear()
+        columns = ["id", "title", "sent_at", "created_at"]
+        mock_worksheet._headers = columns
+        svc = SheetService("EpochTab", columns)
+        assert svc.date_fields == ("sent_at", "created_at")
+        with patch.object(svc, "_worksheet", return_value=mock_worksheet):
+            row = svc.create({"title": "x", "sent_at": "2024-01-01T00:00:00Z"})
+            assert svc.epoch(svc.get_by_id(row["id"]), "sent_at") == parse_epoch("2024-01-01")
+            svc.update(row["id"], {"sent_at": "2024-02-01T00:00:00Z"})
+            assert svc.epoch(svc.get_by_id(row["id"]), "sent_at") == parse_epoch("2024-02-01")
+            assert svc.epoch(svc.get_by_id(row["id"]), "title") is None
+        _cache.clear()
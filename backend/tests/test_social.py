@@ -0,0 +1,139 @@
+"""Social capture and the Chrome extension's batch lookup resolve through the
+contacts handle and name indexes."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.services.sheet_service import _cache
+
+
+@pytest.fixture
+def contacts_ws(seeded_contacts_ws):
+    # c1 John Smith gets a LinkedIn handle; c2 Jane Doe is matched by name only.
+    seeded_contacts_ws._data[0][8] = json.dumps({"linkedin": "https://linkedin.com/in/jsmith/"})
+    _cache.clear()
+    with patch("app.routers.social.contacts_sheet._worksheet", return_value=seeded_contacts_ws):
+        yield seeded_contacts_ws
+    _cache.clear()
+
+
+class TestBatchLookup:
+    def test_resolves_by_handle_then_name(self, client, auth_headers, contacts_ws):
+        resp = client.post("/api/social/batch-lookup", headers=auth_headers, json={"items": [
+            {"handle": "https://LinkedIn.com/in/jsmith", "display_name": "Someone Else"},
+            {"handle": "", "display_name": "Jane Doe"},
+            {"handle": "https://linkedin.com/in/nobody", "display_name": "No Body"},
+        ]})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [r["contact_id"] for r in data] == ["c1", "c2", ""]
+        assert data[0]["contact_name"] == "John Smith"
+        assert data[2]["found"] is False
+
+    def test_name_match_ignores_credentials_suffix(self, client, auth_headers, contacts_ws):
+        resp = client.post("/api/social/batch-lookup", headers=auth_headers, json={"items": [
+            {"display_name": "Jane Doe, CFA"},
+        ]})
+        assert resp.json()[0]["contact_id"] == "c2"
+
+    def test_name_match_is_exact_on_the_normalised_key(self, client, auth_headers, contacts_ws):
+        # Case, credentials and pronoun suffixes are ignored; partial names no
+        # longer match by substring as they did before the name index.
+        resp = client.post("/api/social/batch-lookup", headers=auth_headers, json={"items": [
+            {"display_name": "JANE doe"},
+            {"display_name": "Jane Doe (she/her)"},
+            {"display_name": "Jane A. Doe"},
+            {"display_name": "John Smi"},
+            {"display_name": "Jo Smith"},
+            {"display_name": "John Smithson"},
+        ]})
+        assert [r["contact_id"] for r in resp.json()] == ["c2", "c2", "c2", "", "", ""]
+
+    def test_streams_ndjson_on_request(self, client, auth_headers, contacts_ws):
+        items = [{"display_name": "Jane Doe"}] * 300
+        resp = client.post(
+            "/api/social/batch-lookup",
+            headers={**auth_headers, "Accept": "application/x-ndjson"},
+            json={"items": items},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        assert len(lines) == 300
+        assert all(r["contact_id"] == "c2" for r in lines)
+
+
+class TestCapture:
+    def test_capture_matches_existing_handle(self, client, auth_headers, contacts_ws, make_mock_worksheet):
+        from app.services.sheet_service import INTERACTIONS_COLUMNS
+
+        interactions_ws = make_mock_worksheet()
+        interactions_ws._headers = INTERACTIONS_COLUMNS
+        with patch("app.routers.social.interactions_sheet._worksheet", return_value=interactions_ws):
+            resp = client.post("/api/social/capture", headers=auth_headers, json={
+                "platform": "linkedin",
+                "person": {"handle": "https://linkedin.com/in/jsmith"},
+                "action": "like",
+            })
+        assert resp.status_code == 200
+        assert resp.json()["match_type"] == "handle"
+        assert resp.json()["contact"]["id"] == "c1"
+
+
+class TestLookupDigest:
+    def test_digest_contains_hashed_handles_and_names(self, client, auth_headers, contacts_ws):
+        from app.services.indexes import digest_hash
+
+        resp = client.get("/api/social/digest", headers=auth_headers)
+        assert resp.status_code == 200
+        entries = set(resp.json()["entries"])
+        assert digest_hash("h:https://linkedin.com/in/jsmith") in entries
+        assert digest_hash("n:jane doe") in entries
+        assert digest_hash("n:nobody here") not in entries
+        assert resp.headers["ETag"] == f'"{resp.json()["version"]}"'
+
+    def test_if_none_match_returns_304(self, client, auth_headers, contacts_ws):
+        first = client.get("/api/social/digest", headers=auth_headers)
+        resp = client.get(
+            "/api/social/digest",
+            headers={**auth_headers, "If-None-Match": first.headers["ETag"]},
+        )
+        assert resp.status_code == 304
+
+    def test_since_returns_delta_after_change(self, client, auth_headers, contacts_ws):
+        from app.services.indexes import digest_hash
+
+        old = client.get("/api/social/digest", headers=auth_headers).json()["version"]
+        with patch("app.routers.contacts.contacts_sheet._worksheet", return_value=contacts_ws):
+            client.post("/api/contacts", headers=auth_headers, json={
+                "first_name": "Ada", "last_name": "Lovelace",
+            })
+        resp = client.get(f"/api/social/digest?since={old}", headers=auth_headers).json()
+        assert resp["full"] is False
+        assert resp["base"] == old
+        assert resp["added"] == [digest_hash("n:ada lovelace")]
+        assert resp["removed"] == []
+
+    def test_unknown_since_gets_an_explicit_full_resync(self, client, auth_headers, contacts_ws):
+        from app.routers import social
+
+        current = client.get("/api/social/digest", headers=auth_headers).json()
+        social._digest_history.clear()  # as after a cold start
+        resp = client.get(f"/api/social/digest?since={current['version']}0", headers=auth_headers).json()
+        assert resp["full"] is True
+        assert resp["entries"] == current["entries"]
+        assert "base" not in resp
+
+    def test_version_is_cached_until_the_digest_changes(self, contacts_ws):
+        from app.services.indexes import LookupDigest
+        from app.services.sheet_service import contacts_sheet
+
+        digest = contacts_sheet.view(LookupDigest)
+        version = digest.version()
+        with patch("app.services.indexes.hashlib.sha256") as sha:
+            assert digest.version() == version
+        sha.assert_not_called()
+        digest.add({"id": "c9", "first_name": "Ada", "last_name": "Lovelace"})
+        assert digest.version() != version
@@ -0,0 +1,88 @@
+"""Telegram webhook mode: secret verification and hand-off to the bot's update queue."""
+
+from unittest.mock import patch
+
+import pytest
+from telegram import Update
+from telegram.ext import Application
+
+from app.config import settings
+from app.services import telegram_service
+
+SECRET = "s3cret"
+
+# A /today message as Telegram posts it to the webhook
+TODAY_UPDATE = {
+    "update_id": 1001,
+    "message": {
+        "message_id": 7,
+        "date": 1710489600,
+        "chat": {"id": 42, "type": "private", "first_name": "Ann"},
+        "from": {"id": 42, "is_bot": False, "first_name": "Ann"},
+        "text": "/today",
+        "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+    },
+}
+
+
+@pytest.fixture
+def bot_app():
+    app = Application.builder().token("123:TEST").updater(None).build()
+    with patch.object(settings, "telegram_enabled", True), \
+            patch.object(settings, "telegram_bot_token", "123:TEST"), \
+            patch.object(settings, "telegram_webhook_secret", SECRET), \
+            patch.object(settings, "worker_enabled", False), \
+            patch.object(telegram_service, "_app", app):
+        yield app
+
+
+class TestWebhook:
+    def test_rejects_missing_or_wrong_secret(self, client, bot_app):
+        assert client.post("/api/telegram/webhook", json=TODAY_UPDATE).status_code == 401
+        resp = client.post(
+            "/api/telegram/webhook", json=TODAY_UPDATE,
+            headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"},
+        )
+        assert resp.status_code == 401
+        resp = client.post(
+            "/api/telegram/webhook", json=TODAY_UPDATE,
+            headers={"X-Telegram-Bot-Api-Secret-Token": "sécret".encode("latin-1")},
+        )
+        assert resp.status_code == 401
+        assert bot_app.update_queue.empty()
+
+    def test_rejects_when_no_secret_configured(self, client, bot_app):
+        with patch.object(settings, "telegram_webhook_secret", ""):
+            resp = client.post(
+                "/api/telegram/webhook", json=TODAY_UPDATE,
+                headers={"X-Telegram-Bot-Api-Secret-Token": ""},
+            )
+        assert resp.status_code == 401
+
+    def test_recorded_update_reaches_the_update_queue(self, client, bot_app):
+        resp = client.post(
+            "/api/telegram/webhook", json=TODAY_UPDATE,
+            headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+        )
+        assert resp.status_code == 200
+        update = bot_app.update_queue.get_nowait()
+        assert isinstance(update, Update)
+        assert update.update_id == 1001
+        assert update.message.text == "/today"
+        assert update.effective_chat.id == 42
+
+    def test_non_update_body_is_rejected(self, client, bot_app):
+        resp = client.post(
+            "/api/telegram/webhook", json={"hello": "world"},
+            headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+        )
+        assert resp.status_code == 400
+
+    def test_malformed_json_is_rejected(self, client, bot_app):
+        for body in (b"{not json", b"\xff\xfe"):
+            resp = client.post(
+                "/api/telegram/webhook", content=body,
+                headers={"X-Telegram-Bot-Api-Secret-Token": SECRET, "Content-Type": "application/json"},
+            )
+            assert resp.status_code == 400
+        assert bot_app.update_queue.empty()
@@ -0,0 +1,169 @@
+"""Background worker: the API → worker task queue and its handlers."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app import worker
+from app.config import settings
+from app.services import task_queue as task_queue_module
+from app.services.task_queue import SQLiteTaskQueue, submit, task_queue_from_url
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = SQLiteTaskQueue(str(tmp_path / "tasks.db"))
+    with patch.object(task_queue_module, "_task_queue", q):
+        yield q
+
+
+def _items(tasks):
+    return [(t.kind, t.payload) for t in tasks]
+
+
+class TestSQLiteTaskQueue:
+    def test_fifo_and_limit(self, queue):
+        for i in range(3):
+            queue.put("t", {"i": i})
+        assert _items(queue.take(2)) == [("t", {"i": 0}), ("t", {"i": 1})]
+        assert _items(queue.take()) == [("t", {"i": 2})]
+        assert queue.take() == []
+
+    def test_unacked_task_reappears_after_the_visibility_timeout(self, queue):
+        queue.put("t", {"i": 0})
+        queue.put("t", {"i": 1})
+        first, second = queue.take(visibility=-1)  # already expired
+        queue.ack(first.id)
+        [again] = queue.take()
+        assert again == second._replace(attempts=2)
+        assert queue.take() == []  # hidden while in flight
+
+    def test_queue_is_built_on_first_use(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'lazy.db'}"
+        with patch.object(task_queue_module, "_task_queue", None), \
+                patch.object(settings, "worker_queue_url", url):
+            assert not (tmp_path / "lazy.db").exists()
+            q = task_queue_module.get_task_queue()
+            assert task_queue_module.get_task_queue() is q
+        assert (tmp_path / "lazy.db").exists()
+
+    def test_queue_from_url(self, tmp_path):
+        assert isinstance(task_queue_from_url(f"sqlite:///{tmp_path / 'q.db'}"), SQLiteTaskQueue)
+        with pytest.raises(ValueError):
+            task_queue_from_url("amqp://x")
+
+
+class TestSubmit:
+    @pytest.mark.asyncio
+    async def test_inline_runs_the_handler(self, queue):
+        handler = AsyncMock()
+        with patch.object(settings, "worker_enabled", False), \
+                patch.dict(worker.HANDLERS, {"deal_suggestion": handler}):
+            await submit("deal_suggestion", contact_id="c1", title="CV")
+        handler.assert_awaited_once_with({"contact_id": "c1", "title": "CV"})
+        assert queue.take() == []
+
+    @pytest.mark.asyncio
+    async def test_separate_worker_consumes_the_queue(self, queue):
+        handler = AsyncMock()
+        with patch.object(settings, "worker_enabled", True), \
+                patch.dict(worker.HANDLERS, {"deal_suggestion": handler}):
+            await submit("deal_suggestion", contact_id="c1", title="CV")
+            handler.assert_not_awaited()
+
+            consumer = asyncio.create_task(worker.consume(poll_interval=0.01))
+            try:
+                for _ in range(50):
+                    if handler.await_count:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                consumer.cancel()
+        handler.assert_awaited_once_with({"contact_id": "c1", "title": "CV"})
+        assert queue.take(visibility=-1) == []  # acked
+
+    @pytest.mark.asyncio
+    async def test_failed_task_is_not_acked_until_it_succeeds(self, queue):
+        handler = AsyncMock(side_effect=[RuntimeError("telegram down"), None])
+        queue.put("deal_suggestion", {"contact_id": "c1"})
+        with patch.dict(worker.HANDLERS, {"deal_suggestion": handler}), \
+                patch.object(queue, "take", lambda limit=50: SQLiteTaskQueue.take(queue, limit, visibility=0)):
+            consumer = asyncio.create_task(worker.consume(poll_interval=0.01))
+            try:
+                for _ in range(50):
+                    if handler.await_count == 2:
+                        break
+                    await asyncio.sleep(0.01)
+            finally:
+                consumer.cancel()
+        assert handler.await_count == 2
+        assert queue.take(visibility=0) == []
+
+    @pytest.mark.asyncio
+    async def test_task_failing_every_time_is_dropped(self, queue):
+        queue.put("boom", {})
+        handler = AsyncMock(side_effect=RuntimeError("x"))
+        with patch.dict(worker.HANDLERS, {"boom": handler}), \
+                patch.object(queue, "take", lambda limit=50: SQLiteTaskQueue.take(queue, limit, visibility=0)):
+            consumer = asyncio.create_task(worker.consume(poll_interval=0.01))
+            try:
+                for _ in range(100):
+                    if handler.await_count == worker.MAX_ATTEMPTS:
+                        break
+                    await asyncio.sleep(0.01)
+                await asyncio.sleep(0.05)
+            finally:
+                consumer.cancel()
+        assert handler.await_count == worker.MAX_ATTEMPTS
+
+    @pytest.mark.asyncio
+    async def test_unknown_or_failing_task_is_logged_not_raised(self):
+        with patch.dict(worker.HANDLERS, {"boom": AsyncMock(side_effect=RuntimeError("x"))}):
+            assert await worker.handle("boom", {}) is False
+        assert await worker.handle("nope", {}) is True
+
+
+class TestHandlers:
+    def test_capture_queues_pending_link_for_the_worker(
+        self, client, auth_headers, queue, seeded_contacts_ws, make_mock_worksheet,
+    ):
+        from app.services.sheet_service import INTERACTIONS_COLUMNS, _cache
+
+        interactions_ws = make_mock_worksheet()
+        interactions_ws._headers = INTERACTIONS_COLUMNS
+        _cache.clear()
+        # Jane Doe (c2) matches by name only, so the capture needs a link prompt.
+        with patch("app.routers.social.contacts_sheet._worksheet", return_value=seeded_contacts_ws), \
+                patch("app.routers.social.interactions_sheet._worksheet", return_value=interactions_ws), \
+                patch.object(settings, "worker_enabled", True):
+            resp = client.post("/api/social/capture", headers=auth_headers, json={
+                "platform": "linkedin",
+                "person": {"handle": "https://linkedin.com/in/janedoe", "display_name": "Jane Doe"},
+                "action": "comment",
+            })
+        _cache.clear()
+        assert resp.json()["pending_link"] is True
+        [(kind, payload)] = _items(queue.take())
+        assert kind == "pending_link"
+        assert payload["event"]["person"]["display_name"] == "Jane Doe"
+        assert payload["contact"]["id"] == "c2"
+
+    @pytest.mark.asyncio
+    async def test_pending_link_rebuilds_the_event(self):
+        payload = {"event": {"platform": "linkedin", "action": "like", "person": {"handle": "h"}}, "contact": {"id": "c1"}}
+        with patch("app.services.telegram_service.notify_pending_link", new=AsyncMock()) as notify:
+            await worker.handle("pending_link", payload)
+        event, contact = notify.await_args.args
+        assert event.person.handle == "h"
+        assert contact == {"id": "c1"}
+
+    @pytest.mark.asyncio
+    async def test_follow_ups_changed_rereads_and_wakes_the_timer(self):
+        from app.scheduler import reminder_timer
+        with patch.object(settings, "worker_enabled", True), \
+                patch.object(worker.follow_ups_sheet, "refresh") as refresh, \
+                patch.object(reminder_timer, "wake") as wake:
+            await worker.handle("follow_ups_changed", {})
+        refresh.assert_called_once()
+        wake.assert_called_once()
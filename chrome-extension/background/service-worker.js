@@ -219,22 +219,115 @@ async function handleCaptureEngagements(items) {
 }
 
 async function handleBatchLookup(items) {
+  // Accept both raw scraped items and the popup's pre-mapped lookup items.
+  const people = items.map(i => ({
+    handle: i.handle ?? i.profileUrl ?? '',
+    display_name: i.display_name ?? i.name ?? '',
+    profile_url: i.profile_url ?? i.profileUrl ?? '',
+  }));
+
+  // Pre-check against the local digest; only probable hits go to the server.
+  let probable = people.map((_, idx) => idx);
+  try {
+    const known = new Set((await getLookupDigest()).entries);
+    probable = [];
+    for (const [idx, person] of people.entries()) {
+      const keys = lookupKeys(person);
+      if (keys === null) {
+        probable.push(idx);
+        continue;
+      }
+      const hashes = await Promise.all(keys.map(sha256Prefix));
+      if (hashes.some(h => known.has(h))) probable.push(idx);
+    }
+  } catch {
+    // No digest available — ask the server about everyone
+  }
+
+  const results = people.map(p => ({
+    handle: p.handle,
+    display_name: p.display_name,
+    found: false,
+    contact_id: '',
+    contact_name: '',
+  }));
+  if (!probable.length) return results;
+
   const resp = await authFetch('/api/social/batch-lookup', {
     method: 'POST',
-    body: JSON.stringify({
-      items: items.map(i => ({
-        handle: i.profileUrl || '',
-        display_name: i.name,
-        profile_url: i.profileUrl || '',
-      })),
-    }),
+    body: JSON.stringify({ items: probable.map(idx => people[idx]) }),
   });
 
   if (!resp.ok) {
     throw new Error(`Batch lookup failed: HTTP ${resp.status}`);
   }
 
-  return await resp.json();
+  const found = await resp.json();
+  probable.forEach((idx, n) => { results[idx] = found[n]; });
+  return results;
+}
+
+// --- Local lookup digest (mirrors GET /api/social/digest) ---
+
+const DIGEST_MAX_AGE_MS = 60 * 1000;
+
+async function getLookupDigest() {
+  const { lookupDigest } = await chrome.storage.local.get('lookupDigest');
+  if (lookupDigest && Date.now() - lookupDigest.fetchedAt < DIGEST_MAX_AGE_MS) {
+    return lookupDigest;
+  }
+
+  const query = lookupDigest ? `?since=${encodeURIComponent(lookupDigest.version)}` : '';
+  const resp = await authFetch(`/api/social/digest${query}`, {
+    headers: lookupDigest ? { 'If-None-Match': `"${lookupDigest.version}"` } : {},
+  });
+
+  let digest;
+  if (resp.status === 304) {
+    digest = { ...lookupDigest, fetchedAt: Date.now() };
+  } else if (resp.ok) {
+    const data = await resp.json();
+    // full: the server can't diff against our version (e.g. it restarted) —
+    // replace the local copy outright.
+    let entries = data.entries;
+    if (!data.full) {
+      const set = new Set(lookupDigest.entries);
+      data.removed.forEach(h => set.delete(h));
+      data.added.forEach(h => set.add(h));
+      entries = [...set];
+    }
+    digest = { version: data.version, entries, fetchedAt: Date.now() };
+  } else {
+    throw new Error(`Digest refresh failed: HTTP ${resp.status}`);
+  }
+
+  await chrome.storage.local.set({ lookupDigest: digest });
+  return digest;
+}
+
+// Keys hashed into the digest — must match the server's normalisation.
+// Returns null when the digest can't answer (first-name-only matches).
+function lookupKeys(person) {
+  const keys = [];
+  const handle = (person.handle || '').trim().toLowerCase().replace(/\/+$/, '');
+  if (handle) keys.push(`h:${handle}`);
+
+  const parts = (person.display_name || '').trim().split(/\s+/).filter(Boolean);
+  if (parts.length === 1) return null;
+  if (parts.length > 1) {
+    const first = parts[0].toLowerCase();
+    const root = (s) => s.trim().toLowerCase().split(/[ ,(|]/)[0];
+    keys.push(`n:${first} ${root(parts.slice(1).join(' '))}`);
+    keys.push(`n:${first} ${root(parts[parts.length - 1])}`);
+  }
+  return keys;
+}
+
+async function sha256Prefix(key) {
+  const hash = await crypto.subtle.digest('SHA-256', new TextEncoder().encode(key));
+  return Array.from(new Uint8Array(hash).slice(0, 4))
+    .map(b => b.toString(16).padStart(2, '0'))
+    .join('');
 }
 
 // --- Deduplication via chrome.storage.local ---
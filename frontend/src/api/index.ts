@@ -1,5 +1,5 @@
 import api from './client';
-import type { Contact, Company, Deal, DashboardSummary, ActionFeed, EmailDraft, FollowUp, Interaction, NotificationItem, SearchResult } from '@/types';
+import type { Contact, ContactFull, Company, Deal, DashboardSummary, ActionFeed, EmailDraft, FollowUp, Interaction, NotificationItem, SearchResult } from '@/types';
 
 // Auth
 export const login = (username: string, password: string) =>
@@ -18,6 +18,9 @@ export const getContacts = (params?: Record<string, string>) =>
 export const getContact = (id: string) =>
   api.get<Contact>(`/api/contacts/${id}`);
 
+export const getContactFull = (id: string, params?: Record<string, string>) =>
+  api.get<ContactFull>(`/api/contacts/${id}/full`, { params });
+
 export const createContact = (data: Partial<Contact>) =>
   api.post<Contact>('/api/contacts', data);
 
@@ -89,8 +92,9 @@ export const getDashboardSummary = () =>
 export const getStalDeals = () =>
   api.get<{ stale_deals: Deal[]; count: number }>('/api/dashboard/stale-deals');
 
-export const getActionFeed = () =>
-  api.get<ActionFeed>('/api/dashboard/action-feed');
+// `wait` blocks until the server-side snapshot reflects our latest writes.
+export const getActionFeed = (wait = false) =>
+  api.get<ActionFeed>('/api/dashboard/action-feed', { params: wait ? { wait: true } : undefined });
 
 // Notifications
 export const getNotifications = (params?: Record<string, string>) =>
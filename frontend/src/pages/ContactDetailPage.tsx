@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import { getContact, updateContact, getInteractions, createInteraction, getDeals, createDeal, getFollowUps, createFollowUp, completeFollowUp, snoozeFollowUp, getNotifications, resolveNotification } from '@/api';
+import { getContactFull, updateContact, createInteraction, getDeals, createDeal, getFollowUps, createFollowUp, completeFollowUp, snoozeFollowUp, getNotifications, resolveNotification } from '@/api';
 import type { Contact, Interaction, Deal, FollowUp, NotificationItem } from '@/types';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent } from '@/components/ui/card';
@@ -41,12 +41,18 @@ export function ContactDetailPage() {
 
   useEffect(() => {
     if (!id) return;
-    getContact(id)
-      .then(res => { setContact(res.data); setEditForm(res.data); })
+    // One round-trip for the contact and its deals, interactions and follow-ups
+    getContactFull(id, { include: 'deals,interactions,follow_ups' })
+      .then(({ data }) => {
+        // name and company_name are joined in for display; keep them out of the edit form
+        const { name, company_name, ...fields } = data.contact;
+        setContact(fields);
+        setEditForm(fields);
+        setInteractions(data.interactions ?? []);
+        setDeals(data.deals ?? []);
+        setFollowUps(data.follow_ups ?? []);
+      })
       .catch(() => setError(true));
-    getInteractions({ contact_id: id }).then(res => setInteractions(res.data));
-    loadDeals(id);
-    loadFollowUps(id);
     loadNotifications(id);
   }, [id]);
 
@@ -244,7 +250,7 @@ export function ContactDetailPage() {
             onOpenChange={setShowInteractionForm}
             contactId={id!}
             onSaved={() => {
-              getInteractions({ contact_id: id! }).then(res => setInteractions(res.data));
+              getContactFull(id!, { include: 'interactions' }).then(res => setInteractions(res.data.interactions ?? []));
               loadNotifications(id!);
             }}
           />
@@ -199,8 +199,8 @@ export function DashboardPage() {
   const [feed, setFeed] = useState<ActionFeed | null>(null);
   const [loading, setLoading] = useState(true);
 
-  const loadFeed = () => {
-    getActionFeed()
+  const loadFeed = (wait = false) => {
+    getActionFeed(wait)
       .then(res => setFeed(res.data))
       .finally(() => setLoading(false));
   };
@@ -209,12 +209,12 @@ export function DashboardPage() {
 
   const handleComplete = async (id: string) => {
     await completeFollowUp(id);
-    loadFeed();
+    loadFeed(true);
   };
 
   const handleResolveNotification = async (id: string, action: string) => {
     await resolveNotification(id, action);
-    loadFeed();
+    loadFeed(true);
   };
 
   if (loading) return <div className="flex items-center justify-center h-64">Loading...</div>;
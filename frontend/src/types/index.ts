@@ -21,6 +21,7 @@ export interface Contact {
   campaign_id: string;
   created_at: string;
   updated_at: string;
+  engagement_score?: number | null;
 }
 
 export interface Company {
@@ -35,6 +36,15 @@ export interface Company {
   contacts?: Contact[];
 }
 
+export interface ContactFull {
+  contact: Contact & { name: string; company_name: string };
+  company?: Company | null;
+  deals?: Deal[];
+  interactions?: Interaction[];
+  follow_ups?: FollowUp[];
+  counts: { deals?: number; interactions?: number; follow_ups?: number };
+}
+
 export interface Deal {
   id: string;
   contact_id: string;
@@ -93,6 +103,7 @@ export interface DashboardSummary {
   overdue_count: number;
   overdue_follow_ups: FollowUp[];
   todays_follow_ups: FollowUp[];
+  stale_deal_count: number;
   recent_activity_count: number;
   total_deals: number;
   total_deal_value: number;
@@ -168,6 +179,7 @@ export interface ActionFeedContactItem {
   role: string;
   engagement_stage: string;
   last_interaction_date: string;
+  engagement_score: number;
   reason: string;
 }
 
@@ -217,4 +229,5 @@ export interface ActionFeed {
     new_contacts: ActionFeedContactItem[];
     new_contacts_total: number;
   };
+  computed_at: string;
 }